@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Accuracy-vs-speed check for a model's inference backends.
+
+Encodes a sample set with the PyTorch fp32 reference and with each other
+backend, then reports throughput and how closely each backend reproduces
+the reference: cosine similarity per text and top-k neighbour overlap (how
+often the same documents would be retrieved). Exits with status 1 if a
+backend's minimum cosine falls below --min-cosine, so it can gate a config
+change.
+
+Usage:
+    python backend_check.py --model all-MiniLM-L6-v2 --samples test_foods.json
+    python backend_check.py --model all-MiniLM-L6-v2 --backends onnx,int8 --threads 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from inference_backends import BACKENDS, TORCH, load_model
+
+
+FALLBACK_SAMPLES = [
+    "How do I reset my password?",
+    "Grilled chicken breast is lean and high in protein.",
+    "The quarterly report shows revenue growth in Europe.",
+    "Python lists are mutable sequences.",
+    "A quick brown fox jumps over the lazy dog.",
+    "Qdrant stores vectors alongside JSON payloads.",
+    "Fresh strawberries are sweet and rich in vitamin C.",
+    "The meeting was moved to Thursday afternoon.",
+]
+
+
+def load_samples(path: str, text_field: str, limit: int) -> list:
+    """Texts from a JSON array, NDJSON or plain text file (one text per line)"""
+    if not path:
+        return FALLBACK_SAMPLES
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    if path.endswith(".json"):
+        records = json.loads(content)
+    else:
+        lines = [line for line in content.splitlines() if line.strip()]
+        records = [json.loads(line) for line in lines] if path.endswith((".ndjson", ".jsonl")) else lines
+    texts = [record[text_field] if isinstance(record, dict) else record for record in records]
+    return texts[:limit] if limit else texts
+
+
+def timed_encode(model, texts: list, batch_size: int, repeat: int) -> tuple:
+    model.encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        embeddings = np.asarray(model.encode(texts, batch_size=batch_size), dtype=np.float32)
+        best = min(best, time.perf_counter() - started)
+    return embeddings, best
+
+
+def normalized(embeddings: np.ndarray) -> np.ndarray:
+    return embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+
+
+def neighbour_overlap(reference: np.ndarray, candidate: np.ndarray, k: int) -> float:
+    """Mean share of each text's top-k neighbours (by cosine) that both encodings agree on"""
+    k = min(k, len(reference) - 1)
+    if k <= 0:
+        return 1.0
+    overlaps = []
+    for sims_ref, sims_cand in zip(reference @ reference.T, candidate @ candidate.T):
+        top_ref = set(np.argsort(-sims_ref)[1:k + 1])
+        top_cand = set(np.argsort(-sims_cand)[1:k + 1])
+        overlaps.append(len(top_ref & top_cand) / k)
+    return float(np.mean(overlaps))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--backends", default="onnx,int8", help=f"Comma-separated, from {list(BACKENDS)}")
+    parser.add_argument("--samples", default="", help="JSON array, NDJSON or text file of sample texts")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--limit", type=int, default=1000, help="Max sample texts (0 = all)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0 = runtime default)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per backend (best is reported)")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--artifacts-dir", default=os.getenv("MODEL_ARTIFACTS_DIR", os.path.join(
+        os.getenv("SENTENCE_TRANSFORMERS_HOME", os.path.expanduser("~/.cache")), "onnx")))
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    texts = load_samples(args.samples, args.text_field, args.limit)
+    reference_model = load_model(args.model, TORCH, args.threads)
+    reference, reference_seconds = timed_encode(reference_model, texts, args.batch_size, args.repeat)
+    reference = normalized(reference)
+
+    results = {TORCH: {"texts_per_second": len(texts) / reference_seconds, "speedup": 1.0,
+                       "mean_cosine": 1.0, "min_cosine": 1.0, "top_k_overlap": 1.0}}
+    for backend in [name.strip() for name in args.backends.split(",") if name.strip()]:
+        if backend == TORCH:
+            continue
+        model = load_model(args.model, backend, args.threads, args.artifacts_dir)
+        embeddings, seconds = timed_encode(model, texts, args.batch_size, args.repeat)
+        embeddings = normalized(embeddings)
+        cosines = (embeddings * reference).sum(axis=1)
+        results[backend] = {
+            "texts_per_second": len(texts) / seconds,
+            "speedup": reference_seconds / seconds,
+            "mean_cosine": float(cosines.mean()),
+            "min_cosine": float(cosines.min()),
+            "top_k_overlap": neighbour_overlap(reference, embeddings, args.top_k),
+        }
+
+    failed = [name for name, result in results.items() if result["min_cosine"] < args.min_cosine]
+    if args.json:
+        print(json.dumps({"model": args.model, "samples": len(texts), "results": results,
+                          "failed": failed}, indent=2))
+    else:
+        print(f"📊 {args.model}: {len(texts)} samples, batch size {args.batch_size}, "
+              f"threads {args.threads or 'default'}")
+        print(f"{'backend':<8}{'texts/s':>10}{'speedup':>9}{'mean cos':>10}{'min cos':>9}{f'top-{args.top_k}':>8}")
+        for name, result in results.items():
+            print(f"{name:<8}{result['texts_per_second']:>10.1f}{result['speedup']:>8.2f}x"
+                  f"{result['mean_cosine']:>10.5f}{result['min_cosine']:>9.5f}{result['top_k_overlap']:>8.3f}")
+        for name in failed:
+            print(f"❌ {name}: min cosine {results[name]['min_cosine']:.5f} < {args.min_cosine}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
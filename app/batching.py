@@ -0,0 +1,320 @@
+import asyncio
+import itertools
+import time
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+
+EncodeFn = Callable[[List[str]], np.ndarray]
+
+# Upper bounds for the batch-size histogram reported by stats()
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+
+# Lower value = served first. Interactive requests (search, embed) overtake
+# queued bulk work (upsert), so a large ingest cannot starve searches.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+
+class EncodeQueueFullError(Exception):
+    """Raised when a batcher's queue is over its limit and the request is rejected"""
+
+
+class _PendingEncode:
+    """A single caller's texts waiting to be folded into a batch"""
+
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str], future: asyncio.Future):
+        self.texts = texts
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class EncodeBatcher:
+    """Dynamic micro-batching scheduler in front of a single model.
+
+    Concurrent callers await encode(); their texts are gathered for up to
+    max_wait_ms (or until max_batch_size texts are waiting), encoded with one
+    call to encode_fn on the inference executor, and each caller receives its
+    own slice of the result. Requests larger than max_batch_size are split
+    into chunks so higher-priority work can be interleaved between them.
+    Up to max_concurrent_batches batches run at once (one per inference
+    thread); while all are busy, waiting texts keep filling the next batch.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        encode_fn: EncodeFn,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        max_queued_texts: int = 0,
+        executor: Optional[Executor] = None,
+        max_concurrent_batches: int = 1,
+    ):
+        self.name = name
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_queued_texts = max_queued_texts  # 0 = unbounded
+        self.executor = executor
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self._sequence = itertools.count()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._running: Set[asyncio.Task] = set()
+        self._pending_texts = 0
+
+        # Stats
+        self.requests_total = 0
+        self.texts_total = 0
+        self.batches_total = 0
+        self.max_batch_seen = 0
+        self.batch_size_histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.batch_size_histogram["+Inf"] = 0
+        self.queue_wait_seconds_total = 0.0
+        self.encode_seconds_total = 0.0
+        self.errors_total = 0
+        self.rejected_total = 0
+
+    async def encode(self, texts: List[str], priority: int = PRIORITY_INTERACTIVE) -> np.ndarray:
+        """Encode texts as part of the next batch(es). Returns an (n, dim) array.
+
+        Raises EncodeQueueFullError if the queue is over max_queued_texts. An
+        oversized request is still admitted when nothing else is queued.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        self._ensure_worker()
+        if (self.max_queued_texts and self._pending_texts
+                and self._pending_texts + len(texts) > self.max_queued_texts):
+            self.rejected_total += 1
+            raise EncodeQueueFullError(
+                f"Encode queue for '{self.name}' is full "
+                f"({self._pending_texts} texts waiting, limit {self.max_queued_texts})"
+            )
+
+        self.requests_total += 1
+        self._pending_texts += len(texts)
+        # Split multi-chunk requests by length so each chunk pads to similar lengths
+        order = None
+        if len(texts) > self.max_batch_size:
+            order = np.argsort([-len(text) for text in texts], kind="stable")
+            texts = [texts[i] for i in order]
+        futures = []
+        for start in range(0, len(texts), self.max_batch_size):
+            chunk = list(texts[start:start + self.max_batch_size])
+            future = self._loop.create_future()
+            self._queue.put_nowait((priority, next(self._sequence), _PendingEncode(chunk, future)))
+            futures.append(future)
+
+        try:
+            results = await asyncio.gather(*futures)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        if order is None:
+            return results[0]
+        embeddings = np.empty((len(texts), results[0].shape[1]), dtype=results[0].dtype)
+        embeddings[order] = np.concatenate(results)
+        return embeddings
+
+    def _ensure_worker(self):
+        """Start the batching worker on the running loop (restarting it if the loop changed)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.PriorityQueue()
+            self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._running = set()
+            self._pending_texts = 0
+            self._worker = loop.create_task(self._run())
+
+    def _dispatch(self, batch: List[_PendingEncode], size: int):
+        """Run a batch in the background on the slot the caller acquired"""
+        task = self._loop.create_task(self._run_batch(batch, size))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        task.add_done_callback(lambda _: self._slots.release())
+
+    async def _run(self):
+        batch: List[_PendingEncode] = []
+        try:
+            while True:
+                await self._slots.acquire()
+                try:
+                    _, _, first = await self._queue.get()
+                except BaseException:
+                    self._slots.release()
+                    raise
+                batch = [first]
+                size = len(first.texts)
+                deadline = time.perf_counter() + self.max_wait
+
+                # Keep gathering until the batch is full or the wait window closes
+                while size < self.max_batch_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0 and self._queue.empty():
+                        break
+                    try:
+                        if self._queue.empty():
+                            _, _, item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                        else:
+                            _, _, item = self._queue.get_nowait()
+                    except asyncio.TimeoutError:
+                        break
+                    if size + len(item.texts) > self.max_batch_size:
+                        # Does not fit: run it on its own in the next batch, once a slot frees up
+                        self._dispatch(batch, size)
+                        batch, size = [item], len(item.texts)
+                        await self._slots.acquire()
+                        deadline = time.perf_counter() + self.max_wait
+                        continue
+                    batch.append(item)
+                    size += len(item.texts)
+
+                self._dispatch(batch, size)
+                batch = []
+        except asyncio.CancelledError:
+            # Texts taken off the queue but not dispatched yet
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(RuntimeError(f"Batcher for '{self.name}' is shutting down"))
+            raise
+
+    async def _run_batch(self, batch: List[_PendingEncode], size: int):
+        started = time.perf_counter()
+        for item in batch:
+            self.queue_wait_seconds_total += started - item.enqueued_at
+        self._pending_texts -= size
+
+        # Callers that gave up (e.g. a disconnected client) don't need encoding
+        batch = [item for item in batch if not item.future.done()]
+        if not batch:
+            return
+
+        texts = [text for item in batch for text in item.texts]
+        size = len(texts)
+        try:
+            embeddings = await self._loop.run_in_executor(self.executor, self.encode_fn, texts)
+        except Exception as e:
+            self.errors_total += 1
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        finally:
+            self.encode_seconds_total += time.perf_counter() - started
+
+        self._record_batch(size)
+        embeddings = np.asarray(embeddings)
+        offset = 0
+        for item in batch:
+            count = len(item.texts)
+            if not item.future.done():
+                item.future.set_result(embeddings[offset:offset + count])
+            offset += count
+
+    def _record_batch(self, size: int):
+        self.batches_total += 1
+        self.texts_total += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        for bucket in BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self.batch_size_histogram[bucket] += 1
+                break
+        else:
+            self.batch_size_histogram["+Inf"] += 1
+
+    async def close(self):
+        """Stop the worker and fail any callers still waiting"""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        # Let batches already on the inference threads deliver their results
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, _, item = self._queue.get_nowait()
+                if not item.future.done():
+                    item.future.set_exception(RuntimeError(f"Batcher for '{self.name}' is shutting down"))
+        self._worker = None
+        self._pending_texts = 0
+
+    def stats(self) -> dict:
+        return {
+            "model": self.name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_queued_texts": self.max_queued_texts,
+            "max_concurrent_batches": self.max_concurrent_batches,
+            "running_batches": len(self._running),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queued_texts": self._pending_texts,
+            "rejected_total": self.rejected_total,
+            "requests_total": self.requests_total,
+            "texts_total": self.texts_total,
+            "batches_total": self.batches_total,
+            "avg_batch_size": (self.texts_total / self.batches_total) if self.batches_total else 0.0,
+            "max_batch_size_seen": self.max_batch_seen,
+            "batch_size_histogram": {str(k): v for k, v in self.batch_size_histogram.items()},
+            "avg_queue_wait_ms": (self.queue_wait_seconds_total / self.requests_total * 1000.0)
+            if self.requests_total else 0.0,
+            "encode_seconds_total": round(self.encode_seconds_total, 6),
+            "avg_encode_ms": (self.encode_seconds_total / self.batches_total * 1000.0)
+            if self.batches_total else 0.0,
+            "errors_total": self.errors_total,
+        }
+
+
+class BatcherRegistry:
+    """One EncodeBatcher per model, created on first use"""
+
+    def __init__(self, encode_fn_factory: Callable[[str], EncodeFn], max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, max_queued_texts: int = 0,
+                 executor: Optional[Executor] = None, max_concurrent_batches: int = 1):
+        self.encode_fn_factory = encode_fn_factory
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queued_texts = max_queued_texts
+        self.executor = executor
+        self.max_concurrent_batches = max_concurrent_batches
+        self._batchers: Dict[str, EncodeBatcher] = {}
+
+    def get(self, model_name: str) -> EncodeBatcher:
+        batcher = self._batchers.get(model_name)
+        if batcher is None:
+            batcher = EncodeBatcher(
+                model_name,
+                self.encode_fn_factory(model_name),
+                max_batch_size=self.max_batch_size,
+                max_wait_ms=self.max_wait_ms,
+                max_queued_texts=self.max_queued_texts,
+                executor=self.executor,
+                max_concurrent_batches=self.max_concurrent_batches,
+            )
+            self._batchers[model_name] = batcher
+        return batcher
+
+    async def encode(self, model_name: str, texts: List[str],
+                     priority: int = PRIORITY_INTERACTIVE) -> np.ndarray:
+        return await self.get(model_name).encode(texts, priority=priority)
+
+    async def close(self):
+        for batcher in self._batchers.values():
+            await batcher.close()
+
+    def stats(self) -> dict:
+        return {name: batcher.stats() for name, batcher in self._batchers.items()}
@@ -0,0 +1,104 @@
+import re
+from typing import List, Literal, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+# (text, start_offset, end_offset) of a chunk within its document
+Chunk = Tuple[str, int, int]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+class ChunkingSettings(BaseModel):
+    strategy: Literal["tokens", "sentences"] = "sentences"
+    chunk_size: Optional[int] = None  # Max tokens per chunk; defaults to the model's max_seq_length
+    chunk_overlap: int = 32  # Tokens shared by consecutive chunks
+
+
+def _token_offsets(text: str, tokenizer) -> List[Tuple[int, int]]:
+    """Character span of each token (needs a fast tokenizer)"""
+    return tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+
+
+def split_by_tokens(text: str, tokenizer, chunk_size: int, chunk_overlap: int, base: int = 0) -> List[Chunk]:
+    """Fixed windows of chunk_size tokens, each overlapping the previous one by chunk_overlap tokens"""
+    offsets = _token_offsets(text, tokenizer)
+    if len(offsets) <= chunk_size:
+        return [(text, base, base + len(text))] if text.strip() else []
+    step = max(1, chunk_size - chunk_overlap)
+    chunks = []
+    for start in range(0, len(offsets), step):
+        window = offsets[start:start + chunk_size]
+        begin, end = window[0][0], window[-1][1]
+        chunks.append((text[begin:end], base + begin, base + end))
+        if start + chunk_size >= len(offsets):
+            break
+    return chunks
+
+
+def _sentences(text: str) -> List[Tuple[int, int]]:
+    spans = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        if match.start() > start:
+            spans.append((start, match.start()))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+def split_by_sentences(text: str, tokenizer, chunk_size: int, chunk_overlap: int) -> List[Chunk]:
+    """Whole sentences packed into chunks of at most chunk_size tokens.
+
+    Consecutive chunks repeat trailing sentences worth up to chunk_overlap
+    tokens. A sentence longer than chunk_size is split by tokens.
+    """
+    spans = _sentences(text)
+    if not spans:
+        return []
+    counts = [len(ids) for ids in tokenizer([text[s:e] for s, e in spans], add_special_tokens=False)["input_ids"]]
+
+    chunks: List[Chunk] = []
+    current: List[int] = []  # sentence indexes
+    current_tokens = 0
+
+    def emit():
+        begin, end = spans[current[0]][0], spans[current[-1]][1]
+        chunks.append((text[begin:end], begin, end))
+
+    for index, count in enumerate(counts):
+        if count > chunk_size:
+            if current:
+                emit()
+                current, current_tokens = [], 0
+            start, end = spans[index]
+            chunks.extend(split_by_tokens(text[start:end], tokenizer, chunk_size, chunk_overlap, base=start))
+            continue
+        if current and current_tokens + count > chunk_size:
+            emit()
+            # Carry trailing sentences into the next chunk as overlap
+            carried, carried_tokens = [], 0
+            for previous in reversed(current):
+                if carried_tokens + counts[previous] > chunk_overlap or carried_tokens + counts[previous] + count > chunk_size:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += counts[previous]
+            current, current_tokens = carried, carried_tokens
+        current.append(index)
+        current_tokens += count
+    if current:
+        emit()
+    return chunks
+
+
+def split_document(text: str, tokenizer, settings: ChunkingSettings, max_seq_length: int) -> List[Chunk]:
+    """Split one document with the model's tokenizer; chunks never exceed what the model can encode"""
+    # Leave room for the special tokens ([CLS]/[SEP]) the model adds
+    limit = max(8, max_seq_length - 2)
+    chunk_size = min(settings.chunk_size or limit, limit)
+    chunk_overlap = min(max(0, settings.chunk_overlap), chunk_size // 2)
+    if settings.strategy == "tokens":
+        return split_by_tokens(text, tokenizer, chunk_size, chunk_overlap)
+    return split_by_sentences(text, tokenizer, chunk_size, chunk_overlap)
@@ -0,0 +1,176 @@
+import math
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CompressionRatio,
+    Distance,
+    HnswConfigDiff,
+    OptimizersConfigDiff,
+    ProductQuantization,
+    ProductQuantizationConfig,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+
+# Full-precision vector of collections whose indexed (unnamed) vector is reduced
+FULL_VECTOR_NAME = "full"
+
+
+class QuantizationSettings(BaseModel):
+    type: Literal["scalar", "product", "binary"]
+    quantile: Optional[float] = None  # scalar: clip outliers above this quantile (e.g. 0.99)
+    compression: Literal["x4", "x8", "x16", "x32", "x64"] = "x16"  # product only
+    always_ram: bool = True  # Keep quantized vectors in RAM even when the originals are on disk
+
+
+class HnswSettings(BaseModel):
+    m: Optional[int] = None  # Edges per node (Qdrant default 16); lower = less memory, lower recall
+    ef_construct: Optional[int] = None  # Build-time candidate list (default 100)
+    full_scan_threshold: Optional[int] = None
+    on_disk: Optional[bool] = None  # Keep the HNSW graph on disk
+
+
+class OptimizerSettings(BaseModel):
+    indexing_threshold: Optional[int] = None  # KB of vectors before a segment gets an HNSW index
+    memmap_threshold: Optional[int] = None  # KB of vectors before a segment is memory-mapped
+    default_segment_number: Optional[int] = None
+
+
+class ReductionSettings(BaseModel):
+    type: Literal["truncate"] = "truncate"  # Keep the leading dimensions (Matryoshka-trained models)
+    dimension: int  # Size of the indexed vector searched in the first pass
+    oversampling: float = 4.0  # First-pass candidates per result, rescored with the full vectors
+
+
+def quantization_config(settings: Optional[QuantizationSettings]):
+    """Qdrant quantization config for the requested settings (None = no quantization)"""
+    if settings is None:
+        return None
+    if settings.type == "scalar":
+        return ScalarQuantization(scalar=ScalarQuantizationConfig(
+            type=ScalarType.INT8, quantile=settings.quantile, always_ram=settings.always_ram))
+    if settings.type == "product":
+        return ProductQuantization(product=ProductQuantizationConfig(
+            compression=CompressionRatio(settings.compression), always_ram=settings.always_ram))
+    return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=settings.always_ram))
+
+
+def hnsw_config(settings: Optional[HnswSettings]) -> Optional[HnswConfigDiff]:
+    if settings is None:
+        return None
+    return HnswConfigDiff(**settings.model_dump(exclude_none=True))
+
+
+def optimizers_config(settings: Optional[OptimizerSettings]) -> Optional[OptimizersConfigDiff]:
+    if settings is None:
+        return None
+    return OptimizersConfigDiff(**settings.model_dump(exclude_none=True))
+
+
+def reduced_vectors_config(dimension: int, distance: Distance, reduction: ReductionSettings,
+                           on_disk: bool, quantization) -> dict:
+    """Vector layout of a reduced collection.
+
+    The unnamed vector holds the first reduction.dimension components and
+    carries the HNSW index (and any quantization); the full vector is only
+    read to rescore candidates, so it stays on disk without an index (m=0).
+    """
+    return {
+        "": VectorParams(size=reduction.dimension, distance=distance, on_disk=on_disk or None,
+                         quantization_config=quantization),
+        FULL_VECTOR_NAME: VectorParams(size=dimension, distance=distance, on_disk=True,
+                                       hnsw_config=HnswConfigDiff(m=0)),
+    }
+
+
+def rescore_candidates(limit: int, oversampling: float) -> int:
+    """First-pass hits fetched from the reduced index for `limit` results"""
+    return max(limit, math.ceil(limit * oversampling))
+
+
+def search_params(hnsw_ef: Optional[int], exact: bool, rescore: Optional[bool],
+                  oversampling: Optional[float]) -> Optional[SearchParams]:
+    """Per-request search parameters, or None to use the collection's defaults"""
+    quantization = None
+    if rescore is not None or oversampling is not None:
+        quantization = QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+    if hnsw_ef is None and not exact and quantization is None:
+        return None
+    return SearchParams(hnsw_ef=hnsw_ef, exact=exact, quantization=quantization)
+
+
+def _quantized_bytes_per_vector(quantization: dict, dimension: int) -> int:
+    if "scalar" in quantization:
+        return dimension  # int8
+    if "product" in quantization:
+        ratio = int(str(quantization["product"]["compression"]).lstrip("x"))
+        return max(1, dimension * 4 // ratio)
+    if "binary" in quantization:
+        return (dimension + 7) // 8  # one bit per dimension
+    return 0
+
+
+def describe_config(collection_info) -> dict:
+    """The collection's effective storage/index settings as reported by Qdrant"""
+    config = collection_info.config
+    vectors = config.params.vectors
+    full = None
+    if isinstance(vectors, dict):
+        # Named vectors: the unnamed one is searched, "full" (if any) rescores
+        full = vectors.get(FULL_VECTOR_NAME)
+        vectors = vectors.get("")
+    quantization = config.quantization_config or getattr(vectors, "quantization_config", None)
+    return {
+        "on_disk_vectors": bool(getattr(vectors, "on_disk", None)),
+        "on_disk_payload": bool(config.params.on_disk_payload),
+        "hnsw": config.hnsw_config.model_dump(mode="json") if config.hnsw_config else None,
+        "optimizers": config.optimizer_config.model_dump(mode="json") if config.optimizer_config else None,
+        "quantization": quantization.model_dump(mode="json", exclude_none=True) if quantization else None,
+        "full_vectors": {"size": full.size, "on_disk": bool(full.on_disk)} if full else None,
+        # Indexed payload fields: type and number of indexed points
+        "payload_indexes": {
+            field: {"type": getattr(info.data_type, "value", info.data_type), "points": info.points}
+            for field, info in (collection_info.payload_schema or {}).items()
+        },
+    }
+
+
+def estimate_memory(config: dict, points_count: int, dimension: int) -> dict:
+    """Rough RAM and disk footprint of a collection's vectors and HNSW graph.
+
+    Payloads and Qdrant's per-segment overhead are not included.
+    """
+    original = points_count * dimension * 4
+    quantized = points_count * _quantized_bytes_per_vector(config["quantization"] or {}, dimension)
+    hnsw = config["hnsw"] or {}
+    # Layer 0 holds 2*m links per point (4 bytes each); upper layers add little
+    graph = points_count * 2 * (hnsw.get("m") or 16) * 4
+
+    quantized_in_ram = False
+    if quantized:
+        settings = next(iter(config["quantization"].values()))
+        quantized_in_ram = bool(settings.get("always_ram")) or not config["on_disk_vectors"]
+
+    ram = 0 if config["on_disk_vectors"] else original
+    ram += quantized if quantized_in_ram else 0
+    ram += 0 if hnsw.get("on_disk") else graph
+    full = config.get("full_vectors")
+    full_size = points_count * full["size"] * 4 if full else 0
+    ram += 0 if not full or full["on_disk"] else full_size
+    mb = lambda n: round(n / 1024 / 1024, 2)
+    return {
+        "original_vectors_mb": mb(original),
+        "quantized_vectors_mb": mb(quantized),
+        "full_vectors_mb": mb(full_size),
+        "hnsw_graph_mb": mb(graph),
+        "estimated_ram_mb": mb(ram),
+        "estimated_disk_mb": mb(original + quantized + full_size + graph),
+    }
@@ -0,0 +1,162 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+
+class CollectionEntry:
+    """Cached state of one collection: it exists, plus its model metadata (None for legacy collections)"""
+
+    __slots__ = ("name", "metadata", "loaded_at")
+
+    def __init__(self, name: str, metadata: Optional[dict]):
+        self.name = name
+        self.metadata = metadata
+        self.loaded_at = time.monotonic()
+
+    @property
+    def model(self) -> Optional[str]:
+        return self.metadata.get("model") if self.metadata else None
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self.metadata.get("dimension") if self.metadata else None
+
+    @property
+    def distance(self) -> Optional[str]:
+        return self.metadata.get("distance") if self.metadata else None
+
+
+# Returns the entry for an existing collection, or None if it does not exist
+CollectionLoader = Callable[[str], Awaitable[Optional[CollectionEntry]]]
+
+
+class CollectionRegistry:
+    """In-process cache of collection existence and metadata.
+
+    Entries expire after ttl_seconds so that several API workers converge on
+    changes made by each other (create/delete/recreate); changes made by this
+    worker update the registry immediately. Only existing collections are
+    cached, so a collection created elsewhere is picked up on the next lookup.
+    """
+
+    def __init__(self, loader: CollectionLoader, ttl_seconds: float = 60.0):
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, CollectionEntry] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidations = 0
+
+    async def get(self, name: str) -> Optional[CollectionEntry]:
+        """Return the collection's entry, or None if it doesn't exist"""
+        entry = self._entries.get(name)
+        if entry is not None:
+            if self.ttl_seconds <= 0 or time.monotonic() - entry.loaded_at < self.ttl_seconds:
+                self.hits += 1
+                return entry
+            self.expired += 1
+            del self._entries[name]
+
+        self.misses += 1
+        # Concurrent misses for the same collection share one load
+        pending = self._loading.get(name)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[name] = future
+        try:
+            entry = await self.loader(name)
+            if entry is not None:
+                self._entries[name] = entry
+            future.set_result(entry)
+            return entry
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieve the exception so the loop doesn't warn when nobody else awaited it
+            future.exception()
+            raise
+        finally:
+            del self._loading[name]
+
+    def set(self, name: str, metadata: Optional[dict]):
+        """Record a collection created (or re-read) by this worker"""
+        self._entries[name] = CollectionEntry(name, metadata)
+
+    def invalidate(self, name: str):
+        """Drop a collection so the next lookup reloads it (after deletes or failed calls)"""
+        if self._entries.pop(name, None) is not None:
+            self.invalidations += 1
+
+    async def warm(self, names: Iterable[str]):
+        """Load several collections concurrently, e.g. at startup"""
+        await asyncio.gather(*(self.get(name) for name in names), return_exceptions=True)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "cached_collections": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "invalidations": self.invalidations,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+class TimedCache:
+    """Small bounded cache with per-entry TTL, keyed by collection name or (collection, ...) tuples"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[object, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl_seconds:
+            self.hits += 1
+            return entry[0]
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        if self.ttl_seconds <= 0:
+            return
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            # Drop the oldest entry (dicts keep insertion order)
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (value, time.monotonic())
+
+    def items_for(self, collection_name: str):
+        """(key, value) pairs belonging to a collection that have not expired"""
+        now = time.monotonic()
+        return [
+            (key, value) for key, (value, stored_at) in self._entries.items()
+            if now - stored_at < self.ttl_seconds
+            and (key == collection_name or (isinstance(key, tuple) and key[0] == collection_name))
+        ]
+
+    def invalidate_collection(self, collection_name: str):
+        for key in [key for key in self._entries
+                    if key == collection_name or (isinstance(key, tuple) and key[0] == collection_name)]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Rough per-entry bookkeeping cost (dict slot, tuple, array header) used for the memory budget
+ENTRY_OVERHEAD_BYTES = 200
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different strings share a cache entry.
+
+    Case is preserved because cased models embed "Apple" and "apple" differently.
+    """
+    return " ".join(text.split())
+
+
+def model_cache_key(model: str, backend: str, max_seq_length: Optional[int]) -> str:
+    """Cache namespace of a model: vectors differ across backends and truncation lengths"""
+    return f"{model}@{backend}:{max_seq_length or 'default'}"
+
+
+class DiskEmbeddingStore:
+    """SQLite-backed second tier so cached embeddings survive restarts.
+
+    Calls block on disk; EmbeddingCache runs them in a thread.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1_000_000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS embeddings_stored_at ON embeddings (stored_at)")
+        self._writes_since_prune = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha1(f"{model}\0{text}".encode()).hexdigest()
+
+    def get_many(self, model: str, texts: List[str], min_stored_at: float = 0.0) -> Dict[str, np.ndarray]:
+        keys = {self.key(model, text): text for text in texts}
+        key_list = list(keys)
+        found = {}
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(key_list), 500):
+            chunk = key_list[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE stored_at >= ? AND key IN ({placeholders})",
+                    [min_stored_at, *chunk],
+                ).fetchall()
+            for key, blob in rows:
+                found[keys[key]] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model: str, items: List[Tuple[str, np.ndarray]]):
+        now = time.time()
+        rows = [(self.key(model, text), model, vector.astype(np.float32).tobytes(), now) for text, vector in items]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, stored_at) VALUES (?, ?, ?, ?)", rows
+            )
+            self._writes_since_prune += len(items)
+            if self._writes_since_prune >= 1000:
+                self._writes_since_prune = 0
+                self._prune()
+
+    def prune(self):
+        """Drop the oldest rows beyond max_entries"""
+        with self._lock:
+            self._prune()
+
+    def _prune(self):
+        self.conn.execute(
+            "DELETE FROM embeddings WHERE key IN ("
+            " SELECT key FROM embeddings ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class EmbeddingCache:
+    """Memory-budgeted LRU cache of embeddings keyed by (model key, normalized text).
+
+    The model key should name everything that changes the vectors (see
+    model_cache_key()), so a backend or config switch never serves old ones.
+
+    Vectors are stored as compact float32 arrays. Entries are evicted least
+    recently used first once max_bytes is exceeded, and ignored once older
+    than ttl_seconds (0 = never expire). With a DiskEmbeddingStore attached,
+    new entries are written through to disk and memory misses fall back to it.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float = 0.0, disk: Optional[DiskEmbeddingStore] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk = disk
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[np.ndarray, float]]" = OrderedDict()
+        self._bytes = 0
+
+        # Average encode seconds per text for each model, used to estimate time saved by hits
+        self._encode_seconds_per_text: Dict[str, float] = {}
+
+        # Stats
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.encode_seconds_saved = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    async def get_many(self, model: str, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Return cached vectors for the (normalized) texts that are present"""
+        now = time.time()
+        found: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+        for text in texts:
+            key = (model, text)
+            entry = self._entries.get(key)
+            if entry is not None:
+                vector, stored_at = entry
+                if self.ttl_seconds <= 0 or now - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    found[text] = vector
+                    continue
+                self._remove(key)
+                self.expired += 1
+            missing.append(text)
+
+        if missing and self.disk is not None:
+            min_stored_at = now - self.ttl_seconds if self.ttl_seconds > 0 else 0.0
+            from_disk = await asyncio.to_thread(self.disk.get_many, model, missing, min_stored_at)
+            for text, vector in from_disk.items():
+                self._insert((model, text), vector, now)
+                found[text] = vector
+            self.disk_hits += len(from_disk)
+
+        self.hits += len(found)
+        self.misses += len(texts) - len(found)
+        self.encode_seconds_saved += len(found) * self._encode_seconds_per_text.get(model, 0.0)
+        return found
+
+    async def put_many(self, model: str, texts: List[str], vectors: np.ndarray):
+        now = time.time()
+        vectors = np.asarray(vectors, dtype=np.float32)
+        for text, vector in zip(texts, vectors):
+            self._insert((model, text), vector.copy(), now)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.put_many, model, list(zip(texts, vectors)))
+
+    def record_encode(self, model: str, seconds: float, count: int):
+        """Track how long a cache miss costs so hits can be converted into time saved"""
+        if count <= 0:
+            return
+        per_text = seconds / count
+        previous = self._encode_seconds_per_text.get(model)
+        # Exponential moving average so the estimate follows load changes
+        self._encode_seconds_per_text[model] = per_text if previous is None else 0.9 * previous + 0.1 * per_text
+
+    def _insert(self, key: Tuple[str, str], vector: np.ndarray, stored_at: float):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (vector, stored_at)
+        self._bytes += self._entry_size(key, vector)
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: Tuple[str, str]):
+        vector, _ = self._entries.pop(key)
+        self._bytes -= self._entry_size(key, vector)
+
+    @staticmethod
+    def _entry_size(key: Tuple[str, str], vector: np.ndarray) -> int:
+        return vector.nbytes + len(key[1]) + ENTRY_OVERHEAD_BYTES
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "encode_seconds_saved": round(self.encode_seconds_saved, 3),
+            "disk_entries": self.disk.count() if self.disk is not None else 0,
+        }
@@ -0,0 +1,120 @@
+import json
+from typing import Any, Dict, Optional, Set, Tuple
+
+from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchValue, PayloadSchemaType, Range
+
+
+RANGE_KEYS = ("gt", "gte", "lt", "lte")
+
+# Schemas accepted in a collection's declared payload_indexes
+INDEX_SCHEMAS = {schema.value: schema for schema in PayloadSchemaType}
+
+
+class FilterError(ValueError):
+    pass
+
+
+def _condition(field: str, value: Any) -> Tuple[FieldCondition, PayloadSchemaType]:
+    """One metadata condition and the index schema that serves it"""
+    if isinstance(value, dict):
+        if set(value) == {"any"}:
+            value = value["any"]
+        elif value and set(value) <= set(RANGE_KEYS):
+            if not all(isinstance(bound, (int, float)) and not isinstance(bound, bool) for bound in value.values()):
+                raise FilterError(f"Range bounds of '{field}' must be numbers")
+            schema = (PayloadSchemaType.INTEGER if all(isinstance(bound, int) for bound in value.values())
+                      else PayloadSchemaType.FLOAT)
+            return FieldCondition(key=field, range=Range(**value)), schema
+        else:
+            raise FilterError(f"Condition on '{field}' must be a value, a list, {{\"any\": [...]}} "
+                              f"or a range with {list(RANGE_KEYS)}")
+    if isinstance(value, list):
+        if not value or not all(isinstance(item, (str, int)) and not isinstance(item, bool) for item in value):
+            raise FilterError(f"Match-any values of '{field}' must be a non-empty list of strings or integers")
+        schema = PayloadSchemaType.KEYWORD if isinstance(value[0], str) else PayloadSchemaType.INTEGER
+        return FieldCondition(key=field, match=MatchAny(any=value)), schema
+    if isinstance(value, bool):
+        return FieldCondition(key=field, match=MatchValue(value=value)), PayloadSchemaType.BOOL
+    if isinstance(value, str):
+        return FieldCondition(key=field, match=MatchValue(value=value)), PayloadSchemaType.KEYWORD
+    if isinstance(value, int):
+        return FieldCondition(key=field, match=MatchValue(value=value)), PayloadSchemaType.INTEGER
+    if isinstance(value, float):
+        # Qdrant matches exact values only for keywords, integers and bools
+        return FieldCondition(key=field, range=Range(gte=value, lte=value)), PayloadSchemaType.FLOAT
+    raise FilterError(f"Unsupported condition on '{field}': {value!r}")
+
+
+def build_filter(conditions: Optional[Dict[str, Any]], tenant: Optional[str], tenant_field: str,
+                 base: Filter) -> Tuple[Filter, Dict[str, PayloadSchemaType]]:
+    """Combine metadata conditions (all must hold) and a tenant id with a base filter.
+
+    Conditions map a metadata field to a value (equality), a list or
+    {"any": [...]} (match any) or {"gt"/"gte"/"lt"/"lte": number} (range).
+    Returns the filter and the filtered fields with the index schema each needs.
+    """
+    must = list(base.must or [])
+    fields: Dict[str, PayloadSchemaType] = {}
+    for field, value in (conditions or {}).items():
+        if not field or field.startswith("_") or field == "text":
+            raise FilterError(f"Cannot filter on '{field}'")
+        condition, schema = _condition(field, value)
+        must.append(condition)
+        fields[field] = schema
+    if tenant is not None:
+        must.append(FieldCondition(key=tenant_field, match=MatchValue(value=tenant)))
+        fields[tenant_field] = PayloadSchemaType.KEYWORD
+    if not fields:
+        return base, fields
+    return Filter(must=must, must_not=base.must_not, should=base.should), fields
+
+
+def filter_key(conditions: Optional[Dict[str, Any]], tenant: Optional[str]) -> str:
+    """Canonical string of a filter, for cache keys ("" = unfiltered)"""
+    if not conditions and tenant is None:
+        return ""
+    return json.dumps([conditions or {}, tenant], sort_keys=True)
+
+
+class PayloadIndexAdvisor:
+    """Decides which filtered fields get a payload index.
+
+    Counts how often each (collection, field) is filtered on; once a field
+    reaches `threshold` filters it is returned for indexing, once (again
+    after mark_failed() if creating the index failed). Indexed
+    fields let Qdrant apply the filter inside the HNSW traversal instead of
+    checking payloads of every candidate. threshold 0 disables it.
+    """
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._indexed: Dict[str, Set[str]] = {}
+
+    def record(self, collection: str, fields: Dict[str, PayloadSchemaType]) -> Dict[str, PayloadSchemaType]:
+        """Count a filtered request; returns the fields that should be indexed now"""
+        if self.threshold <= 0 or not fields:
+            return {}
+        indexed = self._indexed.setdefault(collection, set())
+        due = {}
+        for field, schema in fields.items():
+            if field in indexed:
+                continue
+            count = self._counts[(collection, field)] = self._counts.get((collection, field), 0) + 1
+            if count >= self.threshold:
+                indexed.add(field)
+                due[field] = schema
+        return due
+
+    def mark_indexed(self, collection: str, fields):
+        self._indexed.setdefault(collection, set()).update(fields)
+
+    def mark_failed(self, collection: str, field: str):
+        """Index creation failed: count the field from zero again so it is retried later"""
+        self._indexed.get(collection, set()).discard(field)
+        self._counts.pop((collection, field), None)
+
+    def forget(self, collection: str):
+        self._indexed.pop(collection, None)
+        for key in [key for key in self._counts if key[0] == collection]:
+            del self._counts[key]
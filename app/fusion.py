@@ -0,0 +1,40 @@
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+
+# Rank constant from the original RRF paper; larger values flatten the
+# difference between top and lower ranks
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[dict]],
+    key: Callable[[dict], Hashable] = lambda hit: hit["id"],
+    k: int = RRF_K,
+    limit: Optional[int] = None,
+) -> List[dict]:
+    """Merge several ranked hit lists into one, deduplicating by key.
+
+    Each hit scores sum(1 / (k + rank)) over the lists it appears in (rank
+    starts at 1). The returned hits are copies of the best-ranked occurrence,
+    with "score" replaced by the fused score and "sources" listing the indexes
+    of the lists that contained the hit.
+    """
+    fused: Dict[Hashable, dict] = {}
+    best_rank: Dict[Hashable, int] = {}
+    for list_index, hits in enumerate(ranked_lists):
+        for rank, hit in enumerate(hits, start=1):
+            hit_key = key(hit)
+            entry = fused.get(hit_key)
+            if entry is None:
+                entry = fused[hit_key] = {**hit, "score": 0.0, "sources": []}
+                best_rank[hit_key] = rank
+            elif rank < best_rank[hit_key]:
+                # Keep the payload of the best-ranked occurrence
+                entry.update({name: value for name, value in hit.items() if name != "score"})
+                best_rank[hit_key] = rank
+            entry["score"] += 1.0 / (k + rank)
+            if list_index not in entry["sources"]:
+                entry["sources"].append(list_index)
+
+    merged = sorted(fused.values(), key=lambda hit: hit["score"], reverse=True)
+    return merged[:limit] if limit is not None else merged
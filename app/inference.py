@@ -0,0 +1,244 @@
+import asyncio
+import itertools
+import json
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from batching import BatcherRegistry, EncodeQueueFullError, PRIORITY_INTERACTIVE
+from chunking import Chunk, ChunkingSettings, split_document
+from inference_backends import encode_bucketed, load_model
+from model_manager import ModelLoadError, ModelManager
+
+
+# Frame: header length and payload length (big-endian uint32), JSON header, raw payload
+_FRAME = struct.Struct(">II")
+
+
+class InferenceUnavailableError(Exception):
+    """Raised when the inference server cannot be reached"""
+
+
+def pack_message(header: dict, payload: bytes = b"") -> bytes:
+    encoded = json.dumps(header).encode()
+    return _FRAME.pack(len(encoded), len(payload)) + encoded + payload
+
+
+async def read_message(reader: asyncio.StreamReader) -> Tuple[dict, bytes]:
+    header_length, payload_length = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+    header = json.loads(await reader.readexactly(header_length))
+    payload = await reader.readexactly(payload_length) if payload_length else b""
+    return header, payload
+
+
+class LocalEncoder:
+    """Models, micro-batchers and inference threads inside this process.
+
+    Used by the API when it encodes in-process, and by the inference server,
+    which shares one instance between all API workers.
+    """
+
+    def __init__(self, available_models: Dict[str, dict], artifacts_dir: str, memory_budget_bytes: int = 0,
+                 workers: int = 2, max_batch_size: int = 64, max_batch_tokens: int = 0,
+                 max_wait_ms: float = 5.0, max_queued_texts: int = 0):
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        # Models are loaded on first use (or prewarmed at startup) and the least
+        # recently used ones are evicted when the memory budget is exceeded
+        self.models = ModelManager(
+            available_models.keys(),
+            loader=lambda name: load_model(
+                name,
+                backend=available_models[name]["backend"],
+                intra_op_threads=available_models[name]["intra_op_threads"],
+                artifacts_dir=artifacts_dir,
+                max_seq_length=available_models[name]["max_seq_length"],
+            ),
+            encoder=encode_bucketed,
+            memory_budget_bytes=memory_budget_bytes,
+        )
+        # Encoding is CPU-bound and runs on a bounded pool of inference threads
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        # Encode requests are funneled through one batcher per model, so concurrent
+        # small requests (e.g. single-query searches) share a forward pass
+        self.batchers = BatcherRegistry(
+            lambda model_name: lambda texts: self._encode_batch(model_name, texts),
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            max_queued_texts=max_queued_texts,
+            executor=self.executor,
+            # Each model may use every inference thread
+            max_concurrent_batches=workers,
+        )
+        self.tokens: Dict[str, int] = {}
+        # _encode_batch runs on several inference threads at once
+        self._tokens_lock = threading.Lock()
+
+    def _encode_batch(self, model_name: str, texts: List[str]) -> np.ndarray:
+        """One forward-pass group for a model's batcher (runs on an inference thread)"""
+        stats = {}
+        embeddings = self.models.encode(model_name, texts, batch_size=self.max_batch_size,
+                                        max_batch_tokens=self.max_batch_tokens, stats=stats)
+        with self._tokens_lock:
+            self.tokens[model_name] = self.tokens.get(model_name, 0) + stats.get("tokens", 0)
+        return embeddings
+
+    async def encode(self, model_name: str, texts: List[str], priority: int = PRIORITY_INTERACTIVE) -> np.ndarray:
+        # Load outside the inference threads so a cold model doesn't stall other models' batches
+        await self.models.ensure_loaded(model_name)
+        return await self.batchers.encode(model_name, texts, priority=priority)
+
+    async def split(self, model_name: str, text: str, settings: ChunkingSettings) -> List[Chunk]:
+        """Chunk a document with the model's tokenizer (loads the model if needed)"""
+        loop = asyncio.get_running_loop()
+        model = await loop.run_in_executor(None, self.models.load, model_name)
+        return await loop.run_in_executor(None, split_document, text, model.tokenizer, settings,
+                                          model.max_seq_length)
+
+    async def prewarm(self, names: Iterable[str]):
+        await self.models.prewarm(names)
+
+    async def refresh_stats(self):
+        pass
+
+    def stats(self) -> dict:
+        with self._tokens_lock:
+            tokens = dict(self.tokens)
+        return {"models": self.models.stats(), "batching": self.batchers.stats(), "encode_tokens": tokens}
+
+    async def close(self):
+        await self.batchers.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _Connection:
+    """One multiplexed connection to the inference server; replies are matched to requests by id"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+        self._ids = itertools.count()
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task = asyncio.create_task(self._read_replies())
+
+    async def request(self, header: dict, payload: bytes = b"") -> Tuple[dict, bytes]:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self.writer.write(pack_message({**header, "id": request_id}, payload))
+            await self.writer.drain()
+            return await future
+        except (ConnectionError, OSError) as e:
+            self.closed = True
+            raise InferenceUnavailableError(f"Lost connection to the inference server: {e}") from e
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_replies(self):
+        error = "connection closed"
+        try:
+            while True:
+                header, payload = await read_message(self.reader)
+                future = self._pending.get(header.get("id"))
+                if future is not None and not future.done():
+                    future.set_result((header, payload))
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as e:
+            error = str(e) or error
+        finally:
+            self.closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(InferenceUnavailableError(f"Lost connection to the inference server: {error}"))
+
+    async def close(self):
+        self.closed = True
+        self._reader_task.cancel()
+        self.writer.close()
+
+
+class RemoteEncoder:
+    """Encodes through an inference server (see inference_server.py) over a Unix socket.
+
+    Same interface as LocalEncoder. No model is loaded in this process, so any
+    number of API workers share the server's single copy of each model, and
+    their concurrent requests are batched together there. Requests are spread
+    over a few persistent connections, reopened when they drop.
+    """
+
+    def __init__(self, socket_path: str, connections: int = 2, connect_timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.connect_timeout = connect_timeout
+        self._connections: List[Optional[_Connection]] = [None] * max(1, connections)
+        self._locks = [asyncio.Lock() for _ in self._connections]
+        self._next = itertools.count()
+        self._stats = {"models": {"memory_budget_mb": 0.0, "resident_mb": 0.0, "models": {}},
+                       "batching": {}, "encode_tokens": {}}
+
+    async def _connection(self) -> _Connection:
+        slot = next(self._next) % len(self._connections)
+        connection = self._connections[slot]
+        if connection is not None and not connection.closed:
+            return connection
+        async with self._locks[slot]:
+            connection = self._connections[slot]
+            if connection is None or connection.closed:
+                try:
+                    reader, writer = await asyncio.open_unix_connection(self.socket_path)
+                except (ConnectionError, OSError) as e:
+                    raise InferenceUnavailableError(
+                        f"Inference server not reachable at {self.socket_path}: {e}") from e
+                connection = self._connections[slot] = _Connection(reader, writer)
+        return connection
+
+    async def _call(self, header: dict, payload: bytes = b"") -> Tuple[dict, bytes]:
+        reply, reply_payload = await (await self._connection()).request(header, payload)
+        if "error" in reply:
+            if reply.get("kind") == "queue_full":
+                raise EncodeQueueFullError(reply["error"])
+            if reply.get("kind") == "model_load":
+                raise ModelLoadError(reply["error"])
+            raise RuntimeError(f"Inference server error: {reply['error']}")
+        return reply, reply_payload
+
+    async def encode(self, model_name: str, texts: List[str], priority: int = PRIORITY_INTERACTIVE) -> np.ndarray:
+        reply, payload = await self._call({"op": "encode", "model": model_name, "texts": texts, "priority": priority})
+        return np.frombuffer(payload, dtype=np.float32).reshape(reply["shape"])
+
+    async def split(self, model_name: str, text: str, settings: ChunkingSettings) -> List[Chunk]:
+        reply, _ = await self._call({"op": "split", "model": model_name, "text": text,
+                                     "settings": settings.model_dump()})
+        return [tuple(chunk) for chunk in reply["chunks"]]
+
+    async def prewarm(self, names: Iterable[str]):
+        """Ask the server to load models, waiting up to connect_timeout for it to come up"""
+        deadline = asyncio.get_running_loop().time() + self.connect_timeout
+        while True:
+            try:
+                await self._call({"op": "prewarm", "models": list(names)})
+                return
+            except InferenceUnavailableError as e:
+                if asyncio.get_running_loop().time() >= deadline:
+                    print(f"⚠️  {e}")
+                    return
+                await asyncio.sleep(0.5)
+
+    async def refresh_stats(self):
+        """Fetch the server's model and batching stats, which stats() then returns"""
+        try:
+            reply, _ = await self._call({"op": "stats"})
+            self._stats = reply["stats"]
+        except InferenceUnavailableError:
+            pass
+
+    def stats(self) -> dict:
+        return self._stats
+
+    async def close(self):
+        for connection in self._connections:
+            if connection is not None:
+                await connection.close()
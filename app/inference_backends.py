@@ -0,0 +1,259 @@
+import importlib.util
+import json
+import os
+import re
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+
+TORCH = "torch"
+ONNX = "onnx"  # ONNX Runtime, fp32
+INT8 = "int8"  # ONNX Runtime with dynamically int8-quantized weights
+BACKENDS = (TORCH, ONNX, INT8)
+
+EXPORT_INFO_FILE = "export.json"
+
+# Batches of one model run on several inference threads; a fast tokenizer
+# must not be called concurrently ("Already borrowed"), so tokenizing is serialized
+_TOKENIZE_LOCK = threading.Lock()
+
+
+def artifacts_path(artifacts_dir: str, model_name: str) -> str:
+    """Directory holding a model's exported ONNX files and tokenizer"""
+    return os.path.join(artifacts_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name).strip("_"))
+
+
+class OnnxSentenceEncoder:
+    """Runs an exported sentence-transformers model with ONNX Runtime.
+
+    Implements the parts of SentenceTransformer.encode() the service uses:
+    tokenize, run the transformer, pool (mean/cls/max) and optionally
+    normalize, returning float32 numpy arrays.
+    """
+
+    def __init__(self, directory: str, model_file: str, intra_op_threads: int = 0):
+        # Imported on first use so the API starts without loading the runtimes
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(directory, EXPORT_INFO_FILE)) as f:
+            info = json.load(f)
+        self.pooling = info["pooling"]
+        self.normalize = info["normalize"]
+        self.max_seq_length = info["max_seq_length"]
+        self.input_names = info["inputs"]
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+
+        options = onnxruntime.SessionOptions()
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        model_path = os.path.join(directory, model_file)
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        # Used by the model pool's memory accounting in place of torch parameters
+        self.memory_bytes = os.path.getsize(model_path)
+
+    def encode(self, sentences, batch_size: int = 32, normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts: List[str] = [sentences] if single else list(sentences)
+        outputs = [self._encode_batch(texts[i:i + batch_size], normalize_embeddings)
+                   for i in range(0, len(texts), batch_size)]
+        embeddings = np.concatenate(outputs) if outputs else np.zeros((0, 0), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, texts: List[str], normalize_embeddings: bool) -> np.ndarray:
+        return self.encode_features(self.tokenize(texts), normalize_embeddings)
+
+    def tokenize(self, texts: List[str]) -> dict:
+        return dict(self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_seq_length,
+                                   return_tensors="np"))
+
+    def encode_features(self, features: dict, normalize_embeddings: bool = False) -> np.ndarray:
+        """Embeddings of already tokenized (padded) input"""
+        inputs = {name: features[name].astype(np.int64) for name in self.input_names}
+        token_embeddings = self.session.run(None, inputs)[0]
+        mask = features["attention_mask"][..., None].astype(np.float32)
+        if self.pooling == "cls":
+            embeddings = token_embeddings[:, 0]
+        elif self.pooling == "max":
+            embeddings = np.where(mask > 0, token_embeddings, -1e9).max(axis=1)
+        else:
+            embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize or normalize_embeddings:
+            embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings.astype(np.float32)
+
+
+def export_onnx(model_name: str, directory: str):
+    """Export a sentence-transformers model's transformer to ONNX, plus its tokenizer and pooling settings"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    pooling = next((module for module in model if isinstance(module, Pooling)), None)
+    pooling_mode = pooling.get_pooling_mode_str() if pooling is not None else "mean"
+    if pooling_mode not in ("mean", "cls", "max"):
+        raise ValueError(f"Pooling mode '{pooling_mode}' is not supported by the ONNX backend")
+
+    os.makedirs(directory, exist_ok=True)
+    features = transformer.tokenizer(["export"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in features]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+
+    auto_model = transformer.auto_model.eval()
+
+    class _Wrapper(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = auto_model
+
+        def forward(self, *args):
+            return self.model(**dict(zip(input_names, args)), return_dict=True).last_hidden_state
+
+    tmp_path = os.path.join(directory, "model.onnx.tmp")
+    with torch.no_grad():
+        torch.onnx.export(
+            _Wrapper(), tuple(features[name] for name in input_names), tmp_path,
+            input_names=input_names, output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes, opset_version=14,
+        )
+    transformer.tokenizer.save_pretrained(directory)
+    with open(os.path.join(directory, EXPORT_INFO_FILE), "w") as f:
+        json.dump({
+            "model": model_name,
+            "pooling": pooling_mode,
+            "normalize": any(isinstance(module, Normalize) for module in model),
+            "max_seq_length": model.max_seq_length,
+            "inputs": input_names,
+        }, f)
+    # Written last, so a crashed export is redone on the next load
+    os.replace(tmp_path, os.path.join(directory, "model.onnx"))
+
+
+def quantize_int8(directory: str):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    tmp_path = os.path.join(directory, "model.int8.onnx.tmp")
+    quantize_dynamic(os.path.join(directory, "model.onnx"), tmp_path, weight_type=QuantType.QInt8)
+    os.replace(tmp_path, os.path.join(directory, "model.int8.onnx"))
+
+
+def tokenize(model, texts: List[str]) -> Optional[dict]:
+    """Model inputs of all texts from one tokenizer call, right-padded to the longest.
+
+    None for models that can't take pre-tokenized input; they tokenize in encode().
+    """
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None or not hasattr(model, "tokenize") or getattr(tokenizer, "padding_side", "right") != "right":
+        return None
+    with _TOKENIZE_LOCK:
+        return model.tokenize(texts)
+
+
+def token_lengths(model, texts: List[str], features: Optional[dict] = None) -> List[int]:
+    """Tokenized length of each text (after truncation to the model's max_seq_length)"""
+    if features is None:
+        features = tokenize(model, texts)
+    if features is None:
+        return [len(text) for text in texts]
+    return [int(length) for length in features["attention_mask"].sum(1)]
+
+
+def encode_features(model, features: dict) -> np.ndarray:
+    """Embeddings of tokenize() output, without tokenizing again"""
+    if isinstance(model, OnnxSentenceEncoder):
+        return model.encode_features(features)
+    import torch
+
+    model.eval()
+    with torch.no_grad():
+        output = model.forward({name: values.to(model.device) for name, values in features.items()})
+    return output["sentence_embedding"].float().cpu().numpy()
+
+
+def plan_batches(lengths: List[int], max_batch_tokens: int, max_batch_size: int) -> List[List[int]]:
+    """Group text indexes longest first, so a batch's padded size (count x longest) stays under max_batch_tokens"""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for index in sorted(range(len(lengths)), key=lambda i: -lengths[i]):
+        # Sorted descending, so the batch's first text is its longest
+        if current and (len(current) >= max_batch_size
+                        or (max_batch_tokens and (len(current) + 1) * lengths[current[0]] > max_batch_tokens)):
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def encode_bucketed(model, texts: List[str], max_batch_tokens: int = 0, batch_size: int = 64,
+                    stats: Optional[dict] = None, **kwargs) -> np.ndarray:
+    """Encode texts in length-sorted batches capped by padded token count; output keeps the input order.
+
+    Texts are tokenized once: each batch takes its rows of the padded input
+    and cuts the padding down to its own longest text. If given,
+    stats["tokens"] is set to the number of (unpadded) tokens encoded.
+    """
+    features = tokenize(model, texts) if texts and not kwargs else None
+    lengths = token_lengths(model, texts, features)
+    if stats is not None:
+        stats["tokens"] = sum(lengths)
+    if features is None and len(texts) <= 1:
+        return np.asarray(model.encode(texts, batch_size=batch_size, **kwargs), dtype=np.float32)
+    embeddings = None
+    for batch in plan_batches(lengths, max_batch_tokens, batch_size):
+        if features is None:
+            batch_embeddings = model.encode([texts[i] for i in batch], batch_size=len(batch), **kwargs)
+        else:
+            width = lengths[batch[0]]  # The batch's longest text
+            batch_embeddings = encode_features(model, {name: values[batch, :width]
+                                                       for name, values in features.items()})
+        batch_embeddings = np.asarray(batch_embeddings, dtype=np.float32)
+        if embeddings is None:
+            embeddings = np.empty((len(texts), batch_embeddings.shape[1]), dtype=np.float32)
+        embeddings[batch] = batch_embeddings
+    return embeddings
+
+
+def load_model(model_name: str, backend: str = TORCH, intra_op_threads: int = 0,
+               artifacts_dir: Optional[str] = None, max_seq_length: Optional[int] = None):
+    """Load a model for the given backend, exporting/quantizing on first use and caching the result"""
+    model = _load_backend(model_name, backend, intra_op_threads, artifacts_dir)
+    if max_seq_length:
+        # Longer inputs are truncated to this many tokens
+        model.max_seq_length = max_seq_length
+    return model
+
+
+def _load_backend(model_name: str, backend: str, intra_op_threads: int, artifacts_dir: Optional[str]):
+    if backend == TORCH:
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if intra_op_threads:
+            # torch's intra-op pool is process-wide
+            torch.set_num_threads(intra_op_threads)
+        return SentenceTransformer(model_name)
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}'. Use one of {list(BACKENDS)}.")
+    if importlib.util.find_spec("onnxruntime") is None:
+        raise RuntimeError(f"Backend '{backend}' requires the onnxruntime package")
+
+    directory = artifacts_path(artifacts_dir or "onnx", model_name)
+    if not os.path.exists(os.path.join(directory, "model.onnx")):
+        print(f"  📦 Exporting {model_name} to ONNX ({directory})...")
+        export_onnx(model_name, directory)
+    model_file = "model.onnx"
+    if backend == INT8:
+        model_file = "model.int8.onnx"
+        if not os.path.exists(os.path.join(directory, model_file)):
+            print(f"  📦 Quantizing {model_name} to int8...")
+            quantize_int8(directory)
+    return OnnxSentenceEncoder(directory, model_file, intra_op_threads)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Inference server: loads the embedding models once and encodes for every API worker.
+
+Run it next to `uvicorn main:app --workers N` with the same INFERENCE_SOCKET
+set for both. The API workers then load no models; they send encode and
+chunking requests over the Unix socket, and requests from all workers are
+micro-batched together here. HTTP concurrency (API workers) and inference
+threads (INFERENCE_WORKERS) are sized independently, and model memory does
+not grow with the number of API workers.
+
+Usage:
+    INFERENCE_SOCKET=/tmp/ragbase-inference.sock python inference_server.py
+"""
+import asyncio
+import os
+import signal
+
+import numpy as np
+
+from batching import EncodeQueueFullError, PRIORITY_INTERACTIVE
+from chunking import ChunkingSettings
+from inference import LocalEncoder, pack_message, read_message
+from model_manager import ModelLoadError
+from models_config import load_models_config
+
+
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET", "")
+MODELS_CONFIG_PATH = os.getenv("MODELS_CONFIG_PATH", "/app/models_config.yaml")
+ENCODE_BATCH_MAX_SIZE = int(os.getenv("ENCODE_BATCH_MAX_SIZE", "64"))
+ENCODE_BATCH_MAX_TOKENS = int(os.getenv("ENCODE_BATCH_MAX_TOKENS", "8192"))
+ENCODE_BATCH_MAX_WAIT_MS = float(os.getenv("ENCODE_BATCH_MAX_WAIT_MS", "5"))
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+ENCODE_MAX_QUEUED_TEXTS = int(os.getenv("ENCODE_MAX_QUEUED_TEXTS", "4096"))
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+MODEL_ARTIFACTS_DIR = os.getenv(
+    "MODEL_ARTIFACTS_DIR",
+    os.path.join(os.getenv("SENTENCE_TRANSFORMERS_HOME", os.path.expanduser("~/.cache")), "onnx"),
+)
+
+
+async def respond(encoder: LocalEncoder, header: dict, writer: asyncio.StreamWriter):
+    """Run one request and write its reply (tagged with the request id)"""
+    op = header.get("op")
+    reply, payload = {}, b""
+    try:
+        if op == "encode":
+            embeddings = await encoder.encode(header["model"], header["texts"],
+                                              priority=header.get("priority", PRIORITY_INTERACTIVE))
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+            reply, payload = {"shape": list(embeddings.shape)}, embeddings.tobytes()
+        elif op == "split":
+            chunks = await encoder.split(header["model"], header["text"], ChunkingSettings(**header["settings"]))
+            reply = {"chunks": chunks}
+        elif op == "prewarm":
+            await encoder.prewarm(header["models"])
+        elif op == "stats":
+            reply = {"stats": encoder.stats()}
+        else:
+            reply = {"error": f"Unknown op '{op}'", "kind": "invalid"}
+    except EncodeQueueFullError as e:
+        reply = {"error": str(e), "kind": "queue_full"}
+    except ModelLoadError as e:
+        reply = {"error": str(e), "kind": "model_load"}
+    except Exception as e:
+        reply = {"error": str(e), "kind": "error"}
+    if not writer.is_closing():
+        writer.write(pack_message({**reply, "id": header.get("id")}, payload))
+        await writer.drain()
+
+
+async def handle_connection(encoder: LocalEncoder, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Serve one API worker's connection; its requests run concurrently and may be answered out of order"""
+    tasks = set()
+    try:
+        while True:
+            header, _ = await read_message(reader)
+            task = asyncio.create_task(respond(encoder, header, writer))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        writer.close()
+
+
+async def serve(socket_path: str, encoder: LocalEncoder, prewarm_models):
+    if os.path.exists(socket_path):
+        os.remove(socket_path)  # Left over from a previous run
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: handle_connection(encoder, reader, writer), path=socket_path)
+    print(f"🧠 Inference server listening on {socket_path} ({INFERENCE_WORKERS} inference threads)")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    print(f"🔧 Prewarming embedding models: {prewarm_models}")
+    await encoder.prewarm(prewarm_models)
+    await stop.wait()
+
+    server.close()
+    await server.wait_closed()
+    await encoder.close()
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    print("👋 Inference server stopped")
+
+
+def main():
+    if not INFERENCE_SOCKET:
+        # Nothing to do: the API encodes in-process
+        print("ℹ️  INFERENCE_SOCKET is not set; models are served inside the API process")
+        return
+    available_models, _, prewarm_models = load_models_config(MODELS_CONFIG_PATH)
+    encoder = LocalEncoder(
+        available_models,
+        artifacts_dir=MODEL_ARTIFACTS_DIR,
+        memory_budget_bytes=int(MODEL_MEMORY_BUDGET_MB * 1024 * 1024),
+        workers=INFERENCE_WORKERS,
+        max_batch_size=ENCODE_BATCH_MAX_SIZE,
+        max_batch_tokens=ENCODE_BATCH_MAX_TOKENS,
+        max_wait_ms=ENCODE_BATCH_MAX_WAIT_MS,
+        max_queued_texts=ENCODE_MAX_QUEUED_TEXTS,
+    )
+    asyncio.run(serve(INFERENCE_SOCKET, encoder, prewarm_models))
+
+
+if __name__ == "__main__":
+    main()
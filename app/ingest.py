@@ -0,0 +1,281 @@
+import csv
+import fcntl
+import hashlib
+import io
+import json
+import os
+import re
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+
+# Namespace for deterministic point IDs of streamed rows: re-sending a row of
+# the same job overwrites its point instead of creating a duplicate
+INGEST_NAMESPACE = uuid.UUID("6f1c1b1e-3d4a-4c55-9a8e-2b7d0c9e5f10")
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+
+JOB_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+# Namespace for content-addressed point IDs: the same text under the same
+# source key always maps to the same point, so re-sending it is a no-op
+CONTENT_NAMESPACE = uuid.UUID("2a9d4c61-8b7e-4f3a-b0c5-7e1d9f6a3c28")
+
+
+def row_point_id(job_id: str, row: int) -> str:
+    return str(uuid.uuid5(INGEST_NAMESPACE, f"{job_id}:{row}"))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def content_point_id(text_hash: str, source_key: Optional[str] = None) -> str:
+    return str(uuid.uuid5(CONTENT_NAMESPACE, f"{source_key or ''}:{text_hash}"))
+
+
+def chunk_point_id(parent_id: str, chunk_index: int, text_hash: str) -> str:
+    """A chunk's ID: unique per position in its document, and new when the chunk's text changes"""
+    return str(uuid.uuid5(CONTENT_NAMESPACE, f"{parent_id}#{chunk_index}:{text_hash}"))
+
+
+def detect_format(content_type: Optional[str], requested: Optional[str] = None) -> str:
+    """Pick 'ndjson' or 'csv' from an explicit format or the Content-Type header"""
+    if requested:
+        requested = requested.lower()
+        if requested in ("ndjson", "jsonl"):
+            return "ndjson"
+        if requested == "csv":
+            return "csv"
+        raise ValueError(f"Unsupported ingest format '{requested}'. Use 'ndjson' or 'csv'.")
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in CSV_CONTENT_TYPES:
+        return "csv"
+    return "ndjson"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without buffering the whole body"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+
+async def iter_ndjson_documents(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    """Yield {"text", "metadata"} from NDJSON lines.
+
+    Each line is an object with a "text" field and either a "metadata" object
+    or extra top-level fields, which become metadata.
+    """
+    line_number = 0
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+        if not isinstance(record, dict) or not isinstance(record.get("text"), str):
+            raise ValueError(f"Line {line_number} must be an object with a string 'text' field")
+        metadata = record.get("metadata")
+        if not isinstance(metadata, dict):
+            metadata = {k: v for k, v in record.items() if k not in ("text", "metadata")}
+        yield {"text": record["text"], "metadata": metadata}
+
+
+async def iter_csv_documents(chunks: AsyncIterator[bytes], text_field: str = "text") -> AsyncIterator[dict]:
+    """Yield {"text", "metadata"} from CSV rows; the header names the columns.
+
+    Quoted fields may span lines. Every column other than text_field becomes metadata.
+    """
+    header: Optional[List[str]] = None
+    pending = ""
+    async for line in iter_lines(chunks):
+        pending = f"{pending}\n{line}" if pending else line
+        # An odd number of quotes means a quoted field continues on the next line
+        if pending.count('"') % 2 == 1:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader(io.StringIO(record)))
+        if header is None:
+            header = values
+            if text_field not in header:
+                raise ValueError(f"CSV header has no '{text_field}' column (columns: {header})")
+            continue
+        row = dict(zip(header, values))
+        text = row.pop(text_field, "")
+        yield {"text": text, "metadata": row}
+    if pending:
+        raise ValueError("CSV ended inside a quoted field")
+
+
+class IngestJob:
+    """Progress of one resumable ingest job"""
+
+    def __init__(self, job_id: str, collection: str, model: Optional[str] = None):
+        self.job_id = job_id
+        self.collection = collection
+        self.model = model
+        self.status = "created"
+        self.rows_read = 0
+        self.rows_committed = 0
+        self.batches_committed = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "collection": self.collection,
+            "model": self.model,
+            "status": self.status,
+            "rows_read": self.rows_read,
+            "rows_committed": self.rows_committed,
+            "batches_committed": self.batches_committed,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IngestJob":
+        job = cls(data["job_id"], data["collection"], data.get("model"))
+        job.update(data)
+        return job
+
+    def update(self, data: dict):
+        for field in ("model", "status", "rows_read", "rows_committed", "batches_committed", "error",
+                      "created_at", "updated_at"):
+            if field in data:
+                setattr(self, field, data[field])
+
+
+class IngestJobStore:
+    """Keeps ingest jobs in memory, and in JSON files under directory if one is configured.
+
+    With a directory, job files are re-read on every lookup so API workers see
+    each other's progress, and a running job holds an flock on its .lock file.
+    The lock is released when the process dies, so a job file still saying
+    "running" after a crash or restart is reported as "interrupted" and can
+    be resumed.
+    """
+
+    def __init__(self, directory: str = ""):
+        self.directory = directory
+        self._jobs: Dict[str, IngestJob] = {}
+        # Jobs running in this process -> their lock file descriptor (None without a directory)
+        self._active: Dict[str, Optional[int]] = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _read(self, job_id: str) -> Optional[IngestJob]:
+        try:
+            with open(self._path(job_id)) as f:
+                job = IngestJob.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️  Skipping unreadable ingest job file {job_id}.json: {e}")
+            return None
+        if job.status == "running" and not self.is_running(job_id):
+            job.status = "interrupted"
+        return job
+
+    def is_running(self, job_id: str) -> bool:
+        """Whether the job is running in this process or (with a directory) in another one"""
+        if job_id in self._active:
+            return True
+        if not self.directory:
+            return False
+        try:
+            lock = os.open(f"{self._path(job_id)}.lock", os.O_RDWR)
+        except FileNotFoundError:
+            return False
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return False
+        except BlockingIOError:
+            return True
+        finally:
+            os.close(lock)
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        if self.directory and job_id not in self._active:
+            job = self._read(job_id)
+            if job is not None:
+                self._jobs[job_id] = job
+            return job
+        return self._jobs.get(job_id)
+
+    def get_or_create(self, job_id: Optional[str], collection: str) -> Tuple[IngestJob, bool]:
+        """Return (job, created). A new job gets a random id when job_id is None."""
+        if job_id and not JOB_ID_PATTERN.match(job_id):
+            raise ValueError("job_id may only contain letters, digits, '.', '_' and '-' (max 128 characters)")
+        job = self.get(job_id) if job_id else None
+        if job is not None:
+            return job, False
+        job = IngestJob(job_id or str(uuid.uuid4()), collection)
+        self._jobs[job.job_id] = job
+        self.save(job)
+        return job, True
+
+    def start(self, job: IngestJob) -> bool:
+        """Claim the job for this process; False if it is already running here or in another worker"""
+        if job.job_id in self._active:
+            return False
+        lock = None
+        if self.directory:
+            lock = os.open(f"{self._path(job.job_id)}.lock", os.O_RDWR | os.O_CREAT)
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(lock)
+                return False
+            # Another worker may have made progress since the job was looked up
+            latest = self._read(job.job_id)
+            if latest is not None:
+                job.update(latest.to_dict())
+        self._active[job.job_id] = lock
+        self._jobs[job.job_id] = job
+        return True
+
+    def finish(self, job: IngestJob):
+        """Persist the job's final state and release it"""
+        try:
+            self.save(job)
+        finally:
+            lock = self._active.pop(job.job_id, None)
+            if lock is not None:
+                os.close(lock)
+
+    def save(self, job: IngestJob):
+        job.updated_at = time.time()
+        if not self.directory:
+            return
+        path = self._path(job.job_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(job.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    def list(self) -> List[IngestJob]:
+        if self.directory:
+            for filename in os.listdir(self.directory):
+                if filename.endswith(".json"):
+                    self.get(filename[:-len(".json")])
+        return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Stream a large NDJSON or CSV file into a collection via POST /ingest/{collection}.
+
+The file is read incrementally and sent in segments of --segment-rows rows.
+After each segment the number of committed rows is written to a local state
+file, so re-running the same command after a crash (of this script or of the
+service) resumes where the load stopped instead of starting over.
+
+Usage:
+    python ingest_cli.py foods.ndjson --collection foods
+    python ingest_cli.py foods.csv --collection foods --text-field description
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Iterator, Optional
+
+
+def iter_records(path: str, input_format: str, text_field: str) -> Iterator[dict]:
+    """Yield {"text", "metadata"} records from an NDJSON or CSV file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if input_format == "csv":
+            for row in csv.DictReader(f):
+                if text_field not in row:
+                    raise SystemExit(f"CSV has no '{text_field}' column")
+                text = row.pop(text_field) or ""
+                yield {"text": text, "metadata": row}
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if text_field != "text":
+                    record["text"] = record.pop(text_field, "")
+                if not isinstance(record.get("text"), str):
+                    raise SystemExit(f"Line {line_number} has no string '{text_field}' field")
+                yield record
+
+
+def request_json(url: str, method: str = "GET", body=None, headers: Optional[dict] = None,
+                 timeout: float = 3600.0):
+    request = urllib.request.Request(url, data=body, headers=headers or {}, method=method)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def fetch_job(base_url: str, job_id: str) -> Optional[dict]:
+    try:
+        return request_json(f"{base_url}/ingest/jobs/{urllib.parse.quote(job_id)}")
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+
+
+def load_state(path: str) -> dict:
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(path: str, state: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="NDJSON (.ndjson/.jsonl) or CSV (.csv) file")
+    parser.add_argument("--collection", required=True)
+    parser.add_argument("--base-url", default=os.getenv("RAG_API_URL", "http://localhost:8000"))
+    parser.add_argument("--model", help="Model for a new collection (existing collections keep theirs)")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Defaults to the file extension")
+    parser.add_argument("--text-field", default="text", help="Field/column holding the document text")
+    parser.add_argument("--batch-size", type=int, default=256, help="Documents per encode/upsert batch")
+    parser.add_argument("--segment-rows", type=int, default=50000, help="Rows sent per HTTP request")
+    parser.add_argument("--job-id", help="Defaults to a stable id derived from the file and collection")
+    parser.add_argument("--state-file", help="Defaults to <path>.ingest-state.json")
+    parser.add_argument("--retries", type=int, default=5, help="Retries per segment before giving up")
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip("/")
+    input_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    state_file = args.state_file or f"{args.path}.ingest-state.json"
+    job_id = args.job_id or hashlib.sha1(
+        f"{os.path.abspath(args.path)}:{args.collection}".encode()).hexdigest()[:16]
+
+    # The service's job is authoritative; the local state covers a service without INGEST_JOBS_DIR
+    state = load_state(state_file)
+    job = fetch_job(base_url, job_id)
+    committed = job["rows_committed"] if job else 0
+    if state.get("job_id") == job_id:
+        committed = max(committed, state.get("rows_committed", 0))
+    if committed:
+        print(f"↩️  Resuming job {job_id} at row {committed}")
+    else:
+        print(f"🚀 Starting job {job_id}")
+
+    started = time.perf_counter()
+    rows_at_start = committed
+    records = itertools.islice(iter_records(args.path, input_format, args.text_field), committed, None)
+    failures = 0
+    while True:
+        segment = list(itertools.islice(records, args.segment_rows))
+        if not segment:
+            break
+        body = "".join(json.dumps(record) + "\n" for record in segment).encode()
+        query = {"job_id": job_id, "start_row": committed, "batch_size": args.batch_size}
+        if args.model:
+            query["model"] = args.model
+        url = f"{base_url}/ingest/{urllib.parse.quote(args.collection)}?{urllib.parse.urlencode(query)}"
+        try:
+            result = request_json(url, method="POST", body=body,
+                                  headers={"Content-Type": "application/x-ndjson"})
+        except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+            failures += 1
+            detail = e.read().decode(errors="replace") if isinstance(e, urllib.error.HTTPError) else str(e)
+            if failures > args.retries:
+                raise SystemExit(f"❌ Giving up after {failures} failures: {detail}")
+            wait = min(60, 2 ** failures)
+            print(f"⚠️  Segment starting at row {committed} failed ({detail}); retrying in {wait}s")
+            time.sleep(wait)
+            # Re-sync with what the service actually committed, then re-read from there
+            job = fetch_job(base_url, job_id)
+            committed = job["rows_committed"] if job else committed
+            records = itertools.islice(iter_records(args.path, input_format, args.text_field), committed, None)
+            continue
+
+        failures = 0
+        committed = result["rows_committed"]
+        save_state(state_file, {"job_id": job_id, "collection": args.collection, "rows_committed": committed})
+        elapsed = time.perf_counter() - started
+        rate = (committed - rows_at_start) / elapsed if elapsed > 0 else 0.0
+        print(f"  ✅ {committed} rows committed ({rate:.0f} rows/s)")
+
+    print(f"🎉 Done: {committed} rows in collection '{args.collection}' (job {job_id})")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
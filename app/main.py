@@ -1,13 +1,48 @@
+import time
+
+# Startup timings reported by /readyz are measured from here
+STARTED_AT = time.monotonic()
+
+import asyncio
+import json
 import os
-import yaml
-from typing import List, Optional, Dict
-from fastapi import FastAPI, HTTPException
+from typing import Any, Iterable, List, Optional, Dict, Set
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from sentence_transformers import SentenceTransformer
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-import uuid
+from starlette.requests import ClientDisconnect
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, HasIdCondition, SearchParams
+from qdrant_client.models import FieldCondition, FilterSelector, MatchAny, PayloadSchemaType
+from qdrant_client.models import OverwritePayloadOperation, SetPayload
+from qdrant_client.models import NamedSparseVector, NamedVector, PointIdsList, SparseVectorParams
+from qdrant_client.models import SearchRequest as QdrantSearchRequest
+import numpy as np
+
+from model_manager import ModelLoadError
+from models_config import load_models_config
+from inference import InferenceUnavailableError, LocalEncoder, RemoteEncoder
+from batching import EncodeQueueFullError, PRIORITY_BULK, PRIORITY_INTERACTIVE
+from collection_registry import CollectionEntry, CollectionRegistry, TimedCache
+from embedding_cache import DiskEmbeddingStore, EmbeddingCache, model_cache_key, normalize_text
+from search_cache import SearchResultCache, SharedSearchStore, request_key
+import metrics
+import serialization
+from fusion import RRF_K, reciprocal_rank_fusion
+from collection_config import (
+    FULL_VECTOR_NAME, HnswSettings, OptimizerSettings, QuantizationSettings, ReductionSettings, describe_config,
+    estimate_memory, hnsw_config, optimizers_config, quantization_config, reduced_vectors_config, rescore_candidates,
+    search_params,
+)
+from ingest import IngestJobStore, detect_format, iter_csv_documents, iter_ndjson_documents, row_point_id
+from ingest import chunk_point_id, content_hash, content_point_id
+from chunking import ChunkingSettings
+import sparse
+from filters import INDEX_SCHEMAS, FilterError, PayloadIndexAdvisor, build_filter, filter_key
+from sparse import LENGTH_FIELD, SPARSE_VECTOR_NAME, TERM_STATS_SUFFIX, TermStats, term_stats_delta
+from warmup import Warmup
 
 app = FastAPI(title="RAG Service", version="1.0.0")
 
@@ -29,98 +64,264 @@ app.add_middleware(
 QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
 MODELS_CONFIG_PATH = os.getenv("MODELS_CONFIG_PATH", "/app/models_config.yaml")
+ENCODE_BATCH_MAX_SIZE = int(os.getenv("ENCODE_BATCH_MAX_SIZE", "64"))
+ENCODE_BATCH_MAX_TOKENS = int(os.getenv("ENCODE_BATCH_MAX_TOKENS", "8192"))
+ENCODE_BATCH_MAX_WAIT_MS = float(os.getenv("ENCODE_BATCH_MAX_WAIT_MS", "5"))
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+# Unix socket of a shared inference server (inference_server.py); unset = load models in this process
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET", "")
+ENCODE_MAX_QUEUED_TEXTS = int(os.getenv("ENCODE_MAX_QUEUED_TEXTS", "4096"))
+QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", "30"))
+COLLECTION_CACHE_TTL_SECONDS = float(os.getenv("COLLECTION_CACHE_TTL_SECONDS", "60"))
+COLLECTION_STATS_TTL_SECONDS = float(os.getenv("COLLECTION_STATS_TTL_SECONDS", "5"))
+EMBEDDING_CACHE_MAX_MB = float(os.getenv("EMBEDDING_CACHE_MAX_MB", "64"))
+EMBEDDING_CACHE_TTL_SECONDS = float(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "0"))
+EMBEDDING_CACHE_DISK_PATH = os.getenv("EMBEDDING_CACHE_DISK_PATH", "")
+SEARCH_CACHE_MAX_MB = float(os.getenv("SEARCH_CACHE_MAX_MB", "32"))
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "60"))
+SEARCH_CACHE_SHARED_PATH = os.getenv("SEARCH_CACHE_SHARED_PATH", "")
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+INGEST_JOBS_DIR = os.getenv("INGEST_JOBS_DIR", "")
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+# Exported ONNX / int8 models are cached here, next to the model cache
+MODEL_ARTIFACTS_DIR = os.getenv(
+    "MODEL_ARTIFACTS_DIR",
+    os.path.join(os.getenv("SENTENCE_TRANSFORMERS_HOME", os.path.expanduser("~/.cache")), "onnx"),
+)
+SEARCH_BATCH_MAX_QUERIES = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "100"))
+# Storage defaults for collections auto-created by /upsert and /ingest
+AUTO_COLLECTION_QUANTIZATION = os.getenv("AUTO_COLLECTION_QUANTIZATION", "")  # "", scalar, product or binary
+AUTO_COLLECTION_ON_DISK = os.getenv("AUTO_COLLECTION_ON_DISK", "false").lower() == "true"
+AUTO_COLLECTION_HYBRID = os.getenv("AUTO_COLLECTION_HYBRID", "false").lower() == "true"
+# Metadata field holding the tenant id matched by the `tenant` search/info parameter
+TENANT_FIELD = os.getenv("TENANT_FIELD", "tenant_id")
+# Filters on the same field of a collection before it gets a payload index (0 = only declared indexes)
+PAYLOAD_INDEX_AUTO_THRESHOLD = int(os.getenv("PAYLOAD_INDEX_AUTO_THRESHOLD", "20"))
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
 
-# Load models configuration from YAML file
-print(f"📄 Loading models configuration from: {MODELS_CONFIG_PATH}")
-try:
-    with open(MODELS_CONFIG_PATH, 'r') as f:
-        config = yaml.safe_load(f)
-        models_config = config.get('models', [])
-except FileNotFoundError:
-    print(f"⚠️  Config file not found at {MODELS_CONFIG_PATH}, using default model")
-    models_config = [{
-        "name": "all-MiniLM-L6-v2",
-        "dimension": 384,
-        "description": "Fast and efficient, good for general purpose",
-        "default": True
-    }]
-except Exception as e:
-    print(f"❌ Error loading config: {e}, using default model")
-    models_config = [{
-        "name": "all-MiniLM-L6-v2",
-        "dimension": 384,
-        "description": "Fast and efficient, good for general purpose",
-        "default": True
-    }]
-
-# Build AVAILABLE_MODELS dictionary from config
-AVAILABLE_MODELS = {}
-DEFAULT_MODEL = None
-
-for model_config in models_config:
-    model_name = model_config['name']
-    AVAILABLE_MODELS[model_name] = {
-        "name": model_name,
-        "dimension": model_config['dimension'],
-        "description": model_config['description']
-    }
-    if model_config.get('default', False):
-        DEFAULT_MODEL = model_name
+if METRICS_ENABLED:
+    # Request latency, in-flight requests and per-stage timings for /metrics
+    app.add_middleware(metrics.MetricsMiddleware)
 
-# Set first model as default if none specified
-if DEFAULT_MODEL is None and AVAILABLE_MODELS:
-    DEFAULT_MODEL = list(AVAILABLE_MODELS.keys())[0]
+AVAILABLE_MODELS, DEFAULT_MODEL, PREWARM_MODELS = load_models_config(MODELS_CONFIG_PATH)
 
-print(f"📋 Available models: {list(AVAILABLE_MODELS.keys())}")
-print(f"🎯 Default model: {DEFAULT_MODEL}")
+if INFERENCE_SOCKET:
+    # Models live in a separate inference server shared by all API workers
+    print(f"🧠 Encoding via inference server at {INFERENCE_SOCKET}")
+    encoder = RemoteEncoder(INFERENCE_SOCKET)
+else:
+    encoder = LocalEncoder(
+        AVAILABLE_MODELS,
+        artifacts_dir=MODEL_ARTIFACTS_DIR,
+        memory_budget_bytes=int(MODEL_MEMORY_BUDGET_MB * 1024 * 1024),
+        workers=INFERENCE_WORKERS,
+        max_batch_size=ENCODE_BATCH_MAX_SIZE,
+        max_batch_tokens=ENCODE_BATCH_MAX_TOKENS,
+        max_wait_ms=ENCODE_BATCH_MAX_WAIT_MS,
+        max_queued_texts=ENCODE_MAX_QUEUED_TEXTS,
+    )
 
-# Load all models at startup
-print("🔧 Loading embedding models...")
-models: Dict[str, SentenceTransformer] = {}
-for model_name, model_info in AVAILABLE_MODELS.items():
-    print(f"  Loading {model_name}...")
-    try:
-        models[model_name] = SentenceTransformer(model_name)
-        print(f"  ✅ {model_name} loaded! Dimension: {model_info['dimension']}")
-    except Exception as e:
-        print(f"  ❌ Failed to load {model_name}: {e}")
+# Async client so vector store I/O never blocks the event loop
+qdrant = AsyncQdrantClient(host=QDRANT_HOST, port=QDRANT_PORT, timeout=QDRANT_TIMEOUT)
 
-if not models:
-    raise RuntimeError("❌ No models could be loaded! Check your configuration.")
+# Cache of query/embed vectors keyed by (model, normalized text); optionally
+# persisted to disk so it survives restarts
+embedding_cache = EmbeddingCache(
+    max_bytes=int(EMBEDDING_CACHE_MAX_MB * 1024 * 1024),
+    ttl_seconds=EMBEDDING_CACHE_TTL_SECONDS,
+    disk=DiskEmbeddingStore(EMBEDDING_CACHE_DISK_PATH) if EMBEDDING_CACHE_DISK_PATH else None,
+)
 
-print(f"✅ Successfully loaded {len(models)}/{len(AVAILABLE_MODELS)} models!")
+# Rendered /search responses, invalidated per collection whenever it is written
+# to; optionally shared by all workers through a SQLite file
+search_cache = SearchResultCache(
+    max_bytes=int(SEARCH_CACHE_MAX_MB * 1024 * 1024),
+    ttl_seconds=SEARCH_CACHE_TTL_SECONDS,
+    shared=SharedSearchStore(SEARCH_CACHE_SHARED_PATH) if SEARCH_CACHE_SHARED_PATH else None,
+)
 
-qdrant = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+# Progress of streaming ingest jobs (persisted to INGEST_JOBS_DIR if set)
+ingest_jobs = IngestJobStore(INGEST_JOBS_DIR)
 
 # Helper functions
-def get_model(model_name: Optional[str] = None) -> tuple[SentenceTransformer, str, int]:
-    """Get model instance, name, and dimension. Returns default if model_name is None."""
+def get_model(model_name: Optional[str] = None) -> tuple[str, int]:
+    """Get model name and dimension. Returns default if model_name is None.
+
+    The model itself is loaded lazily the first time something is encoded with it.
+    """
     if model_name is None:
         model_name = DEFAULT_MODEL
     
-    if model_name not in models:
+    if model_name not in AVAILABLE_MODELS:
         raise HTTPException(
             status_code=400, 
-            detail=f"Model '{model_name}' not available. Available models: {list(models.keys())}"
+            detail=f"Model '{model_name}' not available. Available models: {list(AVAILABLE_MODELS)}"
         )
     
-    return models[model_name], model_name, AVAILABLE_MODELS[model_name]["dimension"]
+    return model_name, AVAILABLE_MODELS[model_name]["dimension"]
 
 
-def get_collection_metadata(collection_name: str) -> Optional[dict]:
-    """Retrieve collection metadata including model info"""
+async def encode_texts(model_name: str, texts: List[str], priority: int = PRIORITY_INTERACTIVE,
+                       use_cache: bool = True) -> np.ndarray:
+    """Encode texts with the given model via its micro-batching scheduler.
+
+    With use_cache, repeated texts are served from the embedding cache and only
+    the misses are encoded. Raises a 503 when the model's encode queue is full
+    so clients back off.
+    """
+    metrics.set_model(model_name)
+    if not texts:
+        return np.empty((0, AVAILABLE_MODELS.get(model_name, {}).get("dimension", 0)), dtype=np.float32)
+    with metrics.stage("encode"):
+        return await _encode_cached(model_name, texts, priority, use_cache)
+
+
+async def _encode_cached(model_name: str, texts: List[str], priority: int, use_cache: bool) -> np.ndarray:
+    if not use_cache or not embedding_cache.enabled:
+        return await _encode_batched(model_name, texts, priority)
+
+    info = AVAILABLE_MODELS.get(model_name, {})
+    cache_key = model_cache_key(model_name, info.get("backend", ""), info.get("max_seq_length"))
+    normalized = [normalize_text(text) for text in texts]
+    cached = await embedding_cache.get_many(cache_key, list(dict.fromkeys(normalized)))
+    missing = [text for text in dict.fromkeys(normalized) if text not in cached]
+    if missing:
+        started = time.perf_counter()
+        vectors = await _encode_batched(model_name, missing, priority)
+        embedding_cache.record_encode(cache_key, time.perf_counter() - started, len(missing))
+        await embedding_cache.put_many(cache_key, missing, vectors)
+        cached.update(zip(missing, np.asarray(vectors, dtype=np.float32)))
+    return np.stack([cached[text] for text in normalized])
+
+
+async def _encode_batched(model_name: str, texts: List[str], priority: int) -> np.ndarray:
+    try:
+        return await encoder.encode(model_name, texts, priority=priority)
+    except EncodeQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except (ModelLoadError, InferenceUnavailableError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+async def load_collection(collection_name: str) -> Optional[CollectionEntry]:
+    """Read a collection's metadata point from Qdrant. Returns None if the collection doesn't exist.
+
+    Any other Qdrant error (timeout, auth, connection) propagates.
+    """
     try:
         # Use a special UUID for metadata: all zeros
         metadata_id = "00000000-0000-0000-0000-000000000000"
-        result = qdrant.retrieve(
+        result = await qdrant.retrieve(
             collection_name=collection_name,
             ids=[metadata_id]
         )
-        if result and len(result) > 0:
-            return result[0].payload
-    except:
-        pass
-    return None
+    except UnexpectedResponse as e:
+        if e.status_code == 404:
+            return None
+        raise
+    except ValueError as e:
+        # Local-mode Qdrant reports a missing collection as a ValueError
+        if "not found" in str(e):
+            return None
+        raise
+    return CollectionEntry(collection_name, result[0].payload if result else None)
+
+
+# Collection existence and model metadata, cached so requests don't pay a
+# Qdrant round trip just to look up the collection's model
+collection_registry = CollectionRegistry(load_collection, ttl_seconds=COLLECTION_CACHE_TTL_SECONDS)
+
+# Point counts / collection config and offset->cursor positions for browsing,
+# kept briefly so paging through /info doesn't repeat that work on every page
+collection_stats_cache = TimedCache(COLLECTION_STATS_TTL_SECONDS)
+page_cursor_cache = TimedCache(COLLECTION_STATS_TTL_SECONDS * 12, max_entries=4096)
+
+# BM25 statistics of hybrid collections live in a companion collection (see
+# sparse.term_stats_collection): totals under METADATA_ID, one point per term.
+# The cached totals and looked-up terms are updated in place by this worker's
+# writes and re-read after the TTL, which bounds drift from other workers.
+METADATA_ID = "00000000-0000-0000-0000-000000000000"
+term_stats_cache = TimedCache(COLLECTION_CACHE_TTL_SECONDS)
+term_stats_locks: Dict[str, asyncio.Lock] = {}
+
+
+def collection_changed(collection_name: str):
+    """Forget derived per-collection state after points were written or the collection was deleted"""
+    collection_stats_cache.invalidate_collection(collection_name)
+    page_cursor_cache.invalidate_collection(collection_name)
+    search_cache.bump(collection_name)
+
+
+async def get_collection_metadata(collection_name: str) -> Optional[dict]:
+    """Retrieve collection metadata including model info"""
+    with metrics.stage("metadata"):
+        entry = await collection_registry.get(collection_name)
+    return entry.metadata if entry else None
+
+
+async def collection_is_hybrid(collection_name: str) -> bool:
+    """Whether the collection stores BM25 sparse vectors next to the dense ones"""
+    metadata = await get_collection_metadata(collection_name)
+    return bool(metadata) and metadata.get("sparse") == SPARSE_VECTOR_NAME
+
+
+async def get_reduction(collection_name: str) -> Optional[dict]:
+    """Reduction settings of a collection whose indexed vector is truncated, else None"""
+    metadata = await get_collection_metadata(collection_name)
+    return metadata.get("reduction") if metadata else None
+
+
+async def read_term_stats(collection_name: str, indices: Iterable[int], with_totals: bool) -> tuple:
+    """Stored (totals payload, {term index: df}) of a hybrid collection; missing terms have df 0"""
+    indices = list(indices)
+    records = await qdrant.retrieve(collection_name=sparse.term_stats_collection(collection_name),
+                                    ids=([METADATA_ID] if with_totals else []) + indices, with_payload=True)
+    stored = {record.id: record.payload for record in records}
+    df = {index: stored.get(index, {}).get("df", 0) for index in indices}
+    return stored.get(METADATA_ID, {}), df
+
+
+async def get_term_stats(collection_name: str, indices: Iterable[int] = ()) -> TermStats:
+    """BM25 totals plus the document frequency of the given terms, reading only what isn't cached"""
+    stats = term_stats_cache.get(collection_name)
+    missing = {index for index in indices if stats is None or index not in stats.df}
+    if stats is None or missing:
+        totals, df = await read_term_stats(collection_name, missing, with_totals=stats is None)
+        if stats is None:
+            stats = TermStats(totals.get("documents", 0), totals.get("total_length", 0))
+            term_stats_cache.set(collection_name, stats)
+        stats.df.update(df)
+    return stats
+
+
+async def update_term_stats(collection_name: str, added=(), removed=()):
+    """Apply added/removed documents to the stored BM25 statistics.
+
+    Read-modify-write of the totals point and of the points of the terms
+    involved only, serialized per collection within this worker. Concurrent
+    writers in other workers can drop each other's increments; IDF only
+    needs to be approximately right.
+    """
+    documents, total_length, delta = term_stats_delta(added, removed)
+    delta = {index: change for index, change in delta.items() if change}
+    if not documents and not total_length and not delta:
+        return
+    stats_collection = sparse.term_stats_collection(collection_name)
+    async with term_stats_locks.setdefault(collection_name, asyncio.Lock()):
+        totals, df = await read_term_stats(collection_name, delta, with_totals=True)
+        documents = max(0, totals.get("documents", 0) + documents)
+        total_length = max(0, totals.get("total_length", 0) + total_length)
+        df = {index: max(0, count + delta[index]) for index, count in df.items()}
+        await qdrant.upsert(collection_name=stats_collection, points=[
+            PointStruct(id=METADATA_ID, vector={}, payload={"documents": documents, "total_length": total_length}),
+            *(PointStruct(id=index, vector={}, payload={"df": count}) for index, count in df.items() if count),
+        ])
+        emptied = [index for index, count in df.items() if not count]
+        if emptied:
+            await qdrant.delete(collection_name=stats_collection, points_selector=PointIdsList(points=emptied))
+    stats = term_stats_cache.get(collection_name)
+    if stats is not None:
+        stats.update(documents, total_length, df)
 
 
 # Request/Response Models
@@ -138,17 +339,28 @@ class EmbedResponse(BaseModel):
 class Document(BaseModel):
     text: str
     metadata: Optional[dict] = None
+    key: Optional[str] = None  # Caller's source key (e.g. file path); part of the point ID
 
 
 class CreateCollectionRequest(BaseModel):
     model: Optional[str] = None  # If None, uses default model
     distance: str = "cosine"
+    quantization: Optional[QuantizationSettings] = None
+    hnsw: Optional[HnswSettings] = None
+    on_disk: bool = False  # Keep original vectors on disk (memory-mapped)
+    on_disk_payload: bool = False
+    optimizers: Optional[OptimizerSettings] = None
+    hybrid: bool = False  # Also store BM25 sparse vectors, for keyword + semantic (hybrid) search
+    reduction: Optional[ReductionSettings] = None  # Index a truncated vector, rescore with the full one
+    payload_indexes: Dict[str, str] = {}  # Metadata field -> index type (keyword, integer, float, bool, datetime, text)
 
 
 class UpsertRequest(BaseModel):
     collection: str
     documents: List[Document]
     model: Optional[str] = None  # Only used when creating new collection; must match existing collection's model
+    replace: bool = False  # Remove points of the documents' keys that are not in this request
+    chunking: Optional[ChunkingSettings] = None  # Split documents server-side with the model's tokenizer
 
 
 class SearchRequest(BaseModel):
@@ -157,9 +369,119 @@ class SearchRequest(BaseModel):
     limit: int = 5
     score_threshold: Optional[float] = None
     model: Optional[str] = None  # Must match collection's model if specified; validation enforced
+    with_vectors: bool = False  # Return the query vector and each hit's vector
+    payload_fields: Optional[List[str]] = None  # Metadata fields to return; None = all
+    hnsw_ef: Optional[int] = None  # Search-time candidate list; higher = better recall, slower
+    exact: bool = False  # Brute-force search, bypassing the HNSW index
+    rescore: Optional[bool] = None  # Re-rank quantized candidates with the original vectors
+    oversampling: Optional[float] = None  # Fetch limit * oversampling quantized candidates before rescoring
+    filter: Optional[Dict[str, Any]] = None  # Metadata conditions, applied inside the vector search
+    tenant: Optional[str] = None  # Only documents whose TENANT_FIELD equals this
+    hybrid: Optional[bool] = None  # Fuse dense and BM25 results; defaults to on for hybrid collections
+    hybrid_candidates: Optional[int] = None  # Hits taken from each retriever before fusion (default: max(2 * limit, 20))
+    rrf_k: int = RRF_K
+
+
+class BatchSearchQuery(BaseModel):
+    query: str
+    collection: Optional[str] = None  # Defaults to the batch's collection
+    limit: Optional[int] = None  # Defaults to the batch's limit
+    score_threshold: Optional[float] = None
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str | BatchSearchQuery]
+    collection: Optional[str] = None  # Default collection for queries that don't name one
+    limit: int = 5
+    score_threshold: Optional[float] = None
+    model: Optional[str] = None  # Must match each collection's model if specified
+    with_vectors: bool = False
+    payload_fields: Optional[List[str]] = None
+    fusion: Optional[str] = None  # "rrf" merges all queries' hits into one deduplicated list
+    rrf_k: int = RRF_K
+    hnsw_ef: Optional[int] = None
+    exact: bool = False
+    rescore: Optional[bool] = None
+    oversampling: Optional[float] = None
+    filter: Optional[Dict[str, Any]] = None  # Applied to every query
+    tenant: Optional[str] = None
 
 
 # API Endpoints
+# Model loading and the Qdrant connection happen in the background after the
+# server starts listening; /readyz reports when they are done
+warmup = Warmup(STARTED_AT, PREWARM_MODELS)
+warmup_task: Optional[asyncio.Task] = None
+
+
+async def connect_qdrant():
+    """Wait until Qdrant answers (it may still be starting), then cache collection metadata"""
+    warmup.start("qdrant")
+    delay = 0.5
+    while True:
+        try:
+            names = [c.name for c in (await qdrant.get_collections()).collections
+                     if not c.name.endswith(TERM_STATS_SUFFIX)]
+            break
+        except Exception as e:
+            if "qdrant" not in warmup.errors:
+                print(f"⏳ Waiting for Qdrant: {e}")
+            warmup.errors["qdrant"] = str(e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 5.0)
+    try:
+        await collection_registry.warm(names)
+        print(f"📚 Cached metadata for {len(names)} collections")
+    except Exception as e:
+        print(f"⚠️  Could not warm collection cache: {e}")
+    warmup.finish("qdrant")
+
+
+async def warm_model(model_name: str):
+    """Load a model and run one dummy forward pass, so the first request doesn't pay for lazy initialization"""
+    step = f"model:{model_name}"
+    warmup.start(step)
+    while True:
+        try:
+            await encoder.prewarm([model_name])
+            await encoder.encode(model_name, ["warmup"])
+            warmup.finish(step)
+            print(f"🔥 {model_name} warmed up in {warmup.step_seconds[step]:.1f}s")
+            return
+        except InferenceUnavailableError as e:
+            # The inference server is still starting
+            warmup.errors[step] = str(e)
+            await asyncio.sleep(1.0)
+        except Exception as e:
+            warmup.finish(step, error=str(e))
+            print(f"⚠️  Warmup of {model_name} failed: {e}")
+            return
+
+
+async def run_warmup():
+    await asyncio.gather(connect_qdrant(), *(warm_model(name) for name in PREWARM_MODELS))
+    phases = ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in warmup.phases.items())
+    print(f"✅ Ready ({phases})")
+
+
+@app.on_event("startup")
+async def startup():
+    global warmup_task
+    warmup.mark("serving")
+    print(f"🔧 Warming up in the background: {PREWARM_MODELS}")
+    warmup_task = asyncio.create_task(run_warmup())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await encoder.close()
+    embedding_cache.close()
+    search_cache.close()
+    await qdrant.close()
+
+
 @app.get("/")
 async def root():
     return {
@@ -167,19 +489,38 @@ async def root():
         "available_models": list(AVAILABLE_MODELS.keys()),
         "default_model": DEFAULT_MODEL,
         "models_info": AVAILABLE_MODELS,
-        "status": "ready"
+        "status": "ready" if warmup.ready else "warming_up"
     }
 
 
+@app.get("/livez")
+async def livez():
+    """Liveness: the process is up and serving requests (models may still be loading)"""
+    return {"status": "alive", "uptime_seconds": round(warmup.elapsed(), 3)}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: 200 once Qdrant is connected and the prewarmed models are loaded and warmed up, else 503"""
+    status = warmup.status()
+    if not status["ready"]:
+        raise HTTPException(status_code=503, detail={"status": "warming_up", **status})
+    return {"status": "ready", **status}
+
+
 @app.get("/health")
 async def health():
     try:
-        qdrant.get_collections()
+        await qdrant.get_collections()
+        await encoder.refresh_stats()
+        statuses = encoder.stats()["models"]["models"]
         return {
             "status": "healthy",
             "qdrant": "connected",
-            "models_loaded": len(models),
-            "default_model": DEFAULT_MODEL
+            "inference": "server" if INFERENCE_SOCKET else "in-process",
+            "models_loaded": sum(status["state"] == "loaded" for status in statuses.values()),
+            "default_model": DEFAULT_MODEL,
+            "models": statuses
         }
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Service unhealthy: {str(e)}")
@@ -188,39 +529,213 @@ async def health():
 @app.get("/models")
 async def list_models():
     """List all available embedding models"""
+    await encoder.refresh_stats()
+    model_stats = encoder.stats()["models"]
     return {
         "models": [
             {
                 "name": name,
                 "dimension": info["dimension"],
                 "description": info["description"],
-                "is_default": name == DEFAULT_MODEL
+                "backend": info["backend"],
+                "is_default": name == DEFAULT_MODEL,
+                **model_stats["models"].get(name, {})
             }
             for name, info in AVAILABLE_MODELS.items()
         ],
-        "default_model": DEFAULT_MODEL
+        "default_model": DEFAULT_MODEL,
+        "memory_budget_mb": round(MODEL_MEMORY_BUDGET_MB, 1),
+        "resident_mb": model_stats["resident_mb"]
+    }
+
+
+@app.get("/stats")
+async def stats():
+    """Runtime statistics for tuning (queue depth, batch sizes, timings)"""
+    await encoder.refresh_stats()
+    inference_stats = encoder.stats()
+    return {
+        "models": inference_stats["models"],
+        "batching": inference_stats["batching"],
+        "collections": collection_registry.stats(),
+        "collection_stats_cache": collection_stats_cache.stats(),
+        "page_cursor_cache": page_cursor_cache.stats(),
+        "embedding_cache": embedding_cache.stats(),
+        "search_cache": search_cache.stats()
+    }
+
+
+def collect_component_metrics() -> List[str]:
+    """Prometheus samples read from the batchers', caches' and model pool's own counters"""
+    inference_stats = encoder.stats()
+    batching, tokens = inference_stats["batching"], inference_stats["encode_tokens"]
+    lines = metrics.render_histogram(
+        "ragbase_encode_batch_size", "Texts per encode forward-pass group", ("model",),
+        [((name,), [(float(bucket), count) for bucket, count in batcher["batch_size_histogram"].items()],
+          batcher["texts_total"], batcher["batches_total"])
+         for name, batcher in batching.items()])
+    lines += metrics.render_samples(
+        "ragbase_encode_tokens_total", "Tokens encoded (after truncation)", "counter", ("model",),
+        [((name,), count) for name, count in tokens.items()])
+    lines += metrics.render_samples(
+        "ragbase_encode_seconds_total", "Time spent in encode forward passes", "counter", ("model",),
+        [((name,), batcher["encode_seconds_total"]) for name, batcher in batching.items()])
+    lines += metrics.render_samples(
+        "ragbase_encode_tokens_per_second", "Encode throughput since start (tokens / encode seconds)", "gauge",
+        ("model",), [((name,), tokens.get(name, 0) / batcher["encode_seconds_total"])
+                     for name, batcher in batching.items() if batcher["encode_seconds_total"]])
+    lines += metrics.render_samples(
+        "ragbase_encode_queued_texts", "Texts waiting in a model's encode queue", "gauge", ("model",),
+        [((name,), batcher["queued_texts"]) for name, batcher in batching.items()])
+    lines += metrics.render_samples(
+        "ragbase_encode_rejected_total", "Encode requests rejected because the queue was full", "counter",
+        ("model",), [((name,), batcher["rejected_total"]) for name, batcher in batching.items()])
+
+    caches = {
+        "embedding": embedding_cache.stats(),
+        "search": search_cache.stats(),
+        "collections": collection_registry.stats(),
+        "collection_stats": collection_stats_cache.stats(),
+        "page_cursor": page_cursor_cache.stats(),
     }
+    lines += metrics.render_samples("ragbase_cache_hits_total", "Cache hits", "counter", ("cache",),
+                                    [((name,), cache["hits"]) for name, cache in caches.items()])
+    lines += metrics.render_samples("ragbase_cache_misses_total", "Cache misses", "counter", ("cache",),
+                                    [((name,), cache["misses"]) for name, cache in caches.items()])
+    lines += metrics.render_samples("ragbase_cache_hit_ratio", "Cache hit rate since start", "gauge", ("cache",),
+                                    [((name,), cache["hit_rate"]) for name, cache in caches.items()])
+
+    lines += metrics.render_samples(
+        "ragbase_ready", "1 once startup warmup has finished", "gauge", (), [((), int(warmup.ready))])
+    lines += metrics.render_samples(
+        "ragbase_startup_seconds", "Seconds from process start until a startup phase was reached", "gauge",
+        ("phase",), [((phase,), seconds) for phase, seconds in warmup.phases.items()])
+
+    statuses = inference_stats["models"]["models"]
+    lines += metrics.render_samples(
+        "ragbase_model_loaded", "1 if the model is resident", "gauge", ("model",),
+        [((name,), int(status["state"] == "loaded")) for name, status in statuses.items()])
+    lines += metrics.render_samples(
+        "ragbase_model_resident_bytes", "Estimated memory held by a loaded model", "gauge", ("model",),
+        [((name,), int(status["memory_mb"] * 1024 * 1024)) for name, status in statuses.items()])
+    return lines
+
+
+metrics.registry.add_collector(collect_component_metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition of request, stage, batching, cache and model metrics"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=false)")
+    # Model and batching stats come from the inference server when encoding there
+    await encoder.refresh_stats()
+    return Response(metrics.registry.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.post("/embed", response_model=EmbedResponse)
-async def embed(request: EmbedRequest):
-    """Generate embeddings for text(s)"""
-    model, model_name, dimension = get_model(request.model)
+async def embed(request: EmbedRequest, http_request: Request):
+    """Generate embeddings for text(s).
+
+    Send Accept: application/msgpack or application/vnd.ragbase.base64+json to
+    get vectors as little-endian float32 bytes / base64 instead of float lists.
+    """
+    response_format = serialization.negotiate(http_request.headers.get("accept"))
+    model_name, dimension = get_model(request.model)
     texts = [request.text] if isinstance(request.text, str) else request.text
-    embeddings = model.encode(texts).tolist()
+    embeddings = await encode_texts(model_name, texts)
     
-    return EmbedResponse(
-        embeddings=embeddings,
-        model=model_name,
-        dimension=dimension
+    return serialization.render({
+        "embeddings": serialization.encode_vectors(embeddings, response_format),
+        "model": model_name,
+        "dimension": dimension
+    }, response_format)
+
+
+async def create_collection_with_metadata(collection_name: str, model_name: str, dimension: int,
+                                          distance: Distance, distance_name: str,
+                                          config: CreateCollectionRequest):
+    """Create a Qdrant collection with the requested storage settings, plus its metadata point"""
+    if collection_name.endswith(TERM_STATS_SUFFIX):
+        raise HTTPException(status_code=400, detail=f"Collection names ending in '{TERM_STATS_SUFFIX}' are reserved")
+    unknown = {field: schema for field, schema in config.payload_indexes.items() if schema not in INDEX_SCHEMAS}
+    if unknown:
+        raise HTTPException(status_code=400,
+                            detail=f"Unknown payload index types {unknown}. Use one of {list(INDEX_SCHEMAS)}.")
+    reduction = config.reduction
+    if reduction is not None and not 0 < reduction.dimension < dimension:
+        raise HTTPException(status_code=400,
+                            detail=f"reduction.dimension must be between 1 and {dimension - 1} for this model")
+    if reduction is not None and reduction.oversampling < 1:
+        raise HTTPException(status_code=400, detail="reduction.oversampling must be at least 1")
+    if reduction is None:
+        vectors_config = VectorParams(size=dimension, distance=distance, on_disk=config.on_disk or None)
+    else:
+        # Quantization goes on the indexed vector only, not on the full vectors kept for rescoring
+        vectors_config = reduced_vectors_config(dimension, distance, reduction, config.on_disk,
+                                                quantization_config(config.quantization))
+    await qdrant.create_collection(
+        collection_name=collection_name,
+        vectors_config=vectors_config,
+        on_disk_payload=config.on_disk_payload or None,
+        hnsw_config=hnsw_config(config.hnsw),
+        optimizers_config=optimizers_config(config.optimizers),
+        quantization_config=quantization_config(config.quantization) if reduction is None else None,
+        sparse_vectors_config={SPARSE_VECTOR_NAME: SparseVectorParams()} if config.hybrid else None,
     )
+    
+    # Store model info in collection metadata (using payload in a special document)
+    # This allows us to retrieve the model later
+    # Use a special UUID for metadata: all zeros
+    metadata_id = "00000000-0000-0000-0000-000000000000"
+    metadata = {
+        "_is_metadata": True,
+        "model": model_name,
+        "dimension": dimension,
+        "distance": distance_name
+    }
+    vector = [0.0] * dimension
+    if reduction is not None:
+        metadata["reduction"] = reduction.model_dump()
+        vector = {"": [0.0] * reduction.dimension, FULL_VECTOR_NAME: vector}
+    if config.hybrid:
+        metadata["sparse"] = SPARSE_VECTOR_NAME
+        await qdrant.recreate_collection(collection_name=sparse.term_stats_collection(collection_name),
+                                         vectors_config={})
+        term_stats_cache.invalidate_collection(collection_name)
+    await qdrant.upsert(
+        collection_name=collection_name,
+        points=[
+            PointStruct(
+                id=metadata_id,
+                vector=vector,
+                payload=dict(metadata)
+            )
+        ]
+    )
+    # Lets replace-by-key upserts find a source's stale chunks without a full scan
+    await qdrant.create_payload_index(
+        collection_name=collection_name,
+        field_name="_source_key",
+        field_schema=PayloadSchemaType.KEYWORD,
+    )
+    # Declared indexes, plus the tenant field since tenant filters are on most queries when used
+    declared = {TENANT_FIELD: PayloadSchemaType.KEYWORD,
+                **{field: INDEX_SCHEMAS[schema] for field, schema in config.payload_indexes.items()}}
+    created = await create_payload_indexes(collection_name, declared)
+    payload_indexes.forget(collection_name)
+    payload_indexes.mark_indexed(collection_name, created)
+    collection_registry.set(collection_name, metadata)
+    collection_changed(collection_name)
+    return metadata
 
 
 @app.post("/collections/{collection_name}")
 async def create_collection(collection_name: str, config: CreateCollectionRequest):
     """Create a new collection with specified model"""
     try:
-        _, model_name, dimension = get_model(config.model)
+        model_name, dimension = get_model(config.model)
         
         # Map distance metric
         distance_map = {
@@ -230,38 +745,23 @@ async def create_collection(collection_name: str, config: CreateCollectionReques
         }
         distance = distance_map.get(config.distance.lower(), Distance.COSINE)
         
-        qdrant.create_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(size=dimension, distance=distance),
-        )
-        
-        # Store model info in collection metadata (using payload in a special document)
-        # This allows us to retrieve the model later
-        # Use a special UUID for metadata: all zeros
-        metadata_id = "00000000-0000-0000-0000-000000000000"
-        qdrant.upsert(
-            collection_name=collection_name,
-            points=[
-                PointStruct(
-                    id=metadata_id,
-                    vector=[0.0] * dimension,
-                    payload={
-                        "_is_metadata": True,
-                        "model": model_name,
-                        "dimension": dimension,
-                        "distance": config.distance
-                    }
-                )
-            ]
-        )
+        await create_collection_with_metadata(collection_name, model_name, dimension, distance,
+                                              config.distance, config)
         
         return {
             "status": "created",
             "collection": collection_name,
             "model": model_name,
             "dimension": dimension,
-            "distance": config.distance
+            "distance": config.distance,
+            "quantization": config.quantization.type if config.quantization else None,
+            "on_disk": config.on_disk,
+            "hybrid": config.hybrid,
+            "reduction": config.reduction.model_dump() if config.reduction else None,
+            "payload_indexes": config.payload_indexes
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -269,124 +769,255 @@ async def create_collection(collection_name: str, config: CreateCollectionReques
 @app.get("/collections")
 async def list_collections():
     """List all collections"""
-    collections = qdrant.get_collections()
-    return {"collections": [c.name for c in collections.collections]}
+    collections = await qdrant.get_collections()
+    # BM25 statistics of hybrid collections are internal
+    return {"collections": [c.name for c in collections.collections if not c.name.endswith(TERM_STATS_SUFFIX)]}
 
 
-@app.get("/collections/{collection_name}/info")
-async def get_collection_info(collection_name: str, limit: int = 100, offset: int = 0):
-    """Get collection information and browse documents"""
+# Excludes the all-zeros metadata point from scrolls server-side
+NOT_METADATA_FILTER = Filter(must_not=[HasIdCondition(has_id=["00000000-0000-0000-0000-000000000000"])])
+
+# Marks an offset that lies past the end of the collection
+_END_OF_COLLECTION = object()
+
+# Fields filtered on often enough get a payload index, created in the background
+payload_indexes = PayloadIndexAdvisor(PAYLOAD_INDEX_AUTO_THRESHOLD)
+background_tasks = set()
+
+
+def request_filter(collection_name: str, conditions: Optional[Dict[str, Any]], tenant: Optional[str]) -> Filter:
+    """Qdrant filter for a request's metadata conditions and tenant, excluding the metadata point"""
     try:
-        # Get collection metadata (model info) first
-        metadata = get_collection_metadata(collection_name)
-        collection_model = metadata.get("model", "unknown") if metadata else "unknown"
+        query_filter, fields = build_filter(conditions, tenant, TENANT_FIELD, NOT_METADATA_FILTER)
+    except FilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    due = payload_indexes.record(collection_name, fields)
+    if due:
+        task = asyncio.create_task(create_payload_indexes(collection_name, due))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+    return query_filter
+
+
+async def create_payload_indexes(collection_name: str, fields: Dict[str, PayloadSchemaType]) -> Set[str]:
+    """Create payload indexes; returns the fields indexed. Failed fields are left for the advisor to retry."""
+    created = set()
+    for field, schema in fields.items():
+        try:
+            await qdrant.create_payload_index(collection_name=collection_name, field_name=field, field_schema=schema)
+            created.add(field)
+            print(f"🗂️  Created {schema.value} payload index on {collection_name}.{field}")
+        except Exception as e:
+            payload_indexes.mark_failed(collection_name, field)
+            print(f"⚠️  Could not create payload index on {collection_name}.{field}: {e}")
+    collection_stats_cache.invalidate_collection(collection_name)
+    return created
+
+
+def parse_cursor(cursor: str):
+    """Turn a next_cursor value back into a Qdrant point id (integer or UUID string)"""
+    return int(cursor) if cursor.isdigit() else cursor
+
+
+def record_to_document(record) -> dict:
+    return {
+        "id": str(record.id),
+        "text": record.payload.get("text", ""),
+        "metadata": {k: v for k, v in record.payload.items() if k != "text" and not k.startswith("_")}
+    }
+
+
+async def get_collection_stats(collection_name: str, metadata: Optional[dict]) -> dict:
+    """Point count and collection config, cached briefly so paging doesn't re-fetch them per page"""
+    stats = collection_stats_cache.get(collection_name)
+    if stats is not None:
+        return stats
+
+    # Get point count using the count API (more reliable)
+    count_result = await qdrant.count(collection_name=collection_name)
+    points_count = count_result.count if hasattr(count_result, 'count') else 0
+    
+    # Subtract 1 for metadata point if it exists
+    if metadata:
+        points_count = max(0, points_count - 1)
+    
+    # Try to get detailed collection info, but handle parsing errors gracefully
+    try:
+        collection_info = await qdrant.get_collection(collection_name=collection_name)
+        status = collection_info.status.name if hasattr(collection_info, 'status') else "green"
         
-        # Get point count using the count API (more reliable)
-        count_result = qdrant.count(collection_name=collection_name)
-        points_count = count_result.count if hasattr(count_result, 'count') else 0
+        # Safely extract vector config
+        vector_size = 384  # default
+        distance_metric = "COSINE"  # default
         
-        # Subtract 1 for metadata point if it exists
-        if metadata:
-            points_count = max(0, points_count - 1)
+        if hasattr(collection_info, 'config') and hasattr(collection_info.config, 'params'):
+            if hasattr(collection_info.config.params, 'vectors'):
+                vector_config = collection_info.config.params.vectors
+                if isinstance(vector_config, dict):
+                    # Named vectors (hybrid or reduced): the unnamed one is the indexed vector
+                    vector_config = vector_config.get("")
+                if hasattr(vector_config, 'size'):
+                    vector_size = vector_config.size
+                if hasattr(vector_config, 'distance') and hasattr(vector_config.distance, 'name'):
+                    distance_metric = vector_config.distance.name
         
-        # Get sample documents using scroll (exclude metadata)
-        # Note: Qdrant's scroll uses cursor-based pagination, not offset-based
-        # We need to scroll through records until we reach the desired offset, then collect limit items
-        metadata_id = "00000000-0000-0000-0000-000000000000"
+        indexed_vectors_count = points_count
+        if hasattr(collection_info, 'indexed_vectors_count') and collection_info.indexed_vectors_count is not None:
+            indexed_vectors_count = max(0, collection_info.indexed_vectors_count - (1 if metadata else 0))
         
-        # Scroll through records and skip until we reach the offset
-        documents = []
-        records_seen = 0
-        next_page_offset = None
+        segments_count = 0
+        if hasattr(collection_info, 'segments') and collection_info.segments:
+            segments_count = len(collection_info.segments)
         
-        while len(documents) < limit:
-            # Fetch a batch of records (use larger batches for efficiency)
-            batch_size = 100
-            records, next_page_offset = qdrant.scroll(
-                collection_name=collection_name,
-                limit=batch_size,
-                offset=next_page_offset,
-                with_payload=True,
-                with_vectors=False
-            )
-            
-            if not records:
-                break  # No more records
-            
-            # Process each record in the batch
-            for record in records:
-                # Skip metadata record
-                if str(record.id) == metadata_id or record.payload.get("_is_metadata", False):
-                    continue
-                
-                # Skip records until we reach the offset
-                if records_seen < offset:
-                    records_seen += 1
-                    continue
-                
-                # Collect records for the result
-                if len(documents) < limit:
-                    documents.append({
-                        "id": str(record.id),
-                        "text": record.payload.get("text", ""),
-                        "metadata": {k: v for k, v in record.payload.items() if k != "text" and not k.startswith("_")}
-                    })
-                    records_seen += 1
-                else:
-                    break  # We have enough documents
-            
-            # If we have enough documents or reached the end, stop
-            if len(documents) >= limit or next_page_offset is None:
-                break
+        config = describe_config(collection_info)
+        memory = estimate_memory(config, points_count, vector_size)
         
-        # Try to get detailed collection info, but handle parsing errors gracefully
-        try:
-            collection_info = qdrant.get_collection(collection_name=collection_name)
-            status = collection_info.status.name if hasattr(collection_info, 'status') else "green"
-            
-            # Safely extract vector config
-            vector_size = 384  # default
-            distance_metric = "COSINE"  # default
-            
-            if hasattr(collection_info, 'config') and hasattr(collection_info.config, 'params'):
-                if hasattr(collection_info.config.params, 'vectors'):
-                    vector_config = collection_info.config.params.vectors
-                    if hasattr(vector_config, 'size'):
-                        vector_size = vector_config.size
-                    if hasattr(vector_config, 'distance') and hasattr(vector_config.distance, 'name'):
-                        distance_metric = vector_config.distance.name
-            
-            indexed_vectors_count = points_count
-            if hasattr(collection_info, 'indexed_vectors_count') and collection_info.indexed_vectors_count is not None:
-                indexed_vectors_count = max(0, collection_info.indexed_vectors_count - (1 if metadata else 0))
+    except Exception as info_error:
+        print(f"Warning: Could not parse full collection info: {info_error}")
+        # Use defaults if we can't get detailed info
+        status = "green"
+        vector_size = metadata.get("dimension", 384) if metadata else 384
+        distance_metric = metadata.get("distance", "cosine").upper() if metadata else "COSINE"
+        indexed_vectors_count = points_count
+        segments_count = 0
+        config = None
+        memory = None
+
+    stats = {
+        "points_count": points_count,
+        "status": status,
+        "vector_size": vector_size,
+        "distance_metric": distance_metric,
+        "indexed_vectors_count": indexed_vectors_count,
+        "segments_count": segments_count,
+        "config": config,
+        "memory": memory,
+    }
+    collection_stats_cache.set(collection_name, stats)
+    return stats
+
+
+async def find_offset_cursor(collection_name: str, offset: int, scroll_filter: Filter = NOT_METADATA_FILTER,
+                             filter_id: str = ""):
+    """Return the point id at which the document at `offset` starts (None = start of collection).
+
+    Starts from the closest cursor remembered from earlier pages and skips the
+    rest with id-only scrolls, so sequential offset paging costs O(limit)
+    and random access never downloads payloads it throws away. Cursors are
+    remembered per filter (filter_id, see filters.filter_key).
+    """
+    if offset <= 0:
+        return None
+    cached = page_cursor_cache.get((collection_name, filter_id, offset))
+    if cached is not None:
+        return cached
+    start_offset, cursor = 0, None
+    for (_, cached_filter, cached_offset), cached_cursor in page_cursor_cache.items_for(collection_name):
+        if cached_filter == filter_id and start_offset < cached_offset <= offset:
+            start_offset, cursor = cached_offset, cached_cursor
+
+    remaining = offset - start_offset
+    while remaining > 0:
+        if cursor is _END_OF_COLLECTION:
+            break
+        records, next_page_offset = await qdrant.scroll(
+            collection_name=collection_name,
+            scroll_filter=scroll_filter,
+            limit=min(remaining, 1000),
+            offset=cursor,
+            with_payload=False,
+            with_vectors=False
+        )
+        remaining -= len(records)
+        cursor = next_page_offset if next_page_offset is not None else _END_OF_COLLECTION
+    if remaining > 0:
+        return _END_OF_COLLECTION
+    page_cursor_cache.set((collection_name, filter_id, offset), cursor)
+    return cursor
+
+
+@app.get("/collections/{collection_name}/info")
+async def get_collection_info(collection_name: str, limit: int = 100, offset: int = 0,
+                              cursor: Optional[str] = None, filter: Optional[str] = None,
+                              tenant: Optional[str] = None):
+    """Get collection information and browse documents.
+
+    Pages can be fetched by offset, or by passing the previous response's
+    next_cursor as cursor (Qdrant's scroll offset), which costs O(limit)
+    regardless of how deep the page is. filter (JSON, same conditions as
+    /search) and tenant restrict the documents listed.
+    """
+    try:
+        conditions = json.loads(filter) if filter else None
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"filter is not valid JSON: {e}")
+    if conditions is not None and not isinstance(conditions, dict):
+        raise HTTPException(status_code=400, detail="filter must be a JSON object")
+    # Check existence before request_filter counts the filter towards a payload index
+    with metrics.stage("metadata"):
+        entry = await collection_registry.get(collection_name)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Collection '{collection_name}' not found")
+    scroll_filter = request_filter(collection_name, conditions, tenant)
+    filter_id = filter_key(conditions, tenant)
+    try:
+        metadata = entry.metadata
+        collection_model = metadata.get("model", "unknown") if metadata else "unknown"
+        
+        with metrics.stage("vector_store"):
+            stats = await get_collection_stats(collection_name, metadata)
             
-            segments_count = 0
-            if hasattr(collection_info, 'segments') and collection_info.segments:
-                segments_count = len(collection_info.segments)
+            # Qdrant's scroll is cursor-based; translate an offset into a cursor if needed
+            start = (parse_cursor(cursor) if cursor
+                     else await find_offset_cursor(collection_name, offset, scroll_filter, filter_id))
             
-        except Exception as info_error:
-            print(f"Warning: Could not parse full collection info: {info_error}")
-            # Use defaults if we can't get detailed info
-            status = "green"
-            vector_size = metadata.get("dimension", 384) if metadata else 384
-            distance_metric = metadata.get("distance", "cosine").upper() if metadata else "COSINE"
-            indexed_vectors_count = points_count
-            segments_count = 0
+            matched_count = None
+            if filter_id:
+                matched_count = collection_stats_cache.get((collection_name, filter_id))
+                if matched_count is None:
+                    matched_count = (await qdrant.count(collection_name=collection_name, count_filter=scroll_filter,
+                                                        exact=True)).count
+                    collection_stats_cache.set((collection_name, filter_id), matched_count)
+        
+        documents = []
+        next_cursor = None
+        if start is not _END_OF_COLLECTION and limit > 0:
+            with metrics.stage("vector_store"):
+                records, next_page_offset = await qdrant.scroll(
+                    collection_name=collection_name,
+                    scroll_filter=scroll_filter,
+                    limit=limit,
+                    offset=start,
+                    with_payload=True,
+                    with_vectors=False
+                )
+            documents = [record_to_document(record) for record in records]
+            if next_page_offset is not None:
+                next_cursor = str(next_page_offset)
+                if not cursor:
+                    # Remember where the next page starts so paging by offset stays cheap
+                    page_cursor_cache.set((collection_name, filter_id, offset + len(documents)), next_page_offset)
         
         return {
             "collection": collection_name,
             "model": collection_model,
-            "vectors_count": points_count,
-            "points_count": points_count,
-            "status": status,
-            "vector_size": vector_size,
-            "distance_metric": distance_metric,
-            "indexed_vectors_count": indexed_vectors_count,
-            "segments_count": segments_count,
-            "optimizer_status": 20000,  # Default indexing threshold
+            "vectors_count": stats["points_count"],
+            "points_count": stats["points_count"],
+            "status": stats["status"],
+            "vector_size": stats["vector_size"],
+            "distance_metric": stats["distance_metric"],
+            "indexed_vectors_count": stats["indexed_vectors_count"],
+            "segments_count": stats["segments_count"],
+            "optimizer_status": ((stats["config"] or {}).get("optimizers") or {}).get("indexing_threshold", 20000),
+            "config": stats["config"],
+            "memory": stats["memory"],
+            "payload_indexes": (stats["config"] or {}).get("payload_indexes", {}),
+            "matched_count": matched_count,
             "documents": documents,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "cursor": cursor,
+            "next_cursor": next_cursor
         }
     except Exception as e:
         # More detailed error logging
@@ -396,165 +1027,811 @@ async def get_collection_info(collection_name: str, limit: int = 100, offset: in
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/upsert")
-async def upsert_documents(request: UpsertRequest):
-    """Add documents to a collection"""
-    try:
-        # Check if collection exists
-        collections = [c.name for c in qdrant.get_collections().collections]
+@app.get("/collections/{collection_name}/export")
+async def export_collection(collection_name: str, with_vectors: bool = False, batch_size: int = 256):
+    """Stream every document in the collection as NDJSON, one scroll page at a time"""
+    if await collection_registry.get(collection_name) is None:
+        raise HTTPException(status_code=404, detail=f"Collection '{collection_name}' not found")
+
+    async def generate():
+        next_page_offset = None
+        while True:
+            records, next_page_offset = await qdrant.scroll(
+                collection_name=collection_name,
+                scroll_filter=NOT_METADATA_FILTER,
+                limit=max(1, batch_size),
+                offset=next_page_offset,
+                with_payload=True,
+                with_vectors=with_vectors
+            )
+            lines = []
+            for record in records:
+                document = record_to_document(record)
+                if with_vectors:
+                    document["vector"] = dense_vector(record.vector)
+                lines.append(json.dumps(document))
+            if lines:
+                yield "\n".join(lines) + "\n"
+            if next_page_offset is None:
+                break
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{collection_name}.ndjson"'}
+    )
+
+
+async def resolve_collection_model(collection_name: str, requested_model: Optional[str]) -> tuple[str, int]:
+    """Return (model_name, dimension) for writing to a collection, creating the collection if needed.
+
+    A new collection uses the requested model (or the default). An existing
+    collection MUST keep its model, so requesting a different one is a 400.
+    """
+    # Check if collection exists
+    with metrics.stage("metadata"):
+        collection = await collection_registry.get(collection_name)
+    
+    # Determine which model to use
+    if collection is None:
+        # New collection - use specified model or default
+        model_name, dimension = get_model(requested_model)
         
-        # Determine which model to use
-        if request.collection not in collections:
-            # New collection - use specified model or default
-            model, model_name, dimension = get_model(request.model)
+        # Create collection with metadata, using the configured storage defaults
+        await create_collection_with_metadata(
+            collection_name, model_name, dimension, Distance.COSINE, "cosine",
+            CreateCollectionRequest(
+                model=model_name,
+                quantization=(QuantizationSettings(type=AUTO_COLLECTION_QUANTIZATION)
+                              if AUTO_COLLECTION_QUANTIZATION else None),
+                on_disk=AUTO_COLLECTION_ON_DISK,
+                hybrid=AUTO_COLLECTION_HYBRID,
+            ),
+        )
+    else:
+        # Existing collection - MUST use collection's model
+        metadata = collection.metadata
+        
+        if metadata and metadata.get("model"):
+            collection_model = metadata["model"]
             
-            # Create collection with metadata
-            qdrant.create_collection(
-                collection_name=request.collection,
-                vectors_config=VectorParams(size=dimension, distance=Distance.COSINE),
-            )
+            # Check if user is trying to override with a different model
+            if requested_model and requested_model != collection_model:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Cannot change embedding model for existing collection. "
+                           f"Collection '{collection_name}' uses model '{collection_model}'. "
+                           f"You requested '{requested_model}'. "
+                           f"To use a different model, create a new collection."
+                )
             
-            # Store metadata
-            # Use a special UUID for metadata: all zeros
-            metadata_id = "00000000-0000-0000-0000-000000000000"
-            qdrant.upsert(
-                collection_name=request.collection,
+            # Use collection's model
+            model_name, dimension = get_model(collection_model)
+        else:
+            # Collection exists but has no metadata (legacy collection)
+            # Use default model but warn
+            model_name, dimension = get_model(None)
+            print(f"⚠️  Warning: Collection '{collection_name}' has no model metadata. Using default: {model_name}")
+    
+    return model_name, dimension
+
+
+async def retrieve_payloads(collection_name: str, point_ids: List[str], chunk_size: int = 1000) -> Dict[str, dict]:
+    """Payloads of the given points that exist, keyed by point ID"""
+    chunks = [point_ids[i:i + chunk_size] for i in range(0, len(point_ids), chunk_size)]
+    results = await asyncio.gather(*(
+        qdrant.retrieve(collection_name=collection_name, ids=chunk, with_payload=True, with_vectors=False)
+        for chunk in chunks
+    ))
+    return {str(record.id): record.payload for records in results for record in records}
+
+
+async def delete_stale_points(collection_name: str, source_keys: List[str], keep_ids: List[str]) -> int:
+    """Delete points of the given source keys that are not in keep_ids; returns how many were removed"""
+    stale_filter = Filter(
+        must=[FieldCondition(key="_source_key", match=MatchAny(any=source_keys))],
+        must_not=[HasIdCondition(has_id=keep_ids)],
+    )
+    stale = (await qdrant.count(collection_name=collection_name, count_filter=stale_filter, exact=True)).count
+    if stale:
+        removed = await stale_term_counts(collection_name, stale_filter) if await collection_is_hybrid(collection_name) else []
+        await qdrant.delete(collection_name=collection_name, points_selector=FilterSelector(filter=stale_filter))
+        if removed:
+            await update_term_stats(collection_name, removed=removed)
+    return stale
+
+
+async def stale_term_counts(collection_name: str, points_filter: Filter) -> List[tuple]:
+    """(term indexes, length) of the points about to be deleted, read back from their sparse vectors"""
+    removed = []
+    offset = None
+    while True:
+        records, offset = await qdrant.scroll(
+            collection_name=collection_name,
+            scroll_filter=points_filter,
+            limit=1000,
+            offset=offset,
+            with_payload=[LENGTH_FIELD],
+            with_vectors=[SPARSE_VECTOR_NAME]
+        )
+        removed.extend(record_term_counts(record) for record in records)
+        if offset is None:
+            return removed
+
+
+async def overwritten_term_counts(collection_name: str, point_ids: List[str]) -> List[tuple]:
+    """(term indexes, length) of the points about to be overwritten, so rewritten rows aren't counted twice"""
+    records = await qdrant.retrieve(collection_name=collection_name, ids=point_ids,
+                                    with_payload=[LENGTH_FIELD], with_vectors=[SPARSE_VECTOR_NAME])
+    return [record_term_counts(record) for record in records]
+
+
+def record_term_counts(record) -> tuple:
+    vector = (record.vector or {}).get(SPARSE_VECTOR_NAME)
+    return vector.indices if vector else [], record.payload.get(LENGTH_FIELD, 0)
+
+
+async def point_vectors(collection_name: str, texts: List[str], embeddings: List[List[float]]) -> tuple:
+    """Vectors of new points in the collection's layout, and the BM25 term counts to add (hybrid only).
+
+    Plain collections store the embedding as their only vector. Reduced
+    collections index its leading components and keep all of it as "full";
+    hybrid collections add a BM25 sparse vector.
+    """
+    metadata = await get_collection_metadata(collection_name) or {}
+    reduction = metadata.get("reduction")
+    hybrid = metadata.get("sparse") == SPARSE_VECTOR_NAME
+    if reduction is None and not hybrid:
+        return embeddings, None
+    if reduction is None:
+        vectors = [{"": embedding} for embedding in embeddings]
+    else:
+        vectors = [{"": embedding[:reduction["dimension"]], FULL_VECTOR_NAME: embedding} for embedding in embeddings]
+    if not hybrid:
+        return vectors, None
+
+    counts = [sparse.term_counts(text) for text in texts]
+    avg_length = (await get_term_stats(collection_name)).avg_length
+    if not avg_length:
+        # First documents of the collection: normalize by this batch's average
+        avg_length = sum(sum(c.values()) for c in counts) / max(1, len(counts))
+    for vector, document in zip(vectors, counts):
+        vector[SPARSE_VECTOR_NAME] = sparse.document_vector(document, avg_length)
+    return vectors, counts
+
+
+def document_payload(doc: Document, text: str, text_hash: str) -> dict:
+    payload = {"text": text, **(doc.metadata or {}), "_content_hash": text_hash}
+    if doc.key is not None:
+        payload["_source_key"] = doc.key
+    return payload
+
+
+async def write_points(collection_name: str, model_name: str, payloads: Dict[str, dict]) -> tuple[int, int]:
+    """Store content-addressed points, encoding only text that isn't stored yet.
+
+    Returns (inserted, updated); points whose stored payload differs only get
+    the payload overwritten. Hybrid collections also get BM25 vectors.
+    """
+    hybrid = await collection_is_hybrid(collection_name)
+    if hybrid:
+        for payload in payloads.values():
+            payload[LENGTH_FIELD] = sum(sparse.term_counts(payload["text"]).values())
+    with metrics.stage("vector_store"):
+        existing = await retrieve_payloads(collection_name, list(payloads))
+    new_ids = [point_id for point_id in payloads if point_id not in existing]
+    changed_ids = [point_id for point_id in payloads
+                   if point_id in existing and existing[point_id] != payloads[point_id]]
+    
+    if new_ids:
+        texts = [payloads[point_id]["text"] for point_id in new_ids]
+        embeddings = (await encode_texts(model_name, texts, priority=PRIORITY_BULK, use_cache=False)).tolist()
+        embeddings, counts = await point_vectors(collection_name, texts, embeddings)
+        with metrics.stage("vector_store"):
+            await qdrant.upsert(
+                collection_name=collection_name,
                 points=[
-                    PointStruct(
-                        id=metadata_id,
-                        vector=[0.0] * dimension,
-                        payload={
-                            "_is_metadata": True,
-                            "model": model_name,
-                            "dimension": dimension,
-                            "distance": "cosine"
-                        }
-                    )
+                    PointStruct(id=point_id, vector=embedding, payload=payloads[point_id])
+                    for point_id, embedding in zip(new_ids, embeddings)
                 ]
             )
-        else:
-            # Existing collection - MUST use collection's model
-            metadata = get_collection_metadata(request.collection)
-            
-            if metadata and metadata.get("model"):
-                collection_model = metadata["model"]
-                
-                # Check if user is trying to override with a different model
-                if request.model and request.model != collection_model:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Cannot change embedding model for existing collection. "
-                               f"Collection '{request.collection}' uses model '{collection_model}'. "
-                               f"You requested '{request.model}'. "
-                               f"To use a different model, create a new collection."
-                    )
-                
-                # Use collection's model
-                model, model_name, dimension = get_model(collection_model)
-            else:
-                # Collection exists but has no metadata (legacy collection)
-                # Use default model but warn
-                model, model_name, dimension = get_model(None)
-                print(f"⚠️  Warning: Collection '{request.collection}' has no model metadata. Using default: {model_name}")
+            if counts:
+                await update_term_stats(collection_name, added=counts)
+    if changed_ids:
+        with metrics.stage("vector_store"):
+            await qdrant.batch_update_points(
+                collection_name=collection_name,
+                update_operations=[
+                    OverwritePayloadOperation(overwrite_payload=SetPayload(payload=payloads[point_id], points=[point_id]))
+                    for point_id in changed_ids
+                ]
+            )
+    return len(new_ids), len(changed_ids)
+
+
+@app.post("/upsert")
+async def upsert_documents(request: UpsertRequest):
+    """Add documents to a collection.
+
+    Point IDs are derived from each document's text and key, so documents
+    already stored unchanged are skipped without re-encoding, and documents
+    whose text is stored but whose metadata changed only get their payload
+    updated. With replace=true, other points with the same keys are removed.
+
+    With chunking, each document is split with the model's tokenizer and its
+    chunks are encoded and written in batches of INGEST_BATCH_SIZE as they
+    are produced; each chunk records its parent_id and character offsets.
+    """
+    try:
+        model_name, dimension = await resolve_collection_model(request.collection, request.model)
         
-        # Generate embeddings
-        texts = [doc.text for doc in request.documents]
-        embeddings = model.encode(texts).tolist()
+        inserted = updated = total = 0
+        kept_ids: List[str] = []
+        if request.chunking is None:
+            # Content-addressed IDs; a repeated document within the request is stored once
+            payloads: Dict[str, dict] = {}
+            for doc in request.documents:
+                text_hash = content_hash(doc.text)
+                payloads[content_point_id(text_hash, doc.key)] = document_payload(doc, doc.text, text_hash)
+            inserted, updated = await write_points(request.collection, model_name, payloads)
+            total = len(request.documents)
+            duplicates = total - len(payloads)
+            kept_ids = list(payloads)
+        else:
+            # Chunk IDs are per position in the parent document, so repeated text within
+            # a document (or shared between documents) is kept at every position
+            pending: Dict[str, dict] = {}
+            seen = set()
+            duplicates = 0
+            for doc in request.documents:
+                chunks = await encoder.split(model_name, doc.text, request.chunking)
+                parent_id = doc.key or content_point_id(content_hash(doc.text))
+                for chunk_index, (text, start, end) in enumerate(chunks):
+                    text_hash = content_hash(text)
+                    point_id = chunk_point_id(parent_id, chunk_index, text_hash)
+                    if point_id in seen:
+                        # The same document (or key and chunk) sent twice in this request
+                        duplicates += 1
+                        continue
+                    seen.add(point_id)
+                    pending[point_id] = {
+                        **document_payload(doc, text, text_hash),
+                        "parent_id": parent_id,
+                        "chunk_index": chunk_index,
+                        "chunk_start": start,
+                        "chunk_end": end,
+                    }
+                total += len(chunks)
+                # Write full batches as they fill up rather than expanding the whole request first
+                if len(pending) >= INGEST_BATCH_SIZE:
+                    batch_inserted, batch_updated = await write_points(request.collection, model_name, pending)
+                    inserted, updated = inserted + batch_inserted, updated + batch_updated
+                    kept_ids.extend(pending)
+                    pending = {}
+            if pending:
+                batch_inserted, batch_updated = await write_points(request.collection, model_name, pending)
+                inserted, updated = inserted + batch_inserted, updated + batch_updated
+                kept_ids.extend(pending)
         
-        # Prepare points
-        points = [
-            PointStruct(
-                id=str(uuid.uuid4()),
-                vector=embedding,
-                payload={"text": doc.text, **(doc.metadata or {})}
-            )
-            for doc, embedding in zip(request.documents, embeddings)
-        ]
+        replaced = 0
+        if request.replace:
+            source_keys = list({doc.key for doc in request.documents if doc.key is not None})
+            if source_keys:
+                replaced = await delete_stale_points(request.collection, source_keys, kept_ids)
         
-        # Upsert to Qdrant
-        qdrant.upsert(collection_name=request.collection, points=points)
+        if inserted or updated or replaced:
+            collection_changed(request.collection)
         
         return {
             "status": "success",
             "collection": request.collection,
             "model": model_name,
-            "inserted": len(points)
+            "documents": len(request.documents),
+            "chunks": total if request.chunking else None,
+            "inserted": inserted,
+            "updated": updated,
+            "skipped": total - inserted - updated - duplicates,
+            "duplicates": duplicates,
+            "replaced": replaced
         }
+    except HTTPException:
+        raise
     except Exception as e:
+        # The cached metadata may be stale (collection deleted or recreated by another worker)
+        collection_registry.invalidate(request.collection)
+        # Some batches may have been written before the failure
+        collection_changed(request.collection)
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/search")
-async def search(request: SearchRequest):
-    """Search for similar documents"""
+@app.post("/ingest/{collection_name}")
+async def ingest_documents(
+    collection_name: str,
+    request: Request,
+    model: Optional[str] = None,
+    job_id: Optional[str] = None,
+    start_row: int = 0,
+    format: Optional[str] = None,
+    text_field: str = "text",
+    batch_size: int = INGEST_BATCH_SIZE,
+):
+    """Stream NDJSON or CSV documents into a collection.
+
+    The body is read incrementally and encoded in batch_size batches; encoding
+    of the next batch overlaps with the Qdrant upsert of the previous one.
+    Progress is tracked as a job: rows are numbered from start_row, rows the
+    job has already committed are skipped, so a failed load can be resumed
+    by re-sending with the same job_id (from the start, or from rows_committed).
+    A job_id the service doesn't know (e.g. after a restart without
+    INGEST_JOBS_DIR) starts at start_row, trusting the client's own progress.
+    """
     try:
-        # Get collection's model
-        metadata = get_collection_metadata(request.collection)
-        
-        if metadata and metadata.get("model"):
-            collection_model = metadata["model"]
-            
-            # Check if user is trying to override with a different model
-            if request.model and request.model != collection_model:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Cannot use different embedding model for search. "
-                           f"Collection '{request.collection}' uses model '{collection_model}'. "
-                           f"You requested '{request.model}'. "
-                           f"Search must use the same model as the collection's documents."
-                )
-            
-            # Use collection's model
-            model, model_name, dimension = get_model(collection_model)
+        input_format = detect_format(request.headers.get("content-type"), format)
+        job, created = ingest_jobs.get_or_create(job_id, collection_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if job.collection != collection_name:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Job '{job.job_id}' belongs to collection '{job.collection}', not '{collection_name}'"
+        )
+    if not ingest_jobs.start(job):
+        raise HTTPException(status_code=409, detail=f"Job '{job.job_id}' is already running")
+    if created:
+        job.rows_committed = job.rows_read = start_row
+    if start_row > job.rows_committed:
+        ingest_jobs.finish(job)
+        raise HTTPException(
+            status_code=400,
+            detail=f"start_row {start_row} would skip rows: job '{job.job_id}' has committed "
+                   f"{job.rows_committed} rows, resume from there"
+        )
+    batch_size = max(1, batch_size)
+
+    job.status = "running"
+    job.error = None
+    ingest_jobs.save(job)
+    inserted = 0
+    pending_upsert: Optional[asyncio.Task] = None
+
+    async def upsert_batch(points: List[PointStruct], end_row: int, counts: Optional[list]):
+        # A retried batch overwrites its rows' points; their old statistics are replaced, not added to
+        removed = await overwritten_term_counts(collection_name, [point.id for point in points]) if counts else []
+        await qdrant.upsert(collection_name=collection_name, points=points)
+        if counts:
+            await update_term_stats(collection_name, added=counts, removed=removed)
+        collection_changed(collection_name)
+        job.rows_committed = end_row
+        job.batches_committed += 1
+        ingest_jobs.save(job)
+
+    async def flush(batch: List[tuple[int, dict]]):
+        nonlocal pending_upsert, inserted
+        texts = [doc["text"] for _, doc in batch]
+        vectors = (await encode_texts(model_name, texts, priority=PRIORITY_BULK, use_cache=False)).tolist()
+        payloads = [{"text": doc["text"], **doc["metadata"]} for _, doc in batch]
+        vectors, counts = await point_vectors(collection_name, texts, vectors)
+        for payload, document in zip(payloads, counts or ()):
+            payload[LENGTH_FIELD] = sum(document.values())
+        points = [
+            PointStruct(id=row_point_id(job.job_id, row), vector=vector, payload=payload)
+            for (row, _), vector, payload in zip(batch, vectors, payloads)
+        ]
+        # Batches commit in order; only one upsert is in flight at a time
+        if pending_upsert is not None:
+            await pending_upsert
+        pending_upsert = asyncio.create_task(upsert_batch(points, batch[-1][0] + 1, counts))
+        inserted += len(points)
+
+    try:
+        model_name, _ = await resolve_collection_model(collection_name, model or job.model)
+        job.model = model_name
+
+        if input_format == "csv":
+            documents = iter_csv_documents(request.stream(), text_field=text_field)
         else:
-            # Collection exists but has no metadata (legacy collection)
-            # Use default model but warn
-            model, model_name, dimension = get_model(None)
-            print(f"⚠️  Warning: Collection '{request.collection}' has no model metadata. Using default: {model_name}")
+            documents = iter_ndjson_documents(request.stream())
+
+        row = start_row
+        batch: List[tuple[int, dict]] = []
+        async for doc in documents:
+            if row >= job.rows_committed:
+                batch.append((row, doc))
+            row += 1
+            job.rows_read = max(job.rows_read, row)
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+        if pending_upsert is not None:
+            await pending_upsert
+        job.status = "completed"
+    except BaseException as e:
+        # Let an upsert already in flight finish so rows_committed is accurate
+        if pending_upsert is not None and not pending_upsert.done():
+            await asyncio.gather(pending_upsert, return_exceptions=True)
+        job.status = "interrupted" if isinstance(e, (ClientDisconnect, asyncio.CancelledError)) else "failed"
+        job.error = getattr(e, "detail", None) or str(e) or type(e).__name__
+        ingest_jobs.finish(job)
+        if isinstance(e, HTTPException):
+            raise
+        if not isinstance(e, Exception):
+            raise
+        collection_registry.invalidate(collection_name)
+        raise HTTPException(status_code=400, detail=job.error, headers={"X-Ingest-Job-Id": job.job_id})
+
+    ingest_jobs.finish(job)
+    return {**job.to_dict(), "inserted": inserted}
+
+
+@app.get("/ingest/jobs")
+async def list_ingest_jobs():
+    """List streaming ingest jobs, newest first"""
+    return {"jobs": [job.to_dict() for job in ingest_jobs.list()]}
+
+
+@app.get("/ingest/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """Get the progress of a streaming ingest job"""
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingest job '{job_id}' not found")
+    return job.to_dict()
+
+
+async def resolve_search_model(collection_name: str, requested_model: Optional[str]) -> tuple[str, int]:
+    """Return (model_name, dimension) for querying a collection; it must be the collection's own model"""
+    # Get collection's model
+    metadata = await get_collection_metadata(collection_name)
+    
+    if metadata and metadata.get("model"):
+        collection_model = metadata["model"]
         
-        # Generate query embedding
-        query_vector = model.encode(request.query).tolist()
+        # Check if user is trying to override with a different model
+        if requested_model and requested_model != collection_model:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot use different embedding model for search. "
+                       f"Collection '{collection_name}' uses model '{collection_model}'. "
+                       f"You requested '{requested_model}'. "
+                       f"Search must use the same model as the collection's documents."
+            )
         
-        # Search in Qdrant with vectors
-        results = qdrant.search(
-            collection_name=request.collection,
-            query_vector=query_vector,
-            limit=request.limit,
-            score_threshold=request.score_threshold,
-            with_vectors=True
+        # Use collection's model
+        return get_model(collection_model)
+    
+    # Collection exists but has no metadata (legacy collection)
+    # Use default model but warn
+    model_name, dimension = get_model(None)
+    print(f"⚠️  Warning: Collection '{collection_name}' has no model metadata. Using default: {model_name}")
+    return model_name, dimension
+
+
+def payload_selector(payload_fields: Optional[List[str]]):
+    """Qdrant with_payload value: everything, or just text plus the requested fields"""
+    if payload_fields is None:
+        return True
+    return ["text", *payload_fields]
+
+
+def dense_vector(vector):
+    """The dense vector of a point: hybrid and reduced collections return named vectors"""
+    if isinstance(vector, dict):
+        return vector.get(FULL_VECTOR_NAME, vector.get(""))
+    return vector
+
+
+def format_hits(results, response_format: str, with_vectors: bool) -> List[dict]:
+    """Turn Qdrant hits into response dicts, dropping the metadata record"""
+    # Filter out metadata record from results (using special UUID)
+    metadata_id = "00000000-0000-0000-0000-000000000000"
+    return [
+        {
+            "id": hit.id,
+            "score": hit.score,
+            "text": hit.payload.get("text"),
+            "metadata": {k: v for k, v in hit.payload.items() if k != "text" and not k.startswith("_")},
+            "vector": serialization.encode_vector(dense_vector(hit.vector), response_format) if with_vectors else None
+        }
+        for hit in results
+        if str(hit.id) != metadata_id and not hit.payload.get("_is_metadata", False)
+    ]
+
+
+async def rescored_search(collection_name: str, reduction: dict, queries: List[tuple], query_filter: Filter,
+                          with_payload, with_vectors: bool, params: Optional[SearchParams],
+                          oversampling: Optional[float]) -> list:
+    """Search a reduced collection for each (query vector, limit, score_threshold).
+
+    A first search_batch over the indexed low-dimensional vectors fetches
+    limit * oversampling candidates per query. A second one scores just those
+    candidates exactly against their full vectors, so the returned scores
+    are full-dimension scores.
+    """
+    dimension = reduction["dimension"]
+    factor = oversampling or reduction["oversampling"]
+    candidates = await qdrant.search_batch(collection_name=collection_name, requests=[
+        QdrantSearchRequest(vector=vector[:dimension].tolist(), filter=query_filter,
+                            limit=rescore_candidates(limit, factor), with_payload=False, params=params)
+        for vector, limit, _ in queries
+    ])
+    rescore = [i for i, hits in enumerate(candidates) if hits]
+    rescored = await qdrant.search_batch(collection_name=collection_name, requests=[
+        QdrantSearchRequest(
+            vector=NamedVector(name=FULL_VECTOR_NAME, vector=queries[i][0].tolist()),
+            filter=Filter(must=[HasIdCondition(has_id=[hit.id for hit in candidates[i]])]),
+            limit=queries[i][1],
+            score_threshold=queries[i][2],
+            with_payload=with_payload,
+            with_vector=[FULL_VECTOR_NAME] if with_vectors else False,
+            params=SearchParams(exact=True),
         )
+        for i in rescore
+    ]) if rescore else []
+    results = [[] for _ in queries]
+    for i, hits in zip(rescore, rescored):
+        results[i] = hits
+    return results
+
+
+# Names of hybrid search's retrievers, in the order their results are fused
+HYBRID_RETRIEVERS = ("dense", "sparse")
+
+
+async def hybrid_search(request: SearchRequest, query_vector: np.ndarray, query_filter: Filter,
+                        response_format: str) -> List[dict]:
+    """Dense and BM25 retrieval in one search_batch call, fused with reciprocal rank fusion"""
+    stats = await get_term_stats(request.collection, sparse.term_counts(request.query))
+    keyword_vector = sparse.query_vector(request.query, stats)
+    reduction = await get_reduction(request.collection)
+    candidates = request.hybrid_candidates or max(2 * request.limit, 20)
+    with_payload = payload_selector(request.payload_fields)
+    params = search_params(request.hnsw_ef, request.exact, request.rescore, request.oversampling)
+    common = dict(filter=query_filter, limit=candidates, with_payload=with_payload, with_vector=request.with_vectors)
+    requests = []
+    if not reduction:
+        requests.append(QdrantSearchRequest(vector=query_vector.tolist(), score_threshold=request.score_threshold,
+                                            params=params, **common))
+    if keyword_vector.indices:  # No query term occurs in the collection: dense only
+        requests.append(QdrantSearchRequest(
+            vector=NamedSparseVector(name=SPARSE_VECTOR_NAME, vector=keyword_vector), **common))
+    with metrics.stage("vector_store"):
+        if reduction:
+            # Dense candidates come from the reduced index and are ranked by their full vectors, as in /search
+            searches = [rescored_search(request.collection, reduction,
+                                        [(query_vector, candidates, request.score_threshold)], query_filter,
+                                        with_payload, request.with_vectors, params, request.oversampling)]
+            if requests:
+                searches.append(qdrant.search_batch(collection_name=request.collection, requests=requests))
+            results = [hits for batch in await asyncio.gather(*searches) for hits in batch]
+        else:
+            results = await qdrant.search_batch(collection_name=request.collection, requests=requests)
+    fused = reciprocal_rank_fusion(
+        [format_hits(hits, response_format, request.with_vectors) for hits in results],
+        key=lambda hit: str(hit["id"]),
+        k=request.rrf_k,
+        limit=request.limit,
+    )
+    for hit in fused:
+        hit["sources"] = [HYBRID_RETRIEVERS[index] for index in hit["sources"]]
+    return fused
+
+
+@app.post("/search")
+async def search(request: SearchRequest, http_request: Request):
+    """Search for similar documents.
+
+    Vectors are only returned with with_vectors=true. Send
+    Accept: application/msgpack or application/vnd.ragbase.base64+json for
+    compact vector encodings. Repeated requests are answered from the search
+    cache until the collection is written to.
+    """
+    response_format = serialization.negotiate(http_request.headers.get("accept"))
+    cache_key = None
+    if search_cache.enabled:
+        cache_key = request_key(**request.model_dump(), format=response_format)
+        generation = await search_cache.generation(request.collection)
+        cached = await search_cache.get(request.collection, cache_key, generation)
+        if cached is not None:
+            media_type, body = cached
+            return Response(body, media_type=media_type, headers={"Vary": "Accept", "X-Search-Cache": "hit"})
+    try:
+        model_name, dimension = await resolve_search_model(request.collection, request.model)
+        hybrid = await collection_is_hybrid(request.collection)
+        if request.hybrid and not hybrid:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Collection '{request.collection}' has no sparse vectors; create it with hybrid=true"
+            )
+        hybrid = hybrid and request.hybrid is not False
+        query_filter = request_filter(request.collection, request.filter, request.tenant)
         
-        # Filter out metadata record from results (using special UUID)
-        metadata_id = "00000000-0000-0000-0000-000000000000"
-        filtered_results = [
-            hit for hit in results 
-            if str(hit.id) != metadata_id and not hit.payload.get("_is_metadata", False)
-        ]
+        # Generate query embedding
+        query_vector = (await encode_texts(model_name, [request.query]))[0]
         
-        return {
+        reduction = await get_reduction(request.collection)
+        if hybrid:
+            hits = await hybrid_search(request, query_vector, query_filter, response_format)
+        elif reduction:
+            with metrics.stage("vector_store"):
+                results = await rescored_search(
+                    request.collection, reduction, [(query_vector, request.limit, request.score_threshold)],
+                    query_filter, payload_selector(request.payload_fields), request.with_vectors,
+                    search_params(request.hnsw_ef, request.exact, request.rescore, request.oversampling),
+                    request.oversampling,
+                )
+            hits = format_hits(results[0], response_format, request.with_vectors)
+        else:
+            # Search in Qdrant, excluding the metadata point server-side
+            with metrics.stage("vector_store"):
+                results = await qdrant.search(
+                    collection_name=request.collection,
+                    query_vector=query_vector.tolist(),
+                    query_filter=query_filter,
+                    limit=request.limit,
+                    score_threshold=request.score_threshold,
+                    with_payload=payload_selector(request.payload_fields),
+                    with_vectors=request.with_vectors,
+                    search_params=search_params(request.hnsw_ef, request.exact, request.rescore, request.oversampling)
+                )
+            hits = format_hits(results, response_format, request.with_vectors)
+        
+        response = serialization.render({
             "query": request.query,
             "model": model_name,
-            "query_vector": query_vector,
-            "results": [
-                {
-                    "id": hit.id,
-                    "score": hit.score,
-                    "text": hit.payload.get("text"),
-                    "metadata": {k: v for k, v in hit.payload.items() if k != "text" and not k.startswith("_")},
-                    "vector": hit.vector if hasattr(hit, 'vector') else None
-                }
-                for hit in filtered_results
-            ]
-        }
+            "hybrid": hybrid,
+            "query_vector": serialization.encode_vector(query_vector, response_format) if request.with_vectors else None,
+            "results": hits
+        }, response_format)
+        if cache_key is not None:
+            await search_cache.put(request.collection, cache_key, generation, response.media_type, response.body)
+            response.headers["X-Search-Cache"] = "miss"
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
+        # The cached metadata may be stale (collection deleted or recreated by another worker)
+        collection_registry.invalidate(request.collection)
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/search/batch")
+async def search_batch(request: BatchSearchRequest, http_request: Request):
+    """Run several queries in one call, optionally fused into a single ranking.
+
+    Queries are encoded once per model and sent as one Qdrant search_batch
+    call per collection.
+    """
+    response_format = serialization.negotiate(http_request.headers.get("accept"))
+    if not request.queries:
+        raise HTTPException(status_code=400, detail="queries must not be empty")
+    if len(request.queries) > SEARCH_BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {SEARCH_BATCH_MAX_QUERIES} queries per batch (got {len(request.queries)})"
+        )
+    if request.fusion not in (None, "rrf"):
+        raise HTTPException(status_code=400, detail=f"Unsupported fusion '{request.fusion}'. Use 'rrf'.")
+
+    queries = [
+        BatchSearchQuery(query=query) if isinstance(query, str) else query
+        for query in request.queries
+    ]
+    for index, query in enumerate(queries):
+        query.collection = query.collection or request.collection
+        if not query.collection:
+            raise HTTPException(status_code=400, detail=f"Query {index} has no collection and no default collection is set")
+
+    collection_names = list(dict.fromkeys(query.collection for query in queries))
+    try:
+        resolved = await asyncio.gather(
+            *(resolve_search_model(name, request.model) for name in collection_names)
+        )
+        collection_models = {name: model_name for name, (model_name, _) in zip(collection_names, resolved)}
+
+        # One encode call per model for all of its queries
+        by_model: Dict[str, List[int]] = {}
+        for index, query in enumerate(queries):
+            by_model.setdefault(collection_models[query.collection], []).append(index)
+        encoded = await asyncio.gather(
+            *(encode_texts(model_name, [queries[i].query for i in indexes])
+              for model_name, indexes in by_model.items())
+        )
+        query_vectors: List[Optional[np.ndarray]] = [None] * len(queries)
+        for indexes, vectors in zip(by_model.values(), encoded):
+            for i, vector in zip(indexes, vectors):
+                query_vectors[i] = vector
+
+        # One search_batch round trip per collection
+        by_collection: Dict[str, List[int]] = {}
+        for index, query in enumerate(queries):
+            by_collection.setdefault(query.collection, []).append(index)
+        with_payload = payload_selector(request.payload_fields)
+        filters = {name: request_filter(name, request.filter, request.tenant) for name in by_collection}
+        params = search_params(request.hnsw_ef, request.exact, request.rescore, request.oversampling)
+        reductions = dict(zip(by_collection, await asyncio.gather(*(get_reduction(name) for name in by_collection))))
+        with metrics.stage("vector_store"):
+            batch_results = await asyncio.gather(*(
+                rescored_search(
+                    collection_name, reductions[collection_name],
+                    [(query_vectors[i], queries[i].limit or request.limit,
+                      queries[i].score_threshold if queries[i].score_threshold is not None
+                      else request.score_threshold)
+                     for i in indexes],
+                    filters[collection_name], with_payload, request.with_vectors, params, request.oversampling,
+                )
+                if reductions[collection_name] else
+                qdrant.search_batch(
+                    collection_name=collection_name,
+                    requests=[
+                        QdrantSearchRequest(
+                            vector=query_vectors[i].tolist(),
+                            filter=filters[collection_name],
+                            limit=queries[i].limit or request.limit,
+                            score_threshold=(queries[i].score_threshold if queries[i].score_threshold is not None
+                                             else request.score_threshold),
+                            with_payload=with_payload,
+                            with_vector=request.with_vectors,
+                            params=params,
+                        )
+                        for i in indexes
+                    ],
+                )
+                for collection_name, indexes in by_collection.items()
+            ))
+        hits_per_query: List[List[dict]] = [[] for _ in queries]
+        for indexes, results in zip(by_collection.values(), batch_results):
+            for i, hits in zip(indexes, results):
+                hits_per_query[i] = format_hits(hits, response_format, request.with_vectors)
+    except HTTPException:
+        raise
+    except Exception as e:
+        # The cached metadata may be stale (collection deleted or recreated by another worker)
+        for name in collection_names:
+            collection_registry.invalidate(name)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    content = {
+        "results": [
+            {
+                "query": query.query,
+                "collection": query.collection,
+                "model": collection_models[query.collection],
+                "query_vector": (serialization.encode_vector(query_vectors[i], response_format)
+                                 if request.with_vectors else None),
+                "results": hits_per_query[i],
+            }
+            for i, query in enumerate(queries)
+        ]
+    }
+    if request.fusion == "rrf":
+        content["fused"] = reciprocal_rank_fusion(
+            [[{**hit, "collection": query.collection} for hit in hits]
+             for query, hits in zip(queries, hits_per_query)],
+            key=lambda hit: (hit["collection"], str(hit["id"])),
+            k=request.rrf_k,
+            limit=request.limit,
+        )
+    return serialization.render(content, response_format)
+
+
 @app.delete("/collections/{collection_name}")
 async def delete_collection(collection_name: str):
     """Delete a collection"""
     try:
-        qdrant.delete_collection(collection_name=collection_name)
+        hybrid = await collection_is_hybrid(collection_name)
+        await qdrant.delete_collection(collection_name=collection_name)
+        if hybrid:
+            await qdrant.delete_collection(collection_name=sparse.term_stats_collection(collection_name))
         return {"status": "deleted", "collection": collection_name}
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        collection_registry.invalidate(collection_name)
+        collection_changed(collection_name)
+        term_stats_cache.invalidate_collection(collection_name)
+        payload_indexes.forget(collection_name)
+
+
+warmup.mark("imported")
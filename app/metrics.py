@@ -0,0 +1,235 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Stage latency buckets (seconds): sub-millisecond cache hits up to slow bulk encodes
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+TIMING_REQUEST_HEADER = b"x-request-timing"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+                  for labels, value in self._values.items()]
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        counts = series[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+def render_samples(name: str, help: str, kind: str, labelnames: Tuple[str, ...],
+                   samples: Iterable[Tuple[tuple, float]]) -> List[str]:
+    """Exposition lines for values read from another component's stats (kind: counter or gauge)"""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{_labels(labelnames, labels)} {_number(value)}" for labels, value in samples]
+    return lines
+
+
+def render_histogram(name: str, help: str, labelnames: Tuple[str, ...],
+                     series: Iterable[Tuple[tuple, List[Tuple[float, int]], float, int]]) -> List[str]:
+    """Exposition lines for a histogram kept elsewhere as (labels, [(bound, count)], sum, count)"""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+    for labels, buckets, total, count in series:
+        cumulative = 0
+        for bound, bucket_count in buckets:
+            cumulative += bucket_count
+            le = 'le="' + _number(bound) + '"'
+            lines.append(f"{name}_bucket{_labels(labelnames, labels, le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labelnames, labels)} {_number(total)}")
+        lines.append(f"{name}_count{_labels(labelnames, labels)} {count}")
+    return lines
+
+
+class Registry:
+    """Metrics owned by this module plus collectors that read other components' stats at scrape time"""
+
+    def __init__(self):
+        self.metrics: List = []
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]):
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines += metric.render()
+        for collector in self.collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.register(Histogram(
+    "ragbase_request_duration_seconds", "HTTP request latency by endpoint", ("endpoint", "method", "status")))
+STAGE_SECONDS = registry.register(Histogram(
+    "ragbase_stage_duration_seconds", "Time spent per request stage", ("endpoint", "model", "stage")))
+IN_FLIGHT = registry.register(Gauge(
+    "ragbase_requests_in_flight", "HTTP requests currently being served"))
+
+
+class RequestTimings:
+    """Per-request stage durations, collected through a context variable"""
+
+    __slots__ = ("stages", "model")
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.model = ""
+
+
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as one of the current request's stages (no-op outside a request)"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.stages[name] = timings.stages.get(name, 0.0) + time.perf_counter() - started
+
+
+def set_model(model_name: str):
+    """Label the current request's stages with the model it used"""
+    timings = _current.get()
+    if timings is not None:
+        timings.model = model_name
+
+
+def _endpoint_name(scope) -> str:
+    endpoint = scope.get("endpoint")
+    return getattr(endpoint, "__name__", "unmatched") if endpoint is not None else "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency, in-flight requests and stage timings.
+
+    Clients that send "X-Request-Timing: true" get the stage timings back in
+    a Server-Timing response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        want_timing = any(name == TIMING_REQUEST_HEADER and value.lower() in (b"1", b"true")
+                          for name, value in scope.get("headers", ()))
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if want_timing:
+                    total = (time.perf_counter() - started) * 1000
+                    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.stages.items()]
+                    entries.append(f"total;dur={total:.2f}")
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", ", ".join(entries).encode("latin-1"))]
+            await send(message)
+
+        IN_FLIGHT.inc(1)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.inc(-1)
+            _current.reset(token)
+            endpoint = _endpoint_name(scope)
+            REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint, scope["method"], str(status))
+            for name, seconds in timings.stages.items():
+                STAGE_SECONDS.observe(seconds, endpoint, timings.model, name)
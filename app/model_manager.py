@@ -0,0 +1,208 @@
+import asyncio
+import gc
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+LOADED = "loaded"
+EVICTED = "evicted"
+FAILED = "failed"
+
+
+class ModelLoadError(Exception):
+    """Raised when a model could not be loaded"""
+
+
+class _ModelSlot:
+    """State of one configured model in the pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = NOT_LOADED
+        self.model: Any = None
+        self.memory_bytes = 0
+        self.in_use = 0
+        self.last_used = 0.0
+        self.load_seconds = 0.0
+        self.loads = 0
+        self.evictions = 0
+        self.error: Optional[str] = None
+        self.loaded_event: Optional[threading.Event] = None
+
+
+def model_memory_bytes(model: Any) -> int:
+    """Resident size of a torch model's weights (parameters + buffers)"""
+    if hasattr(model, "memory_bytes"):
+        # Non-torch backends report their own size
+        return model.memory_bytes
+    total = 0
+    for tensors in (getattr(model, "parameters", None), getattr(model, "buffers", None)):
+        if tensors is None:
+            continue
+        for tensor in tensors():
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class ModelManager:
+    """Loads models on first use and keeps the resident set under a memory budget.
+
+    Concurrent requests for a model that is still loading wait for the same
+    load. When the loaded models exceed memory_budget_bytes, the least
+    recently used models that are not currently encoding are evicted.
+    Thread-safe: loads and encodes run on executor threads.
+    """
+
+    def __init__(self, names: Iterable[str], loader: Callable[[str], Any], memory_budget_bytes: int = 0,
+                 encoder: Optional[Callable[..., Any]] = None):
+        self.loader = loader
+        # Runs one encode on a loaded model; defaults to model.encode(texts, **kwargs)
+        self.encoder = encoder or (lambda model, texts, **kwargs: model.encode(texts, **kwargs))
+        self.memory_budget_bytes = memory_budget_bytes  # 0 = unlimited
+        self._slots: Dict[str, _ModelSlot] = {name: _ModelSlot(name) for name in names}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._slots
+
+    def names(self) -> List[str]:
+        return list(self._slots)
+
+    def loaded_names(self) -> List[str]:
+        with self._lock:
+            return [slot.name for slot in self._slots.values() if slot.state == LOADED]
+
+    def load(self, name: str) -> Any:
+        """Return the model, loading it on this thread if needed (or waiting for a load in progress)"""
+        slot = self._slots[name]
+        while True:
+            with self._lock:
+                if slot.state == LOADED:
+                    slot.last_used = time.monotonic()
+                    return slot.model
+                if slot.state == LOADING:
+                    event = slot.loaded_event
+                else:
+                    slot.state = LOADING
+                    slot.error = None
+                    slot.loaded_event = threading.Event()
+                    event = None
+            if event is None:
+                break
+            event.wait()
+            with self._lock:
+                if slot.state == FAILED:
+                    raise ModelLoadError(f"Failed to load model '{name}': {slot.error}")
+
+        print(f"  Loading {name}...")
+        started = time.perf_counter()
+        try:
+            model = self.loader(name)
+        except Exception as e:
+            with self._lock:
+                slot.state = FAILED
+                slot.error = str(e)
+                slot.loaded_event.set()
+            print(f"  ❌ Failed to load {name}: {e}")
+            raise ModelLoadError(f"Failed to load model '{name}': {e}") from e
+
+        with self._lock:
+            slot.model = model
+            slot.memory_bytes = model_memory_bytes(model)
+            slot.load_seconds = time.perf_counter() - started
+            slot.loads += 1
+            slot.last_used = time.monotonic()
+            slot.state = LOADED
+            slot.loaded_event.set()
+        print(f"  ✅ {name} loaded in {slot.load_seconds:.1f}s ({slot.memory_bytes / 1024 / 1024:.0f} MB)")
+        self._enforce_budget()
+        return model
+
+    async def ensure_loaded(self, name: str):
+        """Load a model without blocking the event loop"""
+        slot = self._slots[name]
+        if slot.state == LOADED:
+            slot.last_used = time.monotonic()
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self.load, name)
+
+    async def prewarm(self, names: Iterable[str]):
+        for name in names:
+            try:
+                await self.ensure_loaded(name)
+            except ModelLoadError:
+                pass
+
+    def encode(self, name: str, texts: List[str], **kwargs):
+        """Encode with a model, keeping it pinned (not evictable) for the duration"""
+        model = self._pin(name)
+        try:
+            return self.encoder(model, texts, **kwargs)
+        finally:
+            self._unpin(name)
+
+    def _pin(self, name: str) -> Any:
+        while True:
+            model = self.load(name)
+            with self._lock:
+                slot = self._slots[name]
+                # It may have been evicted between load() and here
+                if slot.state == LOADED:
+                    slot.in_use += 1
+                    slot.last_used = time.monotonic()
+                    return model
+
+    def _unpin(self, name: str):
+        with self._lock:
+            self._slots[name].in_use -= 1
+        self._enforce_budget()
+
+    def _enforce_budget(self):
+        if not self.memory_budget_bytes:
+            return
+        evicted = []
+        with self._lock:
+            loaded = [slot for slot in self._slots.values() if slot.state == LOADED]
+            total = sum(slot.memory_bytes for slot in loaded)
+            # Always keep the most recently used model, even if it alone exceeds the budget
+            candidates = sorted(loaded, key=lambda slot: slot.last_used)[:-1]
+            for slot in candidates:
+                if total <= self.memory_budget_bytes:
+                    break
+                if slot.in_use:
+                    continue
+                total -= slot.memory_bytes
+                slot.model = None
+                slot.state = EVICTED
+                slot.evictions += 1
+                evicted.append(slot.name)
+        if evicted:
+            gc.collect()
+            print(f"♻️  Evicted models to stay within memory budget: {evicted}")
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(slot.memory_bytes for slot in self._slots.values() if slot.state == LOADED)
+
+    def status(self, name: str) -> dict:
+        with self._lock:
+            slot = self._slots[name]
+            return {
+                "state": slot.state,
+                "memory_mb": round(slot.memory_bytes / 1024 / 1024, 1) if slot.state == LOADED else 0.0,
+                "in_use": slot.in_use,
+                "loads": slot.loads,
+                "evictions": slot.evictions,
+                "load_seconds": round(slot.load_seconds, 2),
+                "error": slot.error,
+            }
+
+    def stats(self) -> dict:
+        return {
+            "memory_budget_mb": round(self.memory_budget_bytes / 1024 / 1024, 1),
+            "resident_mb": round(self.resident_bytes() / 1024 / 1024, 1),
+            "models": {name: self.status(name) for name in self._slots},
+        }
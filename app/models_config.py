@@ -0,0 +1,68 @@
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from inference_backends import BACKENDS
+
+
+FALLBACK_MODELS = [{
+    "name": "all-MiniLM-L6-v2",
+    "dimension": 384,
+    "description": "Fast and efficient, good for general purpose",
+    "default": True
+}]
+
+
+def load_models_config(path: str) -> Tuple[Dict[str, dict], str, List[str]]:
+    """Read the models YAML: (available models by name, default model, models to prewarm)
+
+    Shared by the API and the inference server so both see the same models.
+    """
+    print(f"📄 Loading models configuration from: {path}")
+    try:
+        with open(path, 'r') as f:
+            config = yaml.safe_load(f)
+            models_config = config.get('models', [])
+    except FileNotFoundError:
+        print(f"⚠️  Config file not found at {path}, using default model")
+        models_config = FALLBACK_MODELS
+    except Exception as e:
+        print(f"❌ Error loading config: {e}, using default model")
+        models_config = FALLBACK_MODELS
+
+    available_models = {}
+    default_model: Optional[str] = None
+    prewarm_models = []
+
+    for model_config in models_config:
+        model_name = model_config['name']
+        available_models[model_name] = {
+            "name": model_name,
+            "dimension": model_config['dimension'],
+            "description": model_config['description'],
+            "backend": model_config.get('backend', 'torch'),
+            "intra_op_threads": int(model_config.get('intra_op_threads', 0)),
+            "max_seq_length": model_config.get('max_seq_length')
+        }
+        if available_models[model_name]["backend"] not in BACKENDS:
+            raise RuntimeError(f"❌ Model '{model_name}' has unknown backend "
+                               f"'{available_models[model_name]['backend']}'. Use one of {list(BACKENDS)}.")
+        if model_config.get('default', False):
+            default_model = model_name
+        if model_config.get('prewarm', False):
+            prewarm_models.append(model_name)
+
+    if not available_models:
+        raise RuntimeError("❌ No models configured! Check your configuration.")
+
+    # Set first model as default if none specified
+    if default_model is None:
+        default_model = list(available_models.keys())[0]
+
+    # Without an explicit prewarm list, only the default model is loaded at startup
+    if not any('prewarm' in model_config for model_config in models_config):
+        prewarm_models = [default_model]
+
+    print(f"📋 Available models: {list(available_models.keys())}")
+    print(f"🎯 Default model: {default_model}")
+    return available_models, default_model, prewarm_models
@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from embedding_cache import ENTRY_OVERHEAD_BYTES, normalize_text
+
+
+def request_key(**fields) -> str:
+    """Stable key for a search request; the query text is whitespace-normalized"""
+    if "query" in fields:
+        fields["query"] = normalize_text(fields["query"])
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SharedSearchStore:
+    """SQLite file shared by the API workers on one host: collection generations and cached responses.
+
+    Generations live here too, so a write handled by one worker invalidates
+    the results cached by all of them. Calls block on disk and on the other
+    workers' locks; SearchResultCache runs the per-request ones in a thread.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS generations (collection TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, collection TEXT NOT NULL, generation INTEGER NOT NULL,"
+            " media_type TEXT NOT NULL, body BLOB NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS results_collection ON results (collection)")
+        self._writes_since_prune = 0
+        self._lock = threading.Lock()
+
+    def generation(self, collection: str) -> int:
+        with self._lock:
+            return self._generation(collection)
+
+    def _generation(self, collection: str) -> int:
+        row = self.conn.execute("SELECT generation FROM generations WHERE collection = ?", (collection,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, collection: str) -> int:
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO generations (collection, generation) VALUES (?, 1)"
+                " ON CONFLICT(collection) DO UPDATE SET generation = generation + 1",
+                (collection,),
+            )
+            self.conn.execute("DELETE FROM results WHERE collection = ?", (collection,))
+            return self._generation(collection)
+
+    def get(self, key: str, generation: int, min_stored_at: float) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT media_type, body FROM results WHERE key = ? AND generation = ? AND stored_at >= ?",
+                (key, generation, min_stored_at),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, key: str, collection: str, generation: int, media_type: str, body: bytes) -> bool:
+        """Store a response unless the collection moved past its generation in the meantime"""
+        with self._lock:
+            if generation != self._generation(collection):
+                return False
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (key, collection, generation, media_type, body, stored_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, collection, generation, media_type, body, time.time()),
+            )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= 1000:
+                self._writes_since_prune = 0
+                self.conn.execute(
+                    "DELETE FROM results WHERE key IN ("
+                    " SELECT key FROM results ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        return True
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class SearchResultCache:
+    """Memory-budgeted LRU cache of rendered /search responses.
+
+    Entries are scoped per collection and tagged with the collection's
+    generation, which every write to the collection bumps (see bump()), so a
+    result is never served after the data it was computed from changed. A
+    search that started before a write stores its result under the old
+    generation, where it can no longer be found. Entries also expire after
+    ttl_seconds (0 = never), which bounds staleness from writes made outside
+    the API. With a SharedSearchStore, generations and results are shared by
+    all workers using the same file.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float = 0.0, shared: Optional[SharedSearchStore] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self._generations: Dict[str, int] = {}
+        # (collection, key) -> (generation, media_type, body, stored_at)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[int, str, bytes, float]]" = OrderedDict()
+        self._by_collection: Dict[str, Set[Tuple[str, str]]] = {}
+        self._bytes = 0
+
+        # Stats
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    async def generation(self, collection: str) -> int:
+        """Current generation of a collection; read before searching and pass it to put()"""
+        if self.shared is not None:
+            return await asyncio.to_thread(self.shared.generation, collection)
+        return self._generations.get(collection, 0)
+
+    def bump(self, collection: str):
+        """Invalidate everything cached for a collection (call after any write, create or delete)"""
+        if self.shared is not None:
+            self.shared.bump(collection)
+        else:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+        for entry_key in self._by_collection.pop(collection, ()):
+            self._remove(entry_key, forget=False)
+        self.invalidations += 1
+
+    async def get(self, collection: str, key: str, generation: int) -> Optional[Tuple[str, bytes]]:
+        """(media_type, body) of a cached response, or None"""
+        now = time.time()
+        entry_key = (collection, key)
+        entry = self._entries.get(entry_key)
+        if entry is not None:
+            entry_generation, media_type, body, stored_at = entry
+            if entry_generation == generation and (self.ttl_seconds <= 0 or now - stored_at < self.ttl_seconds):
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return media_type, body
+            self._remove(entry_key)
+
+        if self.shared is not None:
+            min_stored_at = now - self.ttl_seconds if self.ttl_seconds > 0 else 0.0
+            found = await asyncio.to_thread(self.shared.get, key, generation, min_stored_at)
+            if found is not None:
+                self._insert(entry_key, (generation, found[0], found[1], now))
+                self.hits += 1
+                self.shared_hits += 1
+                return found
+        self.misses += 1
+        return None
+
+    async def put(self, collection: str, key: str, generation: int, media_type: str, body: bytes):
+        if self.shared is not None:
+            current = await asyncio.to_thread(self.shared.put, key, collection, generation, media_type, body)
+        else:
+            current = generation == self._generations.get(collection, 0)
+        if not current:
+            return  # The collection changed while this search ran
+        self._insert((collection, key), (generation, media_type, body, time.time()))
+
+    def _insert(self, entry_key: Tuple[str, str], entry: tuple):
+        if entry_key in self._entries:
+            self._remove(entry_key)
+        self._entries[entry_key] = entry
+        self._by_collection.setdefault(entry_key[0], set()).add(entry_key)
+        self._bytes += self._entry_size(entry_key, entry)
+        while self._bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, entry_key: Tuple[str, str], forget: bool = True):
+        entry = self._entries.pop(entry_key)
+        self._bytes -= self._entry_size(entry_key, entry)
+        if forget:
+            keys = self._by_collection.get(entry_key[0])
+            if keys is not None:
+                keys.discard(entry_key)
+                if not keys:
+                    del self._by_collection[entry_key[0]]
+
+    @staticmethod
+    def _entry_size(entry_key: Tuple[str, str], entry: tuple) -> int:
+        return len(entry[2]) + len(entry_key[0]) + len(entry_key[1]) + ENTRY_OVERHEAD_BYTES
+
+    def close(self):
+        if self.shared is not None:
+            self.shared.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "shared_entries": self.shared.count() if self.shared is not None else 0,
+        }
@@ -0,0 +1,76 @@
+import base64
+import json
+from typing import Iterable, List, Optional
+
+import numpy as np
+from fastapi import Response
+
+import metrics
+
+try:
+    import msgpack
+except ImportError:  # msgpack responses are unavailable; clients get JSON instead
+    msgpack = None
+
+
+# Response formats, chosen from the Accept header
+JSON = "application/json"
+BASE64_JSON = "application/vnd.ragbase.base64+json"  # JSON, vectors as base64 little-endian float32
+MSGPACK = "application/msgpack"  # msgpack, vectors as raw little-endian float32 bytes
+
+_MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Pick a response format from an Accept header, in the client's order of preference"""
+    if not accept:
+        return JSON
+    candidates = []
+    for index, part in enumerate(accept.split(",")):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    pass
+        candidates.append((-quality, index, media_type.lower()))
+    for _, _, media_type in sorted(candidates):
+        if media_type in _MSGPACK_TYPES and msgpack is not None:
+            return MSGPACK
+        if media_type == BASE64_JSON:
+            return BASE64_JSON
+        if media_type in (JSON, "application/*", "*/*"):
+            return JSON
+    return JSON
+
+
+def encode_vector(vector, response_format: str):
+    """Represent one vector for the given response format"""
+    if vector is None:
+        return None
+    if response_format == JSON:
+        return vector.tolist() if isinstance(vector, np.ndarray) else list(vector)
+    raw = np.asarray(vector, dtype="<f4").tobytes()
+    if response_format == MSGPACK:
+        return raw
+    return base64.b64encode(raw).decode("ascii")
+
+
+def encode_vectors(vectors: Iterable, response_format: str) -> List:
+    if response_format == JSON and isinstance(vectors, np.ndarray):
+        # One C-level conversion instead of one per row
+        return vectors.tolist()
+    return [encode_vector(vector, response_format) for vector in vectors]
+
+
+def render(content: dict, response_format: str, status_code: int = 200) -> Response:
+    """Serialize a response body, skipping FastAPI's generic (slow) jsonable_encoder pass"""
+    headers = {"Vary": "Accept"}
+    with metrics.stage("serialization"):
+        if response_format == MSGPACK:
+            return Response(msgpack.packb(content, use_bin_type=True), status_code=status_code,
+                            media_type=MSGPACK, headers=headers)
+        body = json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        return Response(body, status_code=status_code, media_type=response_format, headers=headers)
@@ -0,0 +1,104 @@
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from qdrant_client.models import SparseVector
+
+
+# Name of the sparse vector in hybrid collections (the dense vector stays unnamed)
+SPARSE_VECTOR_NAME = "bm25"
+# Payload field holding a document's token count, needed to undo its statistics on delete
+LENGTH_FIELD = "_bm25_length"
+# Suffix of the companion collection holding a hybrid collection's BM25 statistics:
+# a totals point plus one point per term (id = term index, payload {"df": n})
+TERM_STATS_SUFFIX = "__bm25"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r"\w+")
+
+
+def term_counts(text: str) -> Counter:
+    """Lowercased word tokens of a text, counted by term index.
+
+    Terms are hashed to 31-bit indices, so no vocabulary has to be shared
+    between workers. Product codes like "SKU-1042" become the tokens "sku"
+    and "1042" and match exactly, which is what the dense model is bad at.
+    """
+    return Counter(zlib.crc32(token.encode()) & 0x7FFFFFFF for token in _WORD.findall(text.lower()))
+
+
+class TermStats:
+    """Corpus statistics for BM25: document count, total length and the document frequency of some terms.
+
+    Hybrid collections store these in a companion collection, one point per
+    term, so only the df of terms that were looked up (query terms) is held
+    here; unknown terms are loaded on demand.
+    """
+
+    __slots__ = ("documents", "total_length", "df")
+
+    def __init__(self, documents: int = 0, total_length: int = 0, df: Optional[Dict[int, int]] = None):
+        self.documents = documents
+        self.total_length = total_length
+        self.df = df or {}
+
+    @property
+    def avg_length(self) -> float:
+        return self.total_length / self.documents if self.documents else 0.0
+
+    def update(self, documents: int, total_length: int, df: Dict[int, int]):
+        """Take the stored values after a write; df only refreshes terms already loaded"""
+        self.documents = documents
+        self.total_length = total_length
+        for index, count in df.items():
+            if index in self.df:
+                self.df[index] = count
+
+    def idf(self, index: int) -> float:
+        df = self.df.get(index, 0)
+        return math.log(1.0 + (self.documents - df + 0.5) / (df + 0.5))
+
+
+def term_stats_delta(added: Iterable[Counter] = (), removed: Iterable[Tuple[List[int], int]] = ()) -> tuple:
+    """(documents, total length, per-term df) change from added term counts and removed (term indexes, length)"""
+    documents = total_length = 0
+    df = Counter()
+    for document in added:
+        documents += 1
+        total_length += sum(document.values())
+        df.update(document.keys())
+    for indices, length in removed:
+        documents -= 1
+        total_length -= length
+        df.subtract(indices)
+    return documents, total_length, df
+
+
+def term_stats_collection(collection_name: str) -> str:
+    return f"{collection_name}{TERM_STATS_SUFFIX}"
+
+
+def _sparse(weights: Dict[int, float]) -> SparseVector:
+    # Sorted indices: Qdrant's dot product (and local mode) expects them in order
+    indices = sorted(weights)
+    return SparseVector(indices=indices, values=[weights[index] for index in indices])
+
+
+def document_vector(counts: Counter, avg_length: float) -> SparseVector:
+    """BM25 term-frequency part of a document's score (saturated tf, length-normalized).
+
+    IDF is applied on the query side, so stored vectors stay valid as the
+    corpus grows; avg_length is the collection's average at write time.
+    """
+    length = sum(counts.values())
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length) if avg_length else BM25_K1
+    return _sparse({index: tf * (BM25_K1 + 1) / (tf + norm) for index, tf in counts.items()})
+
+
+def query_vector(text: str, stats: TermStats) -> SparseVector:
+    """IDF weight of each query term; its dot product with a document vector is the BM25 score"""
+    return _sparse({index: stats.idf(index) for index in term_counts(text) if stats.df.get(index)})
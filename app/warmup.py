@@ -0,0 +1,65 @@
+import time
+from typing import Dict, Iterable, Optional
+
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+
+class Warmup:
+    """Progress of the background startup phase, reported by /readyz.
+
+    Steps (Qdrant connection, one per prewarmed model) move from pending to
+    running to ready or failed. Phase timings are seconds since the process
+    started importing the app. The service is ready once Qdrant is connected
+    and no model step is still pending or running; failed models are
+    reported and loaded again on first use.
+    """
+
+    def __init__(self, started_at: float, models: Iterable[str]):
+        self.started_at = started_at
+        self.steps: Dict[str, str] = {"qdrant": PENDING, **{f"model:{name}": PENDING for name in models}}
+        self.step_seconds: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.phases: Dict[str, float] = {}
+        self._step_started: Dict[str, float] = {}
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def mark(self, phase: str):
+        """Record that a startup phase (imported, serving, ready) was reached now"""
+        self.phases.setdefault(phase, round(self.elapsed(), 3))
+
+    def start(self, step: str):
+        self.steps[step] = RUNNING
+        self._step_started[step] = time.monotonic()
+
+    def finish(self, step: str, error: Optional[str] = None):
+        self.steps[step] = FAILED if error else READY
+        self.step_seconds[step] = round(time.monotonic() - self._step_started.get(step, time.monotonic()), 3)
+        if error:
+            self.errors[step] = error
+        else:
+            self.errors.pop(step, None)
+        if self.ready:
+            self.mark("ready")
+
+    @property
+    def ready(self) -> bool:
+        return self.steps["qdrant"] == READY and all(
+            state in (READY, FAILED) for step, state in self.steps.items() if step.startswith("model:"))
+
+    def status(self) -> dict:
+        done = sum(state in (READY, FAILED) for state in self.steps.values())
+        return {
+            "ready": self.ready,
+            "progress": round(done / len(self.steps), 3),
+            "steps": dict(self.steps),
+            "step_seconds": dict(self.step_seconds),
+            "errors": dict(self.errors),
+            "startup_seconds": dict(self.phases),
+            "uptime_seconds": round(self.elapsed(), 3),
+        }
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Encode throughput on a mixed-length corpus: request-order vs length-bucketed batching.
+
+Builds a corpus from a JSON file (default test_foods.json) and turns
+--long-pct of the entries into long documents by concatenating several
+entries, then shuffles it, like an upload of unevenly chunked files. Encodes
+it in-process the way the service does:
+
+  request order  fixed chunks of --batch-size texts in input order (previous behaviour)
+  bucketed       chunks split by length, then token-capped batches (ENCODE_BATCH_MAX_TOKENS)
+
+Reports texts/s, padded tokens (what the model actually computes) and the
+largest difference between the two outputs, which should be ~0 since the
+original order is restored.
+
+Usage:
+    python benchmarks/encode_bucketing_bench.py --model all-MiniLM-L6-v2 --max-batch-tokens 8192
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+from inference_backends import BACKENDS, TORCH, encode_bucketed, load_model, plan_batches, token_lengths  # noqa: E402
+
+
+def build_corpus(path: str, long_pct: float, copies: int, seed: int) -> list:
+    with open(path) as f:
+        texts = [record["text"] for record in json.load(f)]
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(copies):
+        for text in texts:
+            if rng.random() * 100 < long_pct:
+                text = " ".join(rng.sample(texts, rng.randint(5, 20)))
+            corpus.append(text)
+    rng.shuffle(corpus)
+    return corpus
+
+
+def request_order(model, texts: list, batch_size: int, max_batch_tokens: int) -> np.ndarray:
+    return np.concatenate([
+        np.asarray(model.encode(texts[i:i + batch_size], batch_size=batch_size), dtype=np.float32)
+        for i in range(0, len(texts), batch_size)
+    ])
+
+
+def bucketed(model, texts: list, batch_size: int, max_batch_tokens: int) -> np.ndarray:
+    # Mirrors EncodeBatcher (length-sorted chunks) followed by encode_bucketed (token-capped batches)
+    order = np.argsort([-len(text) for text in texts], kind="stable")
+    ordered = [texts[i] for i in order]
+    chunks = [encode_bucketed(model, ordered[i:i + batch_size], max_batch_tokens, batch_size)
+              for i in range(0, len(ordered), batch_size)]
+    embeddings = np.empty((len(texts), chunks[0].shape[1]), dtype=np.float32)
+    embeddings[order] = np.concatenate(chunks)
+    return embeddings
+
+
+def padded_tokens(lengths: list, batches: list) -> int:
+    return sum(len(batch) * max(lengths[i] for i in batch) for batch in batches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--backend", default=TORCH, choices=list(BACKENDS))
+    parser.add_argument("--file", default="test_foods.json")
+    parser.add_argument("--long-pct", type=float, default=10.0, help="Share of entries turned into long documents")
+    parser.add_argument("--copies", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-batch-tokens", type=int, default=8192)
+    parser.add_argument("--max-seq-length", type=int, default=0, help="Override the model's max_seq_length")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    model = load_model(args.model, args.backend, max_seq_length=args.max_seq_length or None)
+    texts = build_corpus(args.file, args.long_pct, args.copies, args.seed)
+    lengths = token_lengths(model, texts)
+
+    # Padded token counts of each strategy's forward passes
+    fixed = [list(range(i, min(i + args.batch_size, len(texts)))) for i in range(0, len(texts), args.batch_size)]
+    char_order = list(np.argsort([-len(text) for text in texts], kind="stable"))
+    sorted_batches = []
+    for i in range(0, len(texts), args.batch_size):
+        chunk = char_order[i:i + args.batch_size]
+        sorted_batches += [[chunk[j] for j in batch] for batch in
+                           plan_batches([lengths[j] for j in chunk], args.max_batch_tokens, args.batch_size)]
+
+    model.encode(texts[:8])  # warm-up
+    results = {}
+    outputs = {}
+    for name, run, batches in (("request order", request_order, fixed), ("bucketed", bucketed, sorted_batches)):
+        started = time.perf_counter()
+        outputs[name] = run(model, texts, args.batch_size, args.max_batch_tokens)
+        seconds = time.perf_counter() - started
+        results[name] = {
+            "seconds": round(seconds, 3),
+            "texts_per_second": round(len(texts) / seconds, 1),
+            "forward_passes": len(batches),
+            "padded_tokens": padded_tokens(lengths, batches),
+        }
+    max_diff = float(np.abs(outputs["request order"] - outputs["bucketed"]).max())
+
+    summary = {
+        "model": args.model, "backend": args.backend, "texts": len(texts),
+        "real_tokens": sum(lengths), "max_tokens": max(lengths),
+        "results": results, "max_abs_diff": max_diff,
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"📊 {args.model} ({args.backend}): {len(texts)} texts, {sum(lengths)} real tokens, "
+          f"longest {max(lengths)} tokens")
+    print(f"{'strategy':<15}{'seconds':>9}{'texts/s':>10}{'passes':>8}{'padded tokens':>15}")
+    for name, result in results.items():
+        print(f"{name:<15}{result['seconds']:>9.2f}{result['texts_per_second']:>10.1f}"
+              f"{result['forward_passes']:>8}{result['padded_tokens']:>15}")
+    print(f"Max |difference| between outputs: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Dense vs hybrid (dense + BM25) retrieval quality on keyword-style queries.
+
+Loads a catalog (default test_foods.json) into a hybrid collection, then
+searches for each item by its name (--query-field), the kind of short,
+exact query dense models handle poorly. Each query has one correct answer
+(the item itself); reports hit@1, hit@k and MRR plus p50 latency for dense
+only (hybrid=false) and for hybrid search, at the same small limit.
+
+Usage (against a running service):
+    python benchmarks/hybrid_bench.py --base-url http://localhost:8000 --limit 5
+"""
+import argparse
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+
+
+def call(base_url: str, method: str, path: str, body=None, timeout: float = 600.0) -> tuple[int, dict]:
+    request = urllib.request.Request(
+        base_url + path,
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={"Content-Type": "application/json"},
+        method=method,
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, {"detail": e.read().decode(errors="replace")}
+
+
+def evaluate(base_url: str, collection: str, records: list, query_field: str, limit: int, hybrid: bool) -> dict:
+    ranks, latencies = [], []
+    for i, record in enumerate(records):
+        started = time.perf_counter()
+        status, result = call(base_url, "POST", "/search", {
+            "collection": collection, "query": record[query_field], "limit": limit, "hybrid": hybrid,
+            "payload_fields": ["item"],
+        })
+        latencies.append(time.perf_counter() - started)
+        if status != 200:
+            raise SystemExit(f"❌ Search failed ({status}): {result}")
+        items = [hit["metadata"].get("item") for hit in result["results"]]
+        ranks.append(items.index(i) + 1 if i in items else None)
+    return {
+        "hit@1": round(sum(rank == 1 for rank in ranks) / len(ranks), 3),
+        f"hit@{limit}": round(sum(rank is not None for rank in ranks) / len(ranks), 3),
+        "mrr": round(sum(1 / rank for rank in ranks if rank) / len(ranks), 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--file", default="test_foods.json", help="JSON array of objects with a 'text' field")
+    parser.add_argument("--query-field", default="name")
+    parser.add_argument("--collection", default="hybrid_bench")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+    base_url = args.base_url.rstrip("/")
+
+    with open(args.file) as f:
+        records = json.load(f)
+    call(base_url, "DELETE", f"/collections/{args.collection}")
+    status, result = call(base_url, "POST", f"/collections/{args.collection}", {"hybrid": True})
+    if status != 200:
+        raise SystemExit(f"❌ Could not create collection ({status}): {result}")
+    documents = [{"text": record["text"], "metadata": {"item": i}} for i, record in enumerate(records)]
+    for start in range(0, len(documents), 256):
+        status, result = call(base_url, "POST", "/upsert",
+                              {"collection": args.collection, "documents": documents[start:start + 256]})
+        if status != 200:
+            raise SystemExit(f"❌ Upsert failed ({status}): {result}")
+
+    results = {
+        "dense": evaluate(base_url, args.collection, records, args.query_field, args.limit, hybrid=False),
+        "hybrid": evaluate(base_url, args.collection, records, args.query_field, args.limit, hybrid=True),
+    }
+    call(base_url, "DELETE", f"/collections/{args.collection}")
+
+    if args.json:
+        print(json.dumps({"queries": len(records), "limit": args.limit, "results": results}, indent=2))
+        return
+    print(f"📊 {len(records)} '{args.query_field}' queries, limit {args.limit}")
+    print(f"{'mode':<8}" + "".join(f"{name:>10}" for name in results["dense"]))
+    for mode, metrics in results.items():
+        print(f"{mode:<8}" + "".join(f"{value:>10}" for value in metrics.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Load test: /search latency while a large /upsert is running.
+
+Measures search latency on an idle service, then again while a large upsert
+is in flight, and prints p50/p95/p99 for both phases. With encoding and
+Qdrant I/O off the event loop, the "during upsert" numbers should stay close
+to the baseline instead of stalling for the length of the upsert. Also
+reports the upsert's docs/s and each model's batching from /stats: how many
+batches a model may run at once (INFERENCE_WORKERS), how many ran and their
+average size, so runs with different executor sizes can be compared.
+
+Usage (against a running service):
+    python benchmarks/load_search_during_upsert.py --base-url http://localhost:8000 \\
+        --upsert-docs 5000 --concurrency 8
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def post(base_url: str, path: str, body: dict, timeout: float = 600.0) -> tuple[int, dict]:
+    request = urllib.request.Request(
+        base_url + path,
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, {"detail": e.read().decode(errors="replace")}
+
+
+def get(base_url: str, path: str, timeout: float = 60.0) -> dict:
+    with urllib.request.urlopen(base_url + path, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_searches(base_url: str, collection: str, concurrency: int, stop: threading.Event,
+                 min_requests: int) -> tuple[list[float], int]:
+    """Issue searches from `concurrency` threads until stop is set (and min_requests are done)"""
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    queries = ["fresh fruit", "green vegetables", "high protein", "sweet dessert", "breakfast"]
+
+    def worker(worker_id: int):
+        nonlocal errors
+        i = 0
+        while True:
+            with lock:
+                if stop.is_set() and len(latencies) >= min_requests:
+                    return
+            started = time.perf_counter()
+            status, _ = post(base_url, "/search", {
+                "collection": collection,
+                "query": queries[(worker_id + i) % len(queries)],
+                "limit": 5,
+            })
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            with lock:
+                if status == 200:
+                    latencies.append(elapsed_ms)
+                else:
+                    errors += 1
+            i += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for worker_id in range(concurrency):
+            pool.submit(worker, worker_id)
+    return latencies, errors
+
+
+def summarize(name: str, latencies: list[float], errors: int) -> dict:
+    result = {
+        "phase": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2) if latencies else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+    }
+    print(f"{name:>16}: n={result['requests']:<5} errors={errors:<3} "
+          f"p50={result['p50_ms']:>8.2f}ms p95={result['p95_ms']:>8.2f}ms "
+          f"p99={result['p99_ms']:>8.2f}ms max={result['max_ms']:>8.2f}ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--search-collection", default="loadtest_search")
+    parser.add_argument("--upsert-collection", default="loadtest_upsert")
+    parser.add_argument("--upsert-docs", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--baseline-requests", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    # Seed a small collection to search against
+    seed = [{"text": f"Food item {i}: fresh fruit, vegetables, protein and desserts"} for i in range(200)]
+    status, body = post(args.base_url, "/upsert", {"collection": args.search_collection, "documents": seed})
+    if status != 200:
+        raise SystemExit(f"Seeding failed ({status}): {body}")
+
+    # Phase 1: baseline
+    stop = threading.Event()
+    stop.set()
+    baseline = summarize("baseline", *run_searches(
+        args.base_url, args.search_collection, args.concurrency, stop, args.baseline_requests))
+
+    # Phase 2: same search load while one large upsert is running
+    big_batch = [
+        {"text": f"Bulk document {i}. " + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4}
+        for i in range(args.upsert_docs)
+    ]
+    upsert_result = {}
+    stop = threading.Event()
+
+    def do_upsert():
+        started = time.perf_counter()
+        status, body = post(args.base_url, "/upsert", {"collection": args.upsert_collection, "documents": big_batch})
+        upsert_result.update(status=status, seconds=round(time.perf_counter() - started, 2), body=body)
+        stop.set()
+
+    upsert_thread = threading.Thread(target=do_upsert)
+    upsert_thread.start()
+    during = summarize("during upsert", *run_searches(
+        args.base_url, args.search_collection, args.concurrency, stop, 1))
+    upsert_thread.join()
+    docs_per_s = round(args.upsert_docs / upsert_result["seconds"], 1) if upsert_result["seconds"] else 0.0
+    print(f"{'upsert':>16}: {args.upsert_docs} docs in {upsert_result['seconds']}s "
+          f"({docs_per_s} docs/s, status {upsert_result['status']})")
+    batching = {
+        model: {field: stats.get(field) for field in
+                ("max_concurrent_batches", "batches_total", "avg_batch_size", "avg_encode_ms")}
+        for model, stats in get(args.base_url, "/stats").get("batching", {}).items()
+    }
+    for model, stats in batching.items():
+        print(f"{'batching':>16}: {model}: up to {stats['max_concurrent_batches']} at once, "
+              f"{stats['batches_total']} batches, avg {stats['avg_batch_size']:.1f} texts, "
+              f"{stats['avg_encode_ms']:.1f}ms each")
+
+    if args.json:
+        print(json.dumps({
+            "baseline": baseline,
+            "during_upsert": during,
+            "upsert": {"docs": args.upsert_docs, "seconds": upsert_result["seconds"],
+                       "docs_per_s": docs_per_s, "status": upsert_result["status"]},
+            "batching": batching,
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
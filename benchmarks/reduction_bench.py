@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Recall and latency of reduced-dimension search against full-dimension search.
+
+Loads a catalog (default test_foods.json) into a normal collection and into
+one reduced collection per --dimensions entry (same model), then runs each
+item's name (--query-field) as a query. The ground truth for recall@k is an
+exact (brute-force) full-dimension search; each configuration reports
+recall@k against it, p50/p95 latency, and the estimated RAM of its vectors
+and HNSW graph from /collections/{name}/info. Reduced collections are run at
+every --oversampling factor (first-pass candidates per result).
+
+Truncation only keeps quality for Matryoshka-trained models (e.g.
+nomic-embed-text-v1.5, mxbai-embed-large-v1); other models need a large
+oversampling factor.
+
+Usage (against a running service):
+    python benchmarks/reduction_bench.py --base-url http://localhost:8000 --dimensions 64,128,256
+"""
+import argparse
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+
+
+def call(base_url: str, method: str, path: str, body=None, timeout: float = 600.0) -> tuple[int, dict]:
+    request = urllib.request.Request(
+        base_url + path,
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={"Content-Type": "application/json"},
+        method=method,
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, {"detail": e.read().decode(errors="replace")}
+
+
+def search_all(base_url: str, collection: str, queries: list, limit: int, **options) -> tuple[list, list]:
+    """Result ids and latency of every query"""
+    ids, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        status, result = call(base_url, "POST", "/search", {
+            "collection": collection, "query": query, "limit": limit, "payload_fields": [], **options,
+        })
+        latencies.append(time.perf_counter() - started)
+        if status != 200:
+            raise SystemExit(f"❌ Search failed ({status}): {result}")
+        ids.append([hit["id"] for hit in result["results"]])
+    return ids, latencies
+
+
+def load_collection(base_url: str, collection: str, documents: list, config: dict):
+    call(base_url, "DELETE", f"/collections/{collection}")
+    status, result = call(base_url, "POST", f"/collections/{collection}", config)
+    if status != 200:
+        raise SystemExit(f"❌ Could not create collection ({status}): {result}")
+    for start in range(0, len(documents), 256):
+        status, result = call(base_url, "POST", "/upsert",
+                              {"collection": collection, "documents": documents[start:start + 256]})
+        if status != 200:
+            raise SystemExit(f"❌ Upsert failed ({status}): {result}")
+
+
+def summarize(ids: list, truth: list, latencies: list, limit: int, ram_mb) -> dict:
+    recall = sum(len(set(found) & set(expected)) / max(1, len(expected)) for found, expected in zip(ids, truth))
+    ordered = sorted(latencies)
+    return {
+        f"recall@{limit}": round(recall / len(truth), 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * (len(ordered) - 1)))] * 1000, 2),
+        "ram_mb": ram_mb,
+    }
+
+
+def int_list(value: str) -> list:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--file", default="test_foods.json", help="JSON array of objects with a 'text' field")
+    parser.add_argument("--query-field", default="name")
+    parser.add_argument("--model", default=None, help="Model of all collections (default: the service's default)")
+    parser.add_argument("--dimensions", type=int_list, default=[64, 128], help="Reduced dimensions to compare")
+    parser.add_argument("--oversampling", type=lambda v: [float(x) for x in v.split(",") if x], default=[2.0, 4.0, 8.0])
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--collection", default="reduction_bench")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+    base_url = args.base_url.rstrip("/")
+
+    with open(args.file) as f:
+        records = json.load(f)
+    queries = [record[args.query_field] for record in records]
+    documents = [{"text": record["text"], "metadata": {"item": i}} for i, record in enumerate(records)]
+    model = {"model": args.model} if args.model else {}
+
+    full = f"{args.collection}_full"
+    load_collection(base_url, full, documents, model)
+    info = lambda name: call(base_url, "GET", f"/collections/{name}/info?limit=1")[1].get("memory") or {}
+    truth, _ = search_all(base_url, full, queries, args.limit, exact=True)
+    ids, latencies = search_all(base_url, full, queries, args.limit)
+    results = {"full": summarize(ids, truth, latencies, args.limit, info(full).get("estimated_ram_mb"))}
+
+    for dimension in args.dimensions:
+        name = f"{args.collection}_{dimension}"
+        load_collection(base_url, name, documents, {**model, "reduction": {"dimension": dimension}})
+        ram_mb = info(name).get("estimated_ram_mb")
+        for oversampling in args.oversampling:
+            ids, latencies = search_all(base_url, name, queries, args.limit, oversampling=oversampling)
+            results[f"{dimension}d x{oversampling:g}"] = summarize(ids, truth, latencies, args.limit, ram_mb)
+        call(base_url, "DELETE", f"/collections/{name}")
+    call(base_url, "DELETE", f"/collections/{full}")
+
+    if args.json:
+        print(json.dumps({"queries": len(queries), "limit": args.limit, "results": results}, indent=2))
+        return
+    print(f"📊 {len(queries)} '{args.query_field}' queries, limit {args.limit}, truth: exact full-dimension search")
+    columns = list(results["full"])
+    print(f"{'config':<14}" + "".join(f"{column:>12}" for column in columns))
+    for config, metrics in results.items():
+        print(f"{config:<14}" + "".join(f"{str(metrics[column]):>12}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Re-ingest benchmark: what an unchanged (or mostly unchanged) re-sync costs.
+
+Upserts a corpus into a fresh collection, then sends the identical corpus
+again, then again with --changed-pct of the documents edited. Documents get
+content-addressed IDs, so the second pass should skip everything without
+encoding, and the third should only encode the edited documents (and, with
+replace=true, delete the chunks they replaced).
+
+Usage (against a running service):
+    python benchmarks/reingest_bench.py --base-url http://localhost:8000 --file test_foods.json
+"""
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+
+
+def call(base_url: str, method: str, path: str, body=None, timeout: float = 600.0) -> tuple[int, dict]:
+    request = urllib.request.Request(
+        base_url + path,
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={"Content-Type": "application/json"},
+        method=method,
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, {"detail": e.read().decode(errors="replace")}
+
+
+def upsert_all(base_url: str, collection: str, documents: list[dict], batch_size: int) -> dict:
+    """Upsert in batches; returns summed counters and wall time"""
+    totals = {"inserted": 0, "updated": 0, "skipped": 0, "replaced": 0}
+    started = time.perf_counter()
+    for i in range(0, len(documents), batch_size):
+        status, result = call(base_url, "POST", "/upsert", {
+            "collection": collection,
+            "documents": documents[i:i + batch_size],
+            "replace": True,
+        })
+        if status != 200:
+            raise SystemExit(f"❌ Upsert failed ({status}): {result}")
+        for counter in totals:
+            totals[counter] += result.get(counter, 0)
+    totals["seconds"] = round(time.perf_counter() - started, 3)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--file", default="test_foods.json", help="JSON array of objects with a 'text' field")
+    parser.add_argument("--collection", default="reingest_bench")
+    parser.add_argument("--copies", type=int, default=1, help="Repeat the corpus (with distinct keys) to enlarge it")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--changed-pct", type=float, default=10.0, help="Share of documents edited for pass 3")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+    base_url = args.base_url.rstrip("/")
+
+    with open(args.file) as f:
+        records = json.load(f)
+    documents = [
+        {
+            "text": record["text"],
+            "key": f"copy{copy}/item{i}",
+            "metadata": {k: v for k, v in record.items() if k != "text"},
+        }
+        for copy in range(args.copies)
+        for i, record in enumerate(records)
+    ]
+    every = max(1, int(round(100 / args.changed_pct))) if args.changed_pct > 0 else 0
+    edited = [
+        {**doc, "text": doc["text"] + " (revised)"} if every and i % every == 0 else doc
+        for i, doc in enumerate(documents)
+    ]
+
+    call(base_url, "DELETE", f"/collections/{args.collection}")
+    results = {
+        "initial": upsert_all(base_url, args.collection, documents, args.batch_size),
+        "unchanged": upsert_all(base_url, args.collection, documents, args.batch_size),
+        "edited": upsert_all(base_url, args.collection, edited, args.batch_size),
+    }
+    _, info = call(base_url, "GET", f"/collections/{args.collection}/info?limit=0")
+    call(base_url, "DELETE", f"/collections/{args.collection}")
+
+    if args.json:
+        print(json.dumps({"documents": len(documents), "points_after": info.get("points_count"),
+                          "results": results}, indent=2))
+        return
+
+    print(f"📊 Re-ingest of {len(documents)} documents ({args.file} x{args.copies})")
+    print(f"{'pass':<11}{'seconds':>9}{'inserted':>10}{'updated':>9}{'skipped':>9}{'replaced':>10}")
+    for name, result in results.items():
+        print(f"{name:<11}{result['seconds']:>9.2f}{result['inserted']:>10}{result['updated']:>9}"
+              f"{result['skipped']:>9}{result['replaced']:>10}")
+    initial = results["initial"]["seconds"]
+    print(f"Unchanged re-sync took {results['unchanged']['seconds'] / initial:.1%} of the initial load; "
+          f"collection holds {info.get('points_count')} points (no duplicates)")
+
+
+if __name__ == "__main__":
+    main()
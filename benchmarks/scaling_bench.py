@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Throughput and memory of the API as HTTP workers are added, per serving mode.
+
+For each mode and --workers count, starts `uvicorn main:app --workers N`
+(plus the inference server in "server" mode) on --port, drives /embed from
+several client processes for --duration seconds, then stops it. Modes:
+
+  in-process  every API worker loads its own copy of the models (INFERENCE_SOCKET unset)
+  server      API workers share one inference server over a Unix socket
+
+Reports requests/s, texts/s, p50/p95 latency and the proportional set size
+(PSS, shared pages split between processes) of the whole process tree, so
+memory growth per worker is visible next to the throughput gain. Texts are
+unique and the embedding cache is disabled, so every request is encoded.
+Qdrant is not needed (/embed does not touch it). Linux only (reads /proc).
+
+Usage:
+    python benchmarks/scaling_bench.py --workers 1,2,4 --duration 15
+    python benchmarks/scaling_bench.py --models-config models_config.yaml --modes server --json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import yaml
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MODES = ("in-process", "server")
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def process_tree(pid: int) -> list:
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            for child in f.read().split():
+                pids += process_tree(int(child))
+    except OSError:
+        pass
+    return pids
+
+
+def memory_kb(pid: int) -> int:
+    """PSS of a process (falls back to RSS where smaps_rollup is unavailable)"""
+    for path, field in ((f"/proc/{pid}/smaps_rollup", "Pss:"), (f"/proc/{pid}/status", "VmRSS:")):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith(field):
+                        return int(line.split()[1])
+        except OSError:
+            continue
+    return 0
+
+
+def tree_memory_mb(pids: list) -> float:
+    return sum(memory_kb(pid) for tree_root in pids for pid in process_tree(tree_root)) / 1024
+
+
+def client_process(base_url: str, concurrency: int, duration: float, batch: int, texts: list, tag: str) -> tuple:
+    """Load generator run in its own process, so the client is not the bottleneck"""
+    async def run():
+        latencies, deadline = [], time.perf_counter() + duration
+        async with httpx.AsyncClient(base_url=base_url, timeout=120.0) as client:
+            async def worker(worker_id: int):
+                sent = 0
+                while time.perf_counter() < deadline:
+                    body = {"text": [f"{texts[(sent + i) % len(texts)]} [{tag}-{worker_id}-{sent}-{i}]"
+                                     for i in range(batch)]}
+                    started = time.perf_counter()
+                    response = await client.post("/embed", json=body)
+                    if response.status_code == 200:
+                        latencies.append(time.perf_counter() - started)
+                    sent += 1
+            await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        return latencies
+    return asyncio.run(run())
+
+
+def wait_until_ready(base_url: str, timeout: float):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.post(base_url + "/embed", json={"text": "warmup"}, timeout=60.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(1.0)
+    raise SystemExit(f"❌ Service at {base_url} did not become ready within {timeout:.0f}s")
+
+
+def stop(process: subprocess.Popen):
+    if process.poll() is None:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def run_configuration(args, mode: str, workers: int, env: dict, texts: list) -> dict:
+    env = dict(env)
+    processes = []
+    if mode == "server":
+        env["INFERENCE_SOCKET"] = os.path.join(tempfile.gettempdir(), f"ragbase-bench-{os.getpid()}.sock")
+        processes.append(subprocess.Popen([sys.executable, "inference_server.py"], cwd=os.path.join(REPO_ROOT, "app"),
+                                          env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    else:
+        env.pop("INFERENCE_SOCKET", None)
+    processes.append(subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=os.path.join(REPO_ROOT, "app"), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_until_ready(base_url, args.startup_timeout)
+        # Let every worker finish its own startup (prewarm) before measuring
+        time.sleep(args.settle)
+        idle_mb = tree_memory_mb([p.pid for p in processes])
+        per_client = max(1, args.concurrency // args.client_processes)
+        with multiprocessing.Pool(args.client_processes) as pool:
+            started = time.perf_counter()
+            results = pool.starmap(client_process, [
+                (base_url, per_client, args.duration, args.batch, texts, f"{mode}-{workers}-{client}")
+                for client in range(args.client_processes)])
+            elapsed = time.perf_counter() - started
+        loaded_mb = tree_memory_mb([p.pid for p in processes])
+    finally:
+        for process in reversed(processes):
+            stop(process)
+
+    latencies = [latency for result in results for latency in result]
+    return {
+        "mode": mode,
+        "workers": workers,
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "texts_per_s": round(len(latencies) * args.batch / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "idle_memory_mb": round(idle_mb, 1),
+        "memory_mb": round(loaded_mb, 1),
+    }
+
+
+def int_list(value: str) -> list:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated subset of {list(MODES)}")
+    parser.add_argument("--workers", type=int_list, default=[1, 2, 4], help="HTTP worker counts")
+    parser.add_argument("--models-config", default="", help="models_config.yaml to use (default: --model only)")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--inference-workers", type=int, default=2, help="INFERENCE_WORKERS for every process")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per configuration")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent requests in total")
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=1, help="Texts per /embed request")
+    parser.add_argument("--settle", type=float, default=3.0, help="Seconds to wait after the service is ready")
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--file", default=os.path.join(REPO_ROOT, "test_foods.json"))
+    parser.add_argument("--output", default="", help="Write the JSON report here")
+    parser.add_argument("--json", action="store_true", help="Print the JSON report instead of a table")
+    args = parser.parse_args()
+
+    modes = [mode for mode in args.modes.split(",") if mode]
+    for mode in modes:
+        if mode not in MODES:
+            raise SystemExit(f"❌ Unknown mode '{mode}'. Use {list(MODES)}.")
+    with open(args.file) as f:
+        texts = [record["text"] for record in json.load(f)]
+
+    models_config = args.models_config
+    if not models_config:
+        handle, models_config = tempfile.mkstemp(suffix=".yaml")
+        with os.fdopen(handle, "w") as f:
+            yaml.safe_dump({"models": [{"name": args.model, "dimension": args.dimension, "description": "benchmark",
+                                        "backend": args.backend, "default": True}]}, f)
+    env = {
+        **os.environ,
+        "MODELS_CONFIG_PATH": os.path.abspath(models_config),
+        "INFERENCE_WORKERS": str(args.inference_workers),
+        "EMBEDDING_CACHE_MAX_MB": "0",
+        "METRICS_ENABLED": "false",
+    }
+
+    results = []
+    for mode in modes:
+        for workers in args.workers:
+            if not args.json:
+                print(f"⏱️  {mode}, {workers} worker(s)...", flush=True)
+            results.append(run_configuration(args, mode, workers, env, texts))
+
+    for result in results:
+        baseline = next(r for r in results if r["mode"] == result["mode"])
+        result["speedup"] = round(result["requests_per_s"] / baseline["requests_per_s"], 2) \
+            if baseline["requests_per_s"] else 0.0
+
+    report = {"cpus": os.cpu_count(), "batch": args.batch, "concurrency": args.concurrency,
+              "duration_s": args.duration, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"📊 {os.cpu_count()} CPUs, {args.concurrency} concurrent /embed requests of {args.batch} text(s)")
+    columns = ["workers", "requests_per_s", "speedup", "p50_ms", "p95_ms", "idle_memory_mb", "memory_mb"]
+    print(f"{'mode':<12}" + "".join(f"{column:>16}" for column in columns))
+    for result in results:
+        print(f"{result['mode']:<12}" + "".join(f"{result[column]:>16}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
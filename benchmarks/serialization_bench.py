@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for /search responses.
+
+Builds a synthetic search response (limit hits with dim-dimensional vectors)
+and measures serialization time and body size for:
+
+  before          the old path: vectors always included, FastAPI jsonable_encoder + JSONResponse
+  json            new default: no vectors
+  json+vectors    with_vectors=true, JSON float lists
+  base64+vectors  with_vectors=true, Accept: application/vnd.ragbase.base64+json
+  msgpack+vectors with_vectors=true, Accept: application/msgpack
+
+Runs in-process; no service or model needed.
+
+Usage:
+    python benchmarks/serialization_bench.py --limit 50 --dim 768
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+import serialization  # noqa: E402
+
+
+def make_hits(limit: int, dim: int, rng: np.random.Generator) -> list[dict]:
+    vectors = rng.standard_normal((limit, dim)).astype(np.float32)
+    return [
+        {
+            "id": f"00000000-0000-4000-8000-{i:012d}",
+            "score": float(1.0 - i / limit),
+            "text": f"Document number {i} with a short sentence of text about food.",
+            "metadata": {"source": "bench", "category": "fruit", "n": i},
+            "vector": vectors[i],
+        }
+        for i in range(limit)
+    ]
+
+
+def before(query_vector, hits) -> bytes:
+    content = {
+        "query": "apple",
+        "model": "bench",
+        "query_vector": query_vector.tolist(),
+        "results": [{**hit, "vector": hit["vector"].tolist()} for hit in hits],
+    }
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def after(response_format: str, with_vectors: bool):
+    def run(query_vector, hits) -> bytes:
+        content = {
+            "query": "apple",
+            "model": "bench",
+            "query_vector": serialization.encode_vector(query_vector, response_format) if with_vectors else None,
+            "results": [
+                {**hit, "vector": serialization.encode_vector(hit["vector"], response_format) if with_vectors else None}
+                for hit in hits
+            ],
+        }
+        return serialization.render(content, response_format).body
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=50, help="Hits per response")
+    parser.add_argument("--dim", type=int, default=768, help="Vector dimension")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed runs per variant")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    hits = make_hits(args.limit, args.dim, rng)
+    query_vector = rng.standard_normal(args.dim).astype(np.float32)
+
+    variants = {
+        "before": before,
+        "json": after(serialization.JSON, False),
+        "json+vectors": after(serialization.JSON, True),
+        "base64+vectors": after(serialization.BASE64_JSON, True),
+    }
+    if serialization.msgpack is not None:
+        variants["msgpack+vectors"] = after(serialization.MSGPACK, True)
+
+    results = {}
+    for name, run in variants.items():
+        size = len(run(query_vector, hits))
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            run(query_vector, hits)
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = {"bytes": size, "median_ms": statistics.median(timings)}
+
+    if args.json:
+        print(json.dumps({"limit": args.limit, "dim": args.dim, "results": results}, indent=2))
+        return
+
+    baseline = results["before"]
+    print(f"📊 /search response, limit={args.limit}, dim={args.dim}")
+    print(f"{'variant':<17}{'bytes':>12}{'size':>9}{'median ms':>12}{'speedup':>10}")
+    for name, result in results.items():
+        print(f"{name:<17}{result['bytes']:>12,}{result['bytes'] / baseline['bytes']:>8.1%}"
+              f"{result['median_ms']:>12.3f}{baseline['median_ms'] / result['median_ms']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Reproducible end-to-end benchmark of the API, runnable without Docker.
+
+By default the FastAPI app is driven in-process (httpx ASGI transport) with
+Qdrant in local mode: in memory, or in a directory with --qdrant-path. The
+model is a small one (all-MiniLM-L6-v2 unless --model/--models-config say
+otherwise). Each run covers:
+
+  embed   /embed texts/s and request latency per batch size
+  upsert  /upsert documents/s into a fresh collection
+  search  /search qps and p50/p95/p99 latency per concurrency level
+  info    /collections/{name}/info latency at deep offsets, first (cold) and
+          repeated (cached offset->cursor) request
+
+Texts are made unique per run so the embedding cache doesn't serve them.
+Results are written as JSON (--output) together with the git commit, so
+runs can be compared between commits:
+
+    python benchmarks/service_bench.py --output before.json
+    git checkout my-branch
+    python benchmarks/service_bench.py --output after.json --compare before.json
+
+--base-url runs the same scenarios over HTTP against a running service
+instead (Qdrant is then whatever that service uses).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+import yaml
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def load_texts(path: str, copies: int, tag: str) -> list:
+    """Corpus texts, repeated `copies` times; every text is made unique for this run"""
+    with open(path) as f:
+        texts = [record["text"] for record in json.load(f)]
+    return [f"{text} [{tag}-{copy}-{i}]" for copy in range(copies) for i, text in enumerate(texts)]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def call(client: httpx.AsyncClient, method: str, path: str, body=None) -> tuple:
+    """(seconds, response JSON); a non-2xx response aborts the benchmark"""
+    started = time.perf_counter()
+    response = await client.request(method, path, json=body)
+    seconds = time.perf_counter() - started
+    if response.status_code >= 300:
+        raise SystemExit(f"❌ {method} {path} failed ({response.status_code}): {response.text[:500]}")
+    return seconds, response.json()
+
+
+async def bench_embed(client, texts: list, batch_sizes: list, requests_per_size: int) -> list:
+    results = []
+    position = 0
+    for batch_size in batch_sizes:
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(requests_per_size):
+            batch = texts[position:position + batch_size]
+            if len(batch) < batch_size:  # wrap around; repeated texts are made unique again
+                position = 0
+                batch = [f"{text} #{batch_size}" for text in texts[:batch_size]]
+            position += batch_size
+            seconds, _ = await call(client, "POST", "/embed", {"text": batch})
+            latencies.append(seconds)
+        elapsed = time.perf_counter() - started
+        results.append({
+            "batch_size": batch_size,
+            "requests": requests_per_size,
+            "texts_per_second": round(batch_size * requests_per_size / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        })
+    return results
+
+
+async def bench_upsert(client, collection: str, texts: list, batch_size: int) -> dict:
+    documents = [{"text": text, "key": f"doc{i}", "metadata": {"n": i}} for i, text in enumerate(texts)]
+    await client.delete(f"/collections/{collection}")
+    started = time.perf_counter()
+    for i in range(0, len(documents), batch_size):
+        await call(client, "POST", "/upsert", {"collection": collection, "documents": documents[i:i + batch_size]})
+    elapsed = time.perf_counter() - started
+    return {
+        "documents": len(documents),
+        "batch_size": batch_size,
+        "seconds": round(elapsed, 3),
+        "docs_per_second": round(len(documents) / elapsed, 1),
+    }
+
+
+async def bench_search(client, collection: str, queries: list, concurrency_levels: list,
+                       requests_per_level: int, limit: int) -> list:
+    results = []
+    for concurrency in concurrency_levels:
+        pending = iter(f"{queries[i % len(queries)]} ~{concurrency}-{i}" for i in range(requests_per_level))
+        latencies = []
+
+        async def worker():
+            for query in pending:
+                seconds, _ = await call(client, "POST", "/search",
+                                        {"collection": collection, "query": query, "limit": limit})
+                latencies.append(seconds)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        results.append({
+            "concurrency": concurrency,
+            "requests": len(latencies),
+            "qps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        })
+    return results
+
+
+async def bench_info(client, collection: str, offsets: list, limit: int, points: int) -> list:
+    results = []
+    for offset in offsets:
+        if offset >= points:
+            continue
+        path = f"/collections/{collection}/info?limit={limit}&offset={offset}"
+        cold, page = await call(client, "GET", path)
+        warm, _ = await call(client, "GET", path)
+        results.append({
+            "offset": offset,
+            "documents": len(page["documents"]),
+            "cold_ms": round(cold * 1000, 2),
+            "warm_ms": round(warm * 1000, 2),
+        })
+    return results
+
+
+async def run(args, client: httpx.AsyncClient) -> dict:
+    tag = uuid.uuid4().hex[:8]
+    texts = load_texts(args.file, args.copies, tag)
+    collection = f"bench_{tag}"
+    results = {}
+    try:
+        print(f"⏱️  embed (batch sizes {args.embed_batch_sizes})...", file=sys.stderr)
+        results["embed"] = await bench_embed(client, texts, args.embed_batch_sizes, args.embed_requests)
+        print(f"⏱️  upsert ({len(texts)} documents)...", file=sys.stderr)
+        results["upsert"] = await bench_upsert(client, collection, texts, args.upsert_batch_size)
+        print(f"⏱️  search (concurrency {args.search_concurrency})...", file=sys.stderr)
+        results["search"] = await bench_search(client, collection, texts, args.search_concurrency,
+                                               args.search_requests, args.search_limit)
+        print(f"⏱️  info (offsets {args.info_offsets})...", file=sys.stderr)
+        results["info"] = await bench_info(client, collection, args.info_offsets, args.info_limit, len(texts))
+    finally:
+        await client.delete(f"/collections/{collection}")
+    return results
+
+
+def write_models_config(args) -> str:
+    path = os.path.join(tempfile.mkdtemp(prefix="ragbase_bench_"), "models_config.yaml")
+    with open(path, "w") as f:
+        yaml.safe_dump({"models": [{
+            "name": args.model, "dimension": args.dimension, "description": "benchmark model",
+            "backend": args.backend, "default": True,
+        }]}, f)
+    return path
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 600.0):
+    """Models load in the background after startup; don't time the warmup"""
+    deadline = time.perf_counter() + timeout
+    while (await client.get("/readyz")).status_code != 200:
+        if time.perf_counter() > deadline:
+            raise SystemExit(f"❌ Service not ready after {timeout:.0f}s")
+        await asyncio.sleep(0.2)
+
+
+async def run_in_process(args) -> dict:
+    # The app reads its configuration at import time
+    os.environ["MODELS_CONFIG_PATH"] = args.models_config or write_models_config(args)
+    sys.path.insert(0, os.path.join(REPO_ROOT, "app"))
+    import main
+    from qdrant_client import AsyncQdrantClient
+
+    main.qdrant = AsyncQdrantClient(path=args.qdrant_path) if args.qdrant_path else AsyncQdrantClient(":memory:")
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600.0) as client:
+            await wait_until_ready(client)
+            return await run(args, client)
+
+
+async def run_remote(args) -> dict:
+    async with httpx.AsyncClient(base_url=args.base_url.rstrip("/"), timeout=600.0) as client:
+        await wait_until_ready(client)
+        return await run(args, client)
+
+
+def flatten(results: dict) -> dict:
+    """{"search[concurrency=8].p99_ms": 12.3, ...} for comparing two runs"""
+    flat = {}
+    for section, value in results.items():
+        rows = value if isinstance(value, list) else [value]
+        for row in rows:
+            key_name = next(iter(row))
+            prefix = f"{section}[{key_name}={row[key_name]}]" if isinstance(value, list) else section
+            for name, number in row.items():
+                if isinstance(value, list) and name == key_name:
+                    continue
+                flat[f"{prefix}.{name}"] = number
+    return flat
+
+
+def print_comparison(current: dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before, after = flatten(baseline["results"]), flatten(current["results"])
+    print(f"\n📊 vs {baseline_path} (commit {baseline['meta'].get('commit')})")
+    print(f"{'metric':<42}{'before':>12}{'after':>12}{'change':>9}")
+    for name, value in after.items():
+        if name in before and before[name]:
+            print(f"{name:<42}{before[name]:>12}{value:>12}{(value / before[name] - 1) * 100:>+8.1f}%")
+
+
+def print_summary(report: dict):
+    results = report["results"]
+    meta = report["meta"]
+    print(f"📊 {meta['model']} @ {meta['commit']} ({meta['qdrant']})")
+    print(f"{'embed batch':<14}{'texts/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for row in results["embed"]:
+        print(f"{row['batch_size']:<14}{row['texts_per_second']:>10}{row['p50_ms']:>10}{row['p99_ms']:>10}")
+    upsert = results["upsert"]
+    print(f"upsert: {upsert['documents']} docs in {upsert['seconds']}s = {upsert['docs_per_second']} docs/s")
+    print(f"{'search conc.':<14}{'qps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for row in results["search"]:
+        print(f"{row['concurrency']:<14}{row['qps']:>10}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+    print(f"{'info offset':<14}{'cold ms':>10}{'warm ms':>10}")
+    for row in results["info"]:
+        print(f"{row['offset']:<14}{row['cold_ms']:>10}{row['warm_ms']:>10}")
+
+
+def int_list(value: str) -> list:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="", help="Benchmark a running service instead of the in-process app")
+    parser.add_argument("--qdrant-path", default="", help="Local-mode Qdrant directory (default: in memory)")
+    parser.add_argument("--models-config", default="", help="models_config.yaml to use (default: --model only)")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--file", default=os.path.join(REPO_ROOT, "test_foods.json"))
+    parser.add_argument("--copies", type=int, default=2, help="Repeat the corpus to enlarge the collection")
+    parser.add_argument("--embed-batch-sizes", type=int_list, default=[1, 8, 32, 128])
+    parser.add_argument("--embed-requests", type=int, default=20, help="Requests per batch size")
+    parser.add_argument("--upsert-batch-size", type=int, default=256)
+    parser.add_argument("--search-concurrency", type=int_list, default=[1, 8, 32])
+    parser.add_argument("--search-requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--search-limit", type=int, default=10)
+    parser.add_argument("--info-offsets", type=int_list, default=[0, 500, 1500])
+    parser.add_argument("--info-limit", type=int, default=50)
+    parser.add_argument("--output", default="", help="Write the JSON report here")
+    parser.add_argument("--compare", default="", help="Earlier JSON report to compare against")
+    parser.add_argument("--json", action="store_true", help="Print the JSON report instead of tables")
+    args = parser.parse_args()
+
+    started = time.time()
+    results = asyncio.run(run_remote(args) if args.base_url else run_in_process(args))
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": int(started),
+            "target": args.base_url or "in-process",
+            "qdrant": "remote" if args.base_url else (args.qdrant_path or ":memory:"),
+            "model": args.models_config or f"{args.model} ({args.backend})",
+            "documents": results["upsert"]["documents"],
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_summary(report)
+    if args.compare:
+        print_comparison(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Cold-start time of the API: how long until it listens and until it is ready.
+
+Each run starts `uvicorn main:app` on --port and polls it until
+  listening  GET /livez answers (the port is bound, imports are done)
+  ready      GET /readyz returns 200 (Qdrant connected, prewarmed models
+             loaded and run once)
+then stops it. Also reports the service's own phase timings from /readyz
+(startup_seconds: imported, serving, ready; measured from process start) and
+the per-step warmup times. Models are served from the local cache after the
+first run, so the first run also includes any download.
+
+Needs Qdrant reachable at QDRANT_HOST/QDRANT_PORT (as for the service);
+without it the service listens but never becomes ready.
+
+Usage:
+    python benchmarks/startup_bench.py --runs 5
+    python benchmarks/startup_bench.py --models-config models_config.yaml --json
+"""
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import yaml
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def stop(process: subprocess.Popen):
+    if process.poll() is None:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def poll(base_url: str, path: str, process: subprocess.Popen, deadline: float) -> httpx.Response:
+    """Poll until the endpoint returns 200"""
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"❌ Service exited with code {process.returncode} during startup")
+        try:
+            response = httpx.get(base_url + path, timeout=5.0)
+            if response.status_code == 200:
+                return response
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise SystemExit(f"❌ {path} did not return 200 in time")
+
+
+def run_once(args, env: dict) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=os.path.join(REPO_ROOT, "app"), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = started + args.startup_timeout
+        poll(base_url, "/livez", process, deadline)
+        listening = time.perf_counter() - started
+        status = poll(base_url, "/readyz", process, deadline).json()
+        ready = time.perf_counter() - started
+    finally:
+        stop(process)
+    return {
+        "listening_s": round(listening, 3),
+        "ready_s": round(ready, 3),
+        "phases": status.get("startup_seconds", {}),
+        "steps": status.get("step_seconds", {}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--models-config", default="", help="models_config.yaml to use (default: --model only)")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--port", type=int, default=8791)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    models_config = args.models_config
+    if not models_config:
+        handle, models_config = tempfile.mkstemp(suffix=".yaml")
+        with os.fdopen(handle, "w") as f:
+            yaml.safe_dump({"models": [{"name": args.model, "dimension": args.dimension, "description": "benchmark",
+                                        "backend": args.backend, "default": True}]}, f)
+    env = {**os.environ, "MODELS_CONFIG_PATH": os.path.abspath(models_config)}
+    env.pop("INFERENCE_SOCKET", None)
+
+    runs = []
+    for run in range(args.runs):
+        if not args.json:
+            print(f"⏱️  Run {run + 1}/{args.runs}...", flush=True)
+        runs.append(run_once(args, env))
+
+    summary = {key: round(statistics.median(r[key] for r in runs), 3) for key in ("listening_s", "ready_s")}
+    phases = sorted({phase for r in runs for phase in r["phases"]}, key=lambda p: runs[-1]["phases"].get(p, 0))
+    summary["phases"] = {phase: round(statistics.median(r["phases"].get(phase, 0) for r in runs), 3)
+                         for phase in phases}
+    if args.json:
+        print(json.dumps({"runs": runs, "median": summary}, indent=2))
+        return
+    print(f"📊 {args.runs} cold starts (median)")
+    print(f"  listening (/livez 200):  {summary['listening_s']:.3f}s")
+    print(f"  ready (/readyz 200):     {summary['ready_s']:.3f}s")
+    for phase, seconds in summary["phases"].items():
+        print(f"  service phase {phase + ':':<10} {seconds:.3f}s")
+    for step, seconds in runs[-1]["steps"].items():
+        print(f"  last run {step}: {seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -213,7 +213,8 @@ export default function UpsertPanel({ preselectedCollection, onUpsertComplete }:
 
       const result = await upsertDocuments(selectedCollection, documents);
       message.success(
-        `Successfully inserted ${result.inserted} document(s) into "${result.collection}"`
+        `Successfully inserted ${result.inserted} document(s) into "${result.collection}"` +
+          (result.skipped ? ` (${result.skipped} unchanged skipped)` : '')
       );
       form.resetFields(['documents']);
       form.setFieldsValue({ documents: [{ text: '', metadata: '' }] });
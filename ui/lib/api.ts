@@ -101,6 +101,8 @@ export interface CollectionInfo {
   documents: CollectionDocument[];
   limit: number;
   offset: number;
+  cursor: string | null;
+  next_cursor: string | null;
 }
 
 export async function getCollectionInfo(
@@ -135,7 +137,14 @@ export async function generateEmbeddings(text: string | string[]): Promise<Embed
 export async function upsertDocuments(
   collection: string,
   documents: Document[]
-): Promise<{ status: string; collection: string; inserted: number }> {
+): Promise<{
+  status: string;
+  collection: string;
+  inserted: number;
+  updated: number;
+  skipped: number;
+  replaced: number;
+}> {
   const response = await fetch(`${API_BASE_URL}/upsert`, {
     method: 'POST',
     headers: {
@@ -167,6 +176,7 @@ export async function searchDocuments(
       query,
       limit,
       score_threshold: scoreThreshold,
+      with_vectors: true,
     }),
   });
   if (!response.ok) {